@@ -1,130 +1,483 @@
 # ai.py - Módulo básico de IA
 
+import json
+import threading
 import time
-from config_loader import AI_PROVIDER, groq_key, openai_key, gemini_key, claude_key
+import config_loader
+from response_cache import ResponseCache
+from ai_router import ProviderRouter, AllProvidersFailed, COMPLETE, FIRST_TOKEN
+from local_intents import get_intent_engine, tokenize
+
+SYSTEM_PROMPT = "Eres Jarvis, un asistente virtual útil y amigable. Responde de forma concisa y directa."
+MAX_TOKENS = 150
+TEMPERATURE = 0.7
+HTTP_TIMEOUT = 30.0
+HTTP_CONNECT_TIMEOUT = 5.0
+
+GROQ_MODEL = "llama3-8b-8192"
+OPENAI_MODEL = "gpt-3.5-turbo"
+GEMINI_MODEL = "gemini-1.5-flash"
+CLAUDE_MODEL = "claude-3-haiku-20240307"
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def get_http_client():
+    """Pool de conexiones HTTP compartido (keep-alive) por todos los proveedores."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            import httpx
+            _http = httpx.Client(
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=120),
+            )
+        return _http
+
+
+def build_messages(query, memory=None):
+    context = ""
+    if memory and hasattr(memory, 'get_context'):
+        context = memory.get_context()
+
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if context:
+        messages.append({"role": "user", "content": f"Contexto previo: {context}"})
+    messages.append({"role": "user", "content": query})
+    return messages
+
+
+def _split_system(messages):
+    """Separa el prompt de sistema y une turnos seguidos del mismo rol (formato de Gemini y Claude)."""
+    system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    turns = []
+    for m in messages:
+        if m["role"] == "system":
+            continue
+        if turns and turns[-1]["role"] == m["role"]:
+            turns[-1]["content"] += "\n" + m["content"]
+        else:
+            turns.append({"role": m["role"], "content": m["content"]})
+    return system, turns
+
+
+def _sse_events(response):
+    """Objetos JSON de las líneas ``data:`` de una respuesta server-sent events."""
+    for line in response.iter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data and data != "[DONE]":
+            yield json.loads(data)
+
+
+class Provider:
+    """Backend de IA: crea un cliente de larga duración y completa conversaciones con él.
+
+    ``complete`` y ``stream`` lanzan excepciones; las funciones ``ask_*`` las
+    convierten en el texto de error que se muestra al usuario.
+    """
+
+    name = None
+    label = None
+    key_attr = None
+    model = None
+    package = "httpx"
+
+    def build(self, key, http):
+        return key
+
+    def complete(self, client, http, messages):
+        return "".join(self.stream(client, http, messages)).strip()
+
+    def stream(self, client, http, messages):
+        """Genera el texto de la respuesta a trozos según lo va produciendo el modelo."""
+        raise NotImplementedError
+
+
+class ChatCompletionsProvider(Provider):
+    """Proveedores con la API ``chat.completions`` de OpenAI (SDK oficial o compatible).
+
+    ``base_url`` en None deja la del SDK (o su variable de entorno).
+    """
+
+    base_url = None
+
+    def complete(self, client, http, messages):
+        response = client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=MAX_TOKENS, temperature=TEMPERATURE
+        )
+        return response.choices[0].message.content.strip()
+
+    def stream(self, client, http, messages):
+        chunks = client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=MAX_TOKENS, temperature=TEMPERATURE, stream=True
+        )
+        try:
+            for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            chunks.close()
+
+
+class GroqProvider(ChatCompletionsProvider):
+    name, label, key_attr, package = "groq", "Groq", "groq_key", "groq"
+    model = GROQ_MODEL
+
+    def build(self, key, http):
+        from groq import Groq
+        return Groq(api_key=key, http_client=http, base_url=self.base_url)
+
+
+class OpenAIProvider(ChatCompletionsProvider):
+    name, label, key_attr, package = "openai", "OpenAI", "openai_key", "openai"
+    model = OPENAI_MODEL
+
+    def build(self, key, http):
+        from openai import OpenAI
+        return OpenAI(api_key=key, http_client=http, base_url=self.base_url)
+
+
+class GeminiProvider(Provider):
+    name, label, key_attr = "gemini", "Gemini", "gemini_key"
+    model = GEMINI_MODEL
+    URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:{method}"
+
+    def _body(self, messages):
+        system, turns = _split_system(messages)
+        body = {
+            "contents": [{"role": "model" if t["role"] == "assistant" else "user", "parts": [{"text": t["content"]}]}
+                         for t in turns],
+            "generationConfig": {"maxOutputTokens": MAX_TOKENS, "temperature": TEMPERATURE},
+        }
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        return body
+
+    @staticmethod
+    def _text(payload):
+        candidates = payload.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def complete(self, key, http, messages):
+        url = self.URL.format(model=self.model, method="generateContent")
+        response = http.post(url, params={"key": key}, json=self._body(messages))
+        response.raise_for_status()
+        return self._text(response.json()).strip()
+
+    def stream(self, key, http, messages):
+        url = self.URL.format(model=self.model, method="streamGenerateContent")
+        with http.stream("POST", url, params={"key": key, "alt": "sse"}, json=self._body(messages)) as response:
+            response.raise_for_status()
+            for event in _sse_events(response):
+                text = self._text(event)
+                if text:
+                    yield text
+
+
+class ClaudeProvider(Provider):
+    name, label, key_attr = "claude", "Claude", "claude_key"
+    model = CLAUDE_MODEL
+    URL = "https://api.anthropic.com/v1/messages"
+
+    def _request(self, key, messages, stream):
+        system, turns = _split_system(messages)
+        body = {"model": self.model, "max_tokens": MAX_TOKENS, "temperature": TEMPERATURE, "messages": turns}
+        if system:
+            body["system"] = system
+        if stream:
+            body["stream"] = True
+        return {"headers": {"x-api-key": key, "anthropic-version": "2023-06-01"}, "json": body}
+
+    def complete(self, key, http, messages):
+        response = http.post(self.URL, **self._request(key, messages, stream=False))
+        response.raise_for_status()
+        return "".join(block.get("text", "") for block in response.json()["content"]).strip()
+
+    def stream(self, key, http, messages):
+        with http.stream("POST", self.URL, **self._request(key, messages, stream=True)) as response:
+            response.raise_for_status()
+            for event in _sse_events(response):
+                if event.get("type") == "content_block_delta":
+                    text = event["delta"].get("text")
+                    if text:
+                        yield text
+                elif event.get("type") == "error":
+                    raise RuntimeError(event["error"].get("message", event["error"]))
+
+
+class ProviderRegistry:
+    """Un cliente por proveedor, reutilizado entre consultas sobre el pool HTTP compartido.
+
+    La clave se lee de ``config_loader`` en cada consulta: si cambia al recargar
+    la configuración, solo se reconstruye el cliente de ese proveedor.
+    """
+
+    def __init__(self, providers):
+        self.providers = {provider.name: provider for provider in providers}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def key_for(self, name):
+        provider = self.providers.get(name)
+        return getattr(config_loader, provider.key_attr, None) if provider else None
+
+    def client(self, name):
+        provider = self.providers[name]
+        key = self.key_for(name)
+        with self._lock:
+            cached = self._clients.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            http = get_http_client()
+            client = provider.build(key, http)
+            self._clients[name] = (key, client)
+            if config_loader.DEBUG_AI:
+                print(f"[DEBUG AI] Cliente {provider.label} {'reconstruido' if cached else 'creado'}")
+            return client
+
+    def complete(self, name, messages):
+        client = self.client(name)
+        return self.providers[name].complete(client, get_http_client(), messages)
+
+    def stream(self, name, messages):
+        client = self.client(name)
+        return self.providers[name].stream(client, get_http_client(), messages)
+
+
+registry = ProviderRegistry([GroqProvider(), OpenAIProvider(), GeminiProvider(), ClaudeProvider()])
+
+
+router = ProviderRouter()
+
+
+def configured_providers():
+    """Proveedores candidatos: todos los que tienen clave con ``ai_router``, o solo ``ai_provider``."""
+    names = [name for name in registry.providers if registry.key_for(name)]
+    if not config_loader.AI_ROUTER_ENABLED:
+        names = [name for name in names if name == config_loader.AI_PROVIDER]
+    return names
+
+
+def get_router_status():
+    return router.status()
+
+
+def _route(names, fn, discard=None, kind=COMPLETE):
+    router.hedge_min_delay = config_loader.AI_ROUTER_HEDGE_MIN_DELAY
+    return router.call(names, fn, preferred=config_loader.AI_PROVIDER,
+                       hedge=config_loader.AI_ROUTER_HEDGE, discard=discard, kind=kind)
+
+
+def _error_message(failure):
+    """Texto para el usuario con el error de cada proveedor que se intentó."""
+    messages = []
+    for name, error in failure.errors:
+        provider = registry.providers[name]
+        if isinstance(error, ImportError):
+            messages.append(f"Error: Librería '{provider.package}' no instalada. Usa: pip install {provider.package}")
+        else:
+            messages.append(f"Error en {provider.label} API: {error}")
+    return "\n".join(messages)
+
+
+_cache = None
+_cache_settings = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Caché de respuestas según ``ai_cache`` de la config (None si está desactivada)."""
+    global _cache, _cache_settings
+    if not config_loader.AI_CACHE_ENABLED:
+        return None
+    settings = (config_loader.AI_CACHE_PATH, config_loader.AI_CACHE_MAX_ENTRIES,
+                config_loader.AI_CACHE_TTL, tuple(config_loader.AI_CACHE_NEVER_CACHE))
+    with _cache_lock:
+        if _cache is None or _cache_settings != settings:
+            _cache = ResponseCache(settings[0], max_entries=settings[1], ttl=settings[2], never_cache=settings[3])
+            _cache_settings = settings
+        return _cache
+
+
+def get_cache_status():
+    cache = get_response_cache()
+    return cache.status() if cache is not None else ""
+
+
+def flush_response_cache():
+    """Guarda en disco lo que la caché tenga pendiente (al salir)."""
+    with _cache_lock:
+        cache = _cache
+    if cache is not None:
+        cache.flush()
+
+
+def _cache_slot(names, query, memory):
+    """(caché, {proveedor: clave}) para la consulta, o (None, None) si no se debe cachear."""
+    cache = get_response_cache()
+    if cache is None or not cache.cacheable(query):
+        return None, None
+    context = memory.get_context() if memory and hasattr(memory, 'get_context') else ""
+    return cache, {name: cache.make_key(query, name, registry.providers[name].model, context) for name in names}
+
+
+def _cached_response(cache, keys):
+    """Respuesta cacheada de cualquiera de los proveedores, empezando por el que se usaría."""
+    if cache is None:
+        return None
+    ranked = router.ranked(list(keys), config_loader.AI_PROVIDER)
+    response = cache.lookup([keys[name] for name in ranked])
+    if response is not None and config_loader.DEBUG_AI:
+        print(f"[DEBUG AI] Respuesta desde la caché ({cache.status()})")
+    return response
+
+
+def local_intent(query):
+    """Respuesta de las intenciones locales (hora, fecha, temporizadores, cálculos...) o None."""
+    if not config_loader.LOCAL_INTENTS_ENABLED:
+        return None
+    response = get_intent_engine().resolve(query)
+    if response is not None and config_loader.DEBUG_AI:
+        print(f"[DEBUG AI] Respuesta local ({get_intent_engine().status()})")
+    return response
+
+
+def get_local_intents_status():
+    return get_intent_engine().status() if config_loader.LOCAL_INTENTS_ENABLED else ""
+
+
+def _ask(names, query, memory=None):
+    if not names:
+        # Fallback: respuesta local básica
+        return _local_fallback(query)
+    cache, keys = _cache_slot(names, query, memory)
+    cached = _cached_response(cache, keys)
+    if cached is not None:
+        return cached
+
+    messages = build_messages(query, memory)
+    t0 = time.time()
+    try:
+        name, response = _route(names, lambda name: registry.complete(name, messages))
+    except AllProvidersFailed as failure:
+        return _error_message(failure)
+    latency = time.time() - t0
+    if config_loader.DEBUG_AI:
+        print(f"[DEBUG AI] {registry.providers[name].label} respondió en {latency:.2f}s ({router.status()})")
+    if cache is not None and response:
+        cache.put(keys[name], response, latency)
+    return response
+
 
 def ask_ai(query, memory=None):
     """
     Función principal para hacer consultas a la IA
     """
     try:
-        # Si tienes configurado Groq
-        if AI_PROVIDER == "groq" and groq_key:
-            return ask_groq(query, memory)
-        # Si tienes configurado OpenAI
-        elif AI_PROVIDER == "openai" and openai_key:
-            return ask_openai(query, memory)
-        # Si tienes configurado Gemini
-        elif AI_PROVIDER == "gemini" and gemini_key:
-            return ask_gemini(query, memory)
-        # Fallback: respuesta local básica
-        else:
-            return ask_local(query, memory)
-            
+        response = local_intent(query)
+        if response is not None:
+            return response
+        return _ask(configured_providers(), query, memory)
     except Exception as e:
         return f"Error procesando consulta: {e}"
 
-def ask_groq(query, memory=None):
-    """Consulta usando Groq API"""
+def ask_ai_stream(query, memory=None):
+    """Como ``ask_ai``, pero genera la respuesta a trozos según llega del proveedor.
+
+    El router elige (o cubre) proveedor hasta recibir el primer trozo; a partir
+    de ahí la respuesta sigue con ese proveedor. Los errores se generan como
+    texto, igual que en ``ask_ai``; cerrar el generador antes de terminar corta
+    la conexión. Solo se cachean las respuestas recibidas completas y sin error.
+    """
     try:
-        from groq import Groq
-        
-        client = Groq(api_key=groq_key)
-        
-        # Construir contexto
-        context = ""
-        if memory and hasattr(memory, 'get_context'):
-            context = memory.get_context()
-        
-        messages = [
-            {"role": "system", "content": "Eres Jarvis, un asistente virtual útil y amigable. Responde de forma concisa y directa."}
-        ]
-        
-        if context:
-            messages.append({"role": "user", "content": f"Contexto previo: {context}"})
-            
-        messages.append({"role": "user", "content": query})
-        
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=messages,
-            max_tokens=150,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except ImportError:
-        return "Error: Librería 'groq' no instalada. Usa: pip install groq"
+        yield from _ask_stream(query, memory)
     except Exception as e:
-        return f"Error en Groq API: {e}"
+        yield f"Error procesando consulta: {e}"
 
-def ask_openai(query, memory=None):
-    """Consulta usando OpenAI API"""
+def _ask_stream(query, memory=None):
+    response = local_intent(query)
+    if response is not None:
+        yield response
+        return
+    names = configured_providers()
+    if not names:
+        yield _local_fallback(query)
+        return
+
+    cache, keys = _cache_slot(names, query, memory)
+    cached = _cached_response(cache, keys)
+    if cached is not None:
+        yield cached
+        return
+
+    messages = build_messages(query, memory)
+
+    def open_stream(name):
+        chunks = registry.stream(name, messages)
+        return chunks, next(chunks, "")
+
+    t0 = time.time()
     try:
-        import openai
-        
-        openai.api_key = openai_key
-        
-        # Construir contexto
-        context = ""
-        if memory and hasattr(memory, 'get_context'):
-            context = memory.get_context()
-        
-        messages = [
-            {"role": "system", "content": "Eres Jarvis, un asistente virtual útil y amigable. Responde de forma concisa y directa."}
-        ]
-        
-        if context:
-            messages.append({"role": "user", "content": f"Contexto previo: {context}"})
-            
-        messages.append({"role": "user", "content": query})
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            max_tokens=150,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except ImportError:
-        return "Error: Librería 'openai' no instalada. Usa: pip install openai"
+        # El router mide aquí el primer trozo, no la respuesta entera: va a su propia media y p95
+        name, (chunks, first) = _route(names, open_stream, discard=lambda opened: opened[0].close(),
+                                       kind=FIRST_TOKEN)
+    except AllProvidersFailed as failure:
+        yield _error_message(failure)
+        return
+    label = registry.providers[name].label
+    first_latency = time.time() - t0
+    parts = [first]
+    try:
+        if first:
+            yield first
+        for text in chunks:
+            parts.append(text)
+            yield text
     except Exception as e:
-        return f"Error en OpenAI API: {e}"
+        yield f"\nError en {label} API: {e}"
+    else:
+        response = "".join(parts).strip()
+        if cache is not None and response:
+            cache.put(keys[name], response, time.time() - t0)
+    finally:
+        chunks.close()
+    if config_loader.DEBUG_AI:
+        print(f"[DEBUG AI] {label}: primer token en {first_latency:.2f}s, "
+              f"respuesta completa en {time.time() - t0:.2f}s ({router.status()})")
+
+def ask_provider(name, query, memory=None):
+    """Consulta a un proveedor concreto; los errores se devuelven como texto para el usuario."""
+    return _ask([name], query, memory)
+
+def ask_groq(query, memory=None):
+    """Consulta usando Groq API"""
+    return ask_provider("groq", query, memory)
+
+def ask_openai(query, memory=None):
+    """Consulta usando OpenAI API"""
+    return ask_provider("openai", query, memory)
 
 def ask_gemini(query, memory=None):
     """Consulta usando Gemini API"""
-    return "Gemini no implementado aún. Configurando..."
+    return ask_provider("gemini", query, memory)
+
+def ask_claude(query, memory=None):
+    """Consulta usando Claude API"""
+    return ask_provider("claude", query, memory)
 
 def ask_local(query, memory=None):
     """Respuesta local básica cuando no hay APIs configuradas"""
-    
-    query_lower = query.lower()
-    
-    # Respuestas básicas
-    if any(word in query_lower for word in ["hora", "time"]):
-        import datetime
-        now = datetime.datetime.now()
-        return f"Son las {now.strftime('%H:%M:%S')} del {now.strftime('%d/%m/%Y')}"
-    
-    elif any(word in query_lower for word in ["fecha", "date"]):
-        import datetime
-        now = datetime.datetime.now()
-        return f"Hoy es {now.strftime('%d de %B de %Y')}"
-    
-    elif any(word in query_lower for word in ["hola", "hello", "hi"]):
-        return "¡Hola! Soy Jarvis, tu asistente virtual. ¿En qué puedo ayudarte?"
-    
-    elif any(word in query_lower for word in ["gracias", "thanks"]):
-        return "¡De nada! Estoy aquí para ayudarte."
-    
-    elif any(word in query_lower for word in ["como estas", "how are you"]):
-        return "Estoy funcionando perfectamente, gracias por preguntar. ¿Y tú qué tal?"
-    
-    elif any(word in query_lower for word in ["clima", "weather", "tiempo"]):
+    response = get_intent_engine().resolve(query)
+    if response is not None:
+        return response
+    return _local_fallback(query)
+
+def _local_fallback(query):
+    """Lo que se responde sin proveedor cuando ninguna intención local encaja"""
+    if {"clima", "weather", "tiempo", "llueve", "temperatura"} & set(tokenize(query)):
         return "Lo siento, no tengo acceso a información meteorológica en este momento. Puedes consultar tu app de clima favorita."
-    
-    else:
-        return f"He recibido tu consulta: '{query}'. Como no tengo configurada una API de IA, esta es una respuesta básica. Para funcionalidad completa, configura tu API key en config.json."
\ No newline at end of file
+    return f"He recibido tu consulta: '{query}'. Como no tengo configurada una API de IA, esta es una respuesta básica. Para funcionalidad completa, configura tu API key en config.json."
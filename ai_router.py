@@ -0,0 +1,202 @@
+# ai_router.py - Enrutado entre proveedores de IA según latencia y errores
+
+import queue
+import threading
+import time
+from collections import deque
+
+EWMA_ALPHA = 0.3
+LATENCY_WINDOW = 50
+UNKNOWN_LATENCY = 1.0
+MAX_ERROR_RATE = 0.5
+FAILURE_COOLDOWN = 30.0
+MIN_HEDGE_SAMPLES = 5
+DEFAULT_HEDGE_DELAY = 2.0
+
+COMPLETE = "complete"
+FIRST_TOKEN = "first_token"
+
+
+class AllProvidersFailed(Exception):
+    """Ningún proveedor respondió; ``errors`` es la lista de ``(proveedor, excepción)``."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{name}: {error}" for name, error in errors))
+        self.errors = errors
+
+
+class LatencyTrack:
+    """Media exponencial y ventana (para el p95) de una misma medida de latencia."""
+
+    def __init__(self):
+        self.ewma = None
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, latency):
+        self.samples.append(latency)
+        self.ewma = latency if self.ewma is None else self.ewma + EWMA_ALPHA * (latency - self.ewma)
+
+    def p95(self):
+        if len(self.samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class ProviderStats:
+    """Latencias y tasa de errores de un proveedor.
+
+    La respuesta completa (``COMPLETE``) y el primer trozo en streaming
+    (``FIRST_TOKEN``) se miden por separado: mezclarlas haría que el p95 de
+    una sirviera de referencia para la otra. Los errores cuentan para ambas.
+    """
+
+    def __init__(self):
+        self.latencies = {COMPLETE: LatencyTrack(), FIRST_TOKEN: LatencyTrack()}
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.last_failure = 0.0
+
+    def record(self, latency, ok, kind=COMPLETE):
+        self.calls += 1
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.latencies[kind].add(latency)
+        else:
+            self.failures += 1
+            self.last_failure = time.time()
+
+    def latency(self, kind=COMPLETE):
+        return self.latencies[kind].ewma
+
+    @property
+    def healthy(self):
+        # Tras el enfriamiento se le vuelve a dar una oportunidad aunque la tasa siga alta
+        return self.error_rate < MAX_ERROR_RATE or time.time() - self.last_failure > FAILURE_COOLDOWN
+
+    def p95(self, kind=COMPLETE):
+        return self.latencies[kind].p95()
+
+
+class ProviderRouter:
+    """Elige proveedor por latencia medida y salud, con conmutación y peticiones de cobertura.
+
+    ``call(names, fn)`` ejecuta ``fn(nombre)`` con el proveedor sano más
+    rápido. Si falla, pasa al siguiente. Con ``hedge=True``, si el primero no
+    ha respondido cuando se cumple su p95 de latencia, lanza la misma consulta
+    al siguiente y se queda con la primera respuesta correcta; la otra sigue
+    en segundo plano solo para medir y se entrega a ``discard``. ``kind``
+    indica qué mide ``fn`` (respuesta completa o primer trozo de un stream).
+    """
+
+    def __init__(self, hedge_min_delay=0.3):
+        self.hedge_min_delay = hedge_min_delay
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name):
+        with self._lock:
+            return self.stats.setdefault(name, ProviderStats())
+
+    def record(self, name, latency, ok, kind=COMPLETE):
+        stats = self._stats(name)
+        with self._lock:
+            stats.record(latency, ok, kind)
+
+    def ranked(self, names, preferred=None, kind=COMPLETE):
+        """Proveedores ordenados: sanos antes que caídos, y de menor a mayor latencia.
+
+        Los que aún no tienen medidas cuentan como ``UNKNOWN_LATENCY``, así que
+        se prueban si el conocido es más lento; a igualdad gana ``preferred``.
+        """
+        def score(name):
+            stats = self._stats(name)
+            latency = stats.latency(kind)
+            return (not stats.healthy, latency if latency is not None else UNKNOWN_LATENCY, name != preferred)
+        return sorted(names, key=score)
+
+    def hedge_delay(self, name, kind=COMPLETE):
+        stats = self._stats(name)
+        p95 = stats.p95(kind)
+        if p95 is None:
+            latency = stats.latency(kind)
+            p95 = 2 * latency if latency is not None else DEFAULT_HEDGE_DELAY
+        return max(self.hedge_min_delay, p95)
+
+    def call(self, names, fn, preferred=None, hedge=False, discard=None, kind=COMPLETE):
+        """Devuelve ``(proveedor, resultado)`` de la primera llamada correcta o lanza ``AllProvidersFailed``."""
+        order = self.ranked(names, preferred, kind)
+        if not order:
+            raise AllProvidersFailed([])
+        results = queue.Queue()
+        errors = []
+        launched = 0
+        pending = 0
+        hedged = False
+
+        def attempt(name):
+            t0 = time.time()
+            try:
+                value = fn(name)
+            except Exception as e:
+                self.record(name, time.time() - t0, ok=False, kind=kind)
+                results.put((name, False, e))
+                return
+            self.record(name, time.time() - t0, ok=True, kind=kind)
+            results.put((name, True, value))
+
+        def launch():
+            nonlocal launched, pending, hedge_at
+            name = order[launched]
+            launched += 1
+            pending += 1
+            hedge_at = time.time() + self.hedge_delay(name, kind)
+            threading.Thread(target=attempt, args=(name,), daemon=True).start()
+
+        hedge_at = None
+        launch()
+        while True:
+            timeout = None
+            if hedge and not hedged and launched < len(order):
+                timeout = max(0.0, hedge_at - time.time())
+            try:
+                name, ok, value = results.get(timeout=timeout)
+            except queue.Empty:
+                hedged = True
+                launch()
+                continue
+            pending -= 1
+            if ok:
+                if pending:
+                    threading.Thread(target=self._reap, args=(results, pending, discard), daemon=True).start()
+                return name, value
+            errors.append((name, value))
+            if launched < len(order):
+                launch()
+            elif not pending:
+                raise AllProvidersFailed(errors)
+
+    @staticmethod
+    def _reap(results, pending, discard):
+        for _ in range(pending):
+            name, ok, value = results.get()
+            if ok and discard is not None:
+                discard(value)
+
+    def status(self):
+        """Resumen de latencia (completa / primer trozo) y errores por proveedor."""
+        parts = []
+        for name, stats in sorted(self.stats.items()):
+            complete, first_token = stats.latency(COMPLETE), stats.latency(FIRST_TOKEN)
+            if complete is None and first_token is None and not stats.failures:
+                continue
+            measured = []
+            if complete is not None:
+                measured.append(f"{complete:.2f}s")
+            if first_token is not None:
+                measured.append(f"1.er trozo {first_token:.2f}s")
+            latency = ", ".join(measured) or "—"
+            mark = "✓" if stats.healthy else "✗"
+            parts.append(f"{name} {latency} {mark}" + (f" ({stats.failures} err)" if stats.failures else ""))
+        return " · ".join(parts)
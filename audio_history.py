@@ -0,0 +1,99 @@
+# audio_history.py - Historial de audio de los últimos minutos en un archivo mapeado en memoria
+
+import os
+from collections import deque
+import numpy as np
+
+MAGIC = 0x5453494856524A  # "JRVHIST"
+HEADER_FIELDS = 5          # magic, rate, channels, capacidad, posición
+HEADER_BYTES = 64
+MAX_UTTERANCES = 20
+
+
+class AudioHistory:
+    """Buffer circular de tamaño fijo en disco (``mmap``) con todo lo que entra por la captura.
+
+    Escribir es una copia a la caché de páginas; el sistema vuelca a disco por
+    su cuenta, así que el coste es despreciable. Las posiciones son absolutas
+    (muestras desde que se creó el archivo) y sobreviven a reinicios de Jarvis
+    mientras no cambien el formato ni la duración.
+    """
+
+    def __init__(self, path, minutes, rate, channels):
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.capacity = int(minutes * 60 * rate) * channels
+        self.utterances = deque(maxlen=MAX_UTTERANCES)
+        if not self._compatible():
+            self._create()
+        self._header = np.memmap(path, dtype=np.int64, mode="r+", shape=(HEADER_FIELDS,))
+        self._data = np.memmap(path, dtype=np.int16, mode="r+", offset=HEADER_BYTES, shape=(self.capacity,))
+
+    def _compatible(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != HEADER_BYTES + self.capacity * 2:
+            return False
+        header = np.fromfile(self.path, dtype=np.int64, count=HEADER_FIELDS)
+        return list(header[:4]) == [MAGIC, self.rate, self.channels, self.capacity]
+
+    def _create(self):
+        with open(self.path, "wb") as f:
+            f.write(np.array([MAGIC, self.rate, self.channels, self.capacity, 0], dtype=np.int64).tobytes())
+            f.truncate(HEADER_BYTES + self.capacity * 2)
+
+    @property
+    def position(self):
+        return int(self._header[4])
+
+    @property
+    def samples_per_second(self):
+        return self.rate * self.channels
+
+    def write(self, samples):
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        pos = self.position
+        start = (pos + n - len(samples)) % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        if first < len(samples):
+            self._data[:len(samples) - first] = samples[first:]
+        self._header[4] = pos + n
+
+    def read(self, start, end=None):
+        """Muestras int16 entre dos posiciones absolutas (recortadas a lo que aún se conserva)."""
+        pos = self.position
+        end = pos if end is None else min(end, pos)
+        start = max(start, pos - self.capacity, 0)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        a, b = start % self.capacity, end % self.capacity
+        if a < b or b == 0:
+            return np.array(self._data[a:b or self.capacity])
+        return np.concatenate((self._data[a:], self._data[:b]))
+
+    def read_seconds_ago(self, start_seconds, end_seconds=0.0):
+        """Audio entre hace ``start_seconds`` y hace ``end_seconds`` segundos."""
+        pos = self.position
+        sps = self.samples_per_second
+        return self.read(pos - int(start_seconds * sps), pos - int(end_seconds * sps))
+
+    def mark_utterance(self, start, end):
+        self.utterances.append((start, end))
+
+    def last_utterance(self, skip=0):
+        """Audio de la última frase grabada (``skip`` salta las más recientes), o None."""
+        if len(self.utterances) <= skip:
+            return None
+        start, end = self.utterances[-1 - skip]
+        audio = self.read(start, end)
+        return audio if len(audio) else None
+
+    @property
+    def seconds_stored(self):
+        return min(self.position, self.capacity) / self.samples_per_second
+
+    def close(self):
+        self._header.flush()
+        self._data.flush()
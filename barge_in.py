@@ -0,0 +1,94 @@
+# barge_in.py - Detección de interrupciones del usuario mientras Jarvis habla
+
+import threading
+import numpy as np
+from config_loader import VOLUME_THRESHOLD, BARGE_IN_ECHO_RATIO, DEBUG_STT
+from vad import frame_length_for, frame_features, ONSET_SECONDS
+
+CALIBRATION_SECONDS = 0.3
+ECHO_DECAY = 0.998
+ECHO_RISE = 0.05
+MAX_FLATNESS = 0.45
+MAX_ZCR = 0.35
+
+
+class BargeInMonitor:
+    """Vigila el buffer de captura durante la reproducción del TTS.
+
+    Puerta de eco por energía: los primeros ``CALIBRATION_SECONDS`` miden
+    cuánto de la propia voz de Jarvis llega al micrófono, y ese nivel se sigue
+    actualizando (con caída lenta) con lo que no se considera interrupción.
+    Solo cuenta como interrupción la voz que supera ``echo_ratio`` veces ese
+    eco durante ``ONSET_SECONDS`` seguidos; entonces se llama a
+    ``on_barge_in()`` y ``onset_pos`` queda en la posición donde empezó.
+    """
+
+    def __init__(self, capture, on_barge_in=None, echo_ratio=None):
+        self.capture = capture
+        self.on_barge_in = on_barge_in
+        self.echo_ratio = BARGE_IN_ECHO_RATIO if echo_ratio is None else echo_ratio
+        self.onset_pos = None
+        self.echo_level = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def triggered(self):
+        return self.onset_pos is not None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        capture = self.capture
+        frame = frame_length_for(capture.rate)
+        block = frame * capture.channels
+        onset_frames = max(1, int(np.ceil(ONSET_SECONDS * capture.rate / frame)))
+        pos = capture.position
+        calibrate_until = pos + int(CALIBRATION_SECONDS * capture.samples_per_second)
+        run = 0
+
+        while not self._stop.is_set():
+            if not capture.wait_for(pos + 2 * block, timeout=0.2):
+                if not capture.running:
+                    return
+                continue
+            # Una sola lectura: la fuente puede escribir entre dos y desalinear el bloque
+            position = capture.position
+            end = position - (position - pos) % block
+            samples = capture.read(pos, end).astype(np.float32) / 32768.0
+            if capture.channels > 1:
+                samples = samples.reshape(-1, capture.channels).mean(axis=1)
+            energy, zcr, flatness = frame_features(samples.reshape(-1, frame))
+            voiced = (flatness < MAX_FLATNESS) & (zcr < MAX_ZCR)
+
+            for i, e in enumerate(energy):
+                frame_pos = pos + i * block
+                if frame_pos < calibrate_until:
+                    self.echo_level = max(self.echo_level, float(e))
+                    continue
+                threshold = max(self.echo_level * self.echo_ratio, VOLUME_THRESHOLD)
+                if e > threshold and voiced[i]:
+                    run += 1
+                    if run >= onset_frames:
+                        self.onset_pos = frame_pos - (run - 1) * block
+                        if DEBUG_STT:
+                            print(f"[DEBUG STT] Interrupción: energía {e:.4f} > umbral {threshold:.4f} "
+                                  f"(eco {self.echo_level:.4f})")
+                        if self.on_barge_in is not None:
+                            self.on_barge_in()
+                        return
+                else:
+                    run = 0
+                    # Sube despacio y baja más despacio aún: una voz que crece no arrastra el umbral
+                    if e > self.echo_level:
+                        self.echo_level += ECHO_RISE * (float(e) - self.echo_level)
+                    else:
+                        self.echo_level = max(float(e), self.echo_level * ECHO_DECAY)
+            pos = end
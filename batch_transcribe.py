@@ -0,0 +1,163 @@
+# batch_transcribe.py - Transcripción offline de carpetas de grabaciones en varios procesos
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config_loader import USE_GPU, STT_CPU_THREADS
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a", ".webm")
+DEFAULT_OUTPUT = "transcripciones.jsonl"
+
+
+def find_audio_files(target):
+    """Archivos de audio de una carpeta (recursiva) o de un patrón glob."""
+    if os.path.isdir(target):
+        paths = []
+        for root, _, names in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in names if name.lower().endswith(AUDIO_EXTENSIONS))
+    else:
+        paths = [path for path in glob.glob(target, recursive=True) if os.path.isfile(path)]
+    return sorted(paths)
+
+
+def load_records(output_path):
+    """Un registro por archivo de una ejecución anterior; uno sin error prevalece sobre los fallidos."""
+    records = {}
+    if not os.path.exists(output_path):
+        return records
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última línea a medias si la ejecución se interrumpió escribiendo
+                continue
+            previous = records.get(record["file"])
+            if previous is None or previous.get("error") or not record.get("error"):
+                records[record["file"]] = record
+    return records
+
+
+def load_done(output_path):
+    """Archivos ya transcritos sin error en una ejecución anterior (para reanudar)."""
+    return {path for path, record in load_records(output_path).items() if not record.get("error")}
+
+
+def _ends_mid_line(path):
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def prepare_resume(output_path, files):
+    """Archivos que faltan por transcribir (los nuevos y los que fallaron).
+
+    Cada reintento escribe su propia línea, así que antes se reescribe el JSONL
+    con un registro por archivo y sin los errores que se van a reintentar (ni
+    una última línea rota): al terminar no queda ningún archivo duplicado.
+    """
+    records = load_records(output_path)
+    pending = [path for path in files if path not in records or records[path].get("error")]
+    retry = records.keys() & set(pending)
+    if pending and (retry or _ends_mid_line(output_path)):
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for path, record in records.items():
+                if path not in retry:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, output_path)
+    return pending
+
+
+def _init_worker(cpu_threads):
+    """Cada proceso carga su propio modelo Whisper con la misma configuración que Jarvis."""
+    import stt
+    from stt_models import WhisperModelManager
+    stt.DEBUG_STT = False
+    stt.model_manager = WhisperModelManager(cpu_threads=cpu_threads, idle_unload=0)
+
+
+def _transcribe_file(path):
+    import stt
+    from corrections import apply_corrections
+    from faster_whisper import decode_audio
+
+    record = {"file": path}
+    t0 = time.time()
+    try:
+        audio = decode_audio(path, sampling_rate=stt.WHISPER_SAMPLE_RATE)
+        record["duration"] = round(len(audio) / stt.WHISPER_SAMPLE_RATE, 3)
+        if stt.STT_TRIM_SILENCE:
+            audio = stt.trim_to_speech(audio)
+        t_decode = time.time()
+        text, info, escalated = stt.decode(audio)
+        record["decode_seconds"] = round(time.time() - t_decode, 3)
+        record["raw_text"] = text
+        record["text"] = apply_corrections(stt.filter_transcript(text))
+        record["language_probability"] = round(info.language_probability, 3)
+        record["escalated"] = escalated
+    except Exception as e:
+        record["error"] = str(e)
+    record["total_seconds"] = round(time.time() - t0, 3)
+    return record
+
+
+def default_jobs():
+    """Con GPU un solo proceso comparte la tarjeta; en CPU, un proceso por cada 4 núcleos."""
+    if USE_GPU:
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return 1
+        except ImportError:
+            pass
+    return max(1, (os.cpu_count() or 4) // 4)
+
+
+def transcribe_batch(target, output_path=None, jobs=None):
+    output_path = output_path or DEFAULT_OUTPUT
+    files = find_audio_files(target)
+    if not files:
+        print(f"❌ No se encontraron archivos de audio en {target}")
+        return None
+
+    pending = prepare_resume(output_path, files)
+    if len(pending) < len(files):
+        print(f"↩️ Reanudando: {len(files) - len(pending)} de {len(files)} archivos ya estaban transcritos")
+    if not pending:
+        print(f"✅ Nada que hacer, todo está en {output_path}")
+        return output_path
+
+    jobs = jobs or default_jobs()
+    cpu_threads = STT_CPU_THREADS or max(1, (os.cpu_count() or 4) // jobs)
+    print(f"🗂️ Transcribiendo {len(pending)} archivos con {jobs} procesos ({cpu_threads} hilos cada uno) → {output_path}")
+
+    started = time.time()
+    audio_seconds = decode_seconds = 0.0
+    errors = 0
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cpu_threads,)) as pool:
+        futures = [pool.submit(_transcribe_file, path) for path in pending]
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Cada resultado queda en disco al momento: si se interrumpe, se reanuda desde aquí
+            out.flush()
+            if record.get("error"):
+                errors += 1
+                print(f"   [{i}/{len(pending)}] ❌ {record['file']}: {record['error']}")
+                continue
+            audio_seconds += record["duration"]
+            decode_seconds += record["decode_seconds"]
+            print(f"   [{i}/{len(pending)}] {record['file']} ({record['duration']:.1f}s en "
+                  f"{record['decode_seconds']:.2f}s): {record['text']}")
+
+    elapsed = time.time() - started
+    rtf = f", RTF {elapsed / audio_seconds:.3f}" if audio_seconds else ""
+    print(f"✅ {len(pending) - errors} archivos ({audio_seconds / 60:.1f} min de audio) en {elapsed:.1f}s"
+          f"{rtf}{f', {errors} con error' if errors else ''} → {output_path}")
+    return output_path
@@ -0,0 +1,200 @@
+# cancellation.py - Comandos cancelables: tokens de cancelación y ejecución de un comando a la vez
+
+import queue
+import re
+import threading
+from collections import deque
+
+CANCEL_GRACE = 2.0
+
+CANCEL_WORDS = {"para", "parar", "páralo", "cancela", "cancelar", "cancélalo", "detente", "basta", "stop",
+                "cállate", "callate", "silencio"}
+_CANCEL_FILLER = {"ya", "jarvis", "por", "favor", "eso", "vale", "ok"}
+
+_ITEM, _END, _ERROR, _CANCELLED = range(4)
+
+
+def is_cancel_request(text):
+    """"Para", "cancela", "para ya, por favor"... pero no "para qué sirve esto"."""
+    words = re.findall(r"\w+", text.lower())
+    return bool(words) and len(words) <= 4 and words[0] in CANCEL_WORDS and \
+        all(w in CANCEL_WORDS or w in _CANCEL_FILLER for w in words)
+
+
+class CommandCancelled(Exception):
+    """El comando en curso se canceló (comando nuevo, "para"/"cancelar" o Escape)."""
+
+
+class CancelToken:
+    """Señal de cancelación compartida por todo lo que hace un comando.
+
+    ``on_cancel`` registra acciones que deben ejecutarse al cancelar (cortar el
+    TTS, desbloquear una espera); si el token ya está cancelado se ejecutan al
+    momento.
+    """
+
+    def __init__(self):
+        self.reason = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason=None):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Error al cancelar: {e}")
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CommandCancelled(self.reason)
+
+
+def run_cancellable(token, fn, *args):
+    """Ejecuta ``fn(*args)`` en otro hilo y devuelve su resultado, o lanza ``CommandCancelled`` al cancelar.
+
+    La llamada no se puede interrumpir desde fuera (una petición HTTP síncrona,
+    una integración): sigue en segundo plano y su resultado se descarta.
+    """
+    token.raise_if_cancelled()
+    results = queue.Queue()
+
+    def worker():
+        try:
+            results.put((_END, fn(*args)))
+        except Exception as e:
+            results.put((_ERROR, e))
+
+    threading.Thread(target=worker, daemon=True).start()
+    token.on_cancel(lambda: results.put((_CANCELLED, None)))
+    kind, value = results.get()
+    if kind == _CANCELLED:
+        raise CommandCancelled(token.reason)
+    if kind == _ERROR:
+        raise value
+    return value
+
+
+def iterate_cancellable(token, iterable):
+    """Recorre ``iterable`` desde otro hilo; al cancelar, el consumidor sale al momento con ``CommandCancelled``.
+
+    El hilo que lee deja de pedir elementos y cierra el iterable (por ejemplo,
+    la conexión de streaming con el proveedor) en cuanto llega el siguiente.
+    """
+    token.raise_if_cancelled()
+    items = queue.Queue()
+    stop = threading.Event()
+
+    def pump():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if stop.is_set() or token.cancelled:
+                    break
+                items.put((_ITEM, item))
+            items.put((_END, None))
+        except Exception as e:
+            items.put((_ERROR, e))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    threading.Thread(target=pump, daemon=True).start()
+    token.on_cancel(lambda: items.put((_CANCELLED, None)))
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == _ITEM:
+                yield value
+            elif kind == _END:
+                return
+            elif kind == _ERROR:
+                raise value
+            else:
+                raise CommandCancelled(token.reason)
+    finally:
+        stop.set()
+
+
+class CommandRunner:
+    """Ejecuta los comandos de uno en uno, cada uno en su hilo y con su ``CancelToken``.
+
+    ``submit`` cancela el comando en curso, le da hasta ``grace`` segundos para
+    soltar lo que tenga (TTS, streaming) y arranca el nuevo con ``fn(*args, token)``.
+    ``enqueue`` no interrumpe: el comando espera a que no quede ninguno en curso.
+    """
+
+    def __init__(self, grace=CANCEL_GRACE):
+        self.grace = grace
+        self._current = None
+        self._queued = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    def submit(self, fn, *args, reason="comando nuevo"):
+        token = CancelToken()
+        thread = threading.Thread(target=self._run, args=(token, fn, args), daemon=True)
+        with self._lock:
+            previous, self._current = self._current, (token, thread)
+        if previous is not None:
+            previous_token, previous_thread = previous
+            previous_token.cancel(reason)
+            # Un comando puede lanzar otro (p. ej. tras una interrupción): no esperarse a sí mismo
+            if previous_thread is not threading.current_thread() and previous_thread.is_alive():
+                previous_thread.join(self.grace)
+        thread.start()
+        return token
+
+    def enqueue(self, fn, *args):
+        """Arranca ``fn`` cuando termine el comando en curso (o ya, si no hay ninguno)."""
+        with self._lock:
+            if self._current is not None:
+                self._queued.append((fn, args))
+                return
+            self._start_locked(fn, args)
+
+    def _start_locked(self, fn, args):
+        token = CancelToken()
+        thread = threading.Thread(target=self._run, args=(token, fn, args), daemon=True)
+        self._current = (token, thread)
+        thread.start()
+
+    def cancel(self, reason=None):
+        """Cancela el comando en curso. Devuelve False si no había ninguno."""
+        with self._lock:
+            current = self._current
+        if current is None:
+            return False
+        current[0].cancel(reason)
+        return True
+
+    def _run(self, token, fn, args):
+        try:
+            fn(*args, token)
+        finally:
+            with self._lock:
+                if self._current is not None and self._current[0] is token:
+                    self._current = None
+                    if self._queued:
+                        self._start_locked(*self._queued.popleft())
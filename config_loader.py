@@ -14,11 +14,23 @@ except Exception as e:
 def _update_module_variables():
     """Actualiza todas las variables del módulo basándose en el config actual"""
     global VOICE_INPUT_ENABLED, SAMPLE_RATE, CHANNELS, VOLUME_THRESHOLD, VAD_MODE
-    global WAKE_WORDS, WAKE_DURATION, COMMAND_DURATION, WHISPER_MODEL_SIZE, USE_GPU
-    global TTS_MODE, AI_PROVIDER, DEBUG_AI, DEBUG_TTS, DEBUG_STT, AI_MODE
-    global SPEECH_THRESHOLD_MULTIPLIER, SILENCE_DURATION, MIN_RECORDING_DURATION, MIN_FILE_SIZE
+    global WAKE_WORDS, WAKE_DURATION, COMMAND_DURATION, INTERACTIVE_MODE_DURATION, WHISPER_MODEL_SIZE, USE_GPU
+    global TTS_MODE, AI_PROVIDER, AI_STREAMING, DEBUG_AI, DEBUG_TTS, DEBUG_STT, AI_MODE
+    global SPEECH_THRESHOLD_MULTIPLIER, SILENCE_DURATION, MIN_RECORDING_DURATION, MIN_FILE_SIZE, PREROLL_MS
     global WHISPER_NO_SPEECH_THRESHOLD, WHISPER_TEMPERATURE, WHISPER_LOG_PROB_THRESHOLD
     global ELEVEN_KEY, VOICE_ID, LOCAL_TTS_VOICE, LOCAL_TTS_RATE
+    global STT_STREAMING, STT_PARTIAL_INTERVAL, STT_TIERS, STT_BEAM_SIZE
+    global STT_ADAPTIVE_DECODING, STT_ESCALATE_LOGPROB, STT_ESCALATE_COMPRESSION
+    global STT_TRIM_SILENCE, STT_TRIM_PADDING, STT_TRIM_MERGE_GAP
+    global STT_WORKER_PROCESS
+    global STT_COMPUTE_TYPE, STT_CPU_THREADS, STT_NUM_WORKERS, STT_IDLE_UNLOAD_SECONDS
+    global AUDIO_SOURCE_TYPE, AUDIO_SOURCE_PATH, AUDIO_SOURCE_REALTIME, AUDIO_SOURCE_GAP_SECONDS, AUDIO_SOURCE_LOOP
+    global BARGE_IN_ENABLED, BARGE_IN_ECHO_RATIO
+    global AI_ROUTER_ENABLED, AI_ROUTER_HEDGE, AI_ROUTER_HEDGE_MIN_DELAY
+    global AI_CACHE_ENABLED, AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL, AI_CACHE_PATH, AI_CACHE_NEVER_CACHE
+    global LOCAL_INTENTS_ENABLED
+    global AUDIO_HISTORY_ENABLED, AUDIO_HISTORY_MINUTES, AUDIO_HISTORY_PATH
+    global WAKE_SPOTTER_ENABLED, WAKE_SPOTTER_TEMPLATES_DIR, WAKE_SPOTTER_THRESHOLD
     global groq_key, openai_key, gemini_key, claude_key
     
     # Configuración general
@@ -30,10 +42,12 @@ def _update_module_variables():
     WAKE_WORDS = config.get("wake_words", ["jarvis", "oye jarvis", "hey jarvis"])
     WAKE_DURATION = config.get("wake_duration", 4)
     COMMAND_DURATION = config.get("command_duration", 8)
+    INTERACTIVE_MODE_DURATION = config.get("interactive_mode_duration", 10)
     WHISPER_MODEL_SIZE = config.get("whisper_model_size", "small")
     USE_GPU = config.get("use_gpu", True)
     TTS_MODE = config.get("tts", "local")
     AI_PROVIDER = config.get("ai_provider", "groq")
+    AI_STREAMING = config.get("ai_streaming", True)
     DEBUG_AI = config.get("debug_ai", False)
     DEBUG_TTS = config.get("debug_tts", False)
     DEBUG_STT = config.get("debug_stt", False)
@@ -44,12 +58,73 @@ def _update_module_variables():
     SILENCE_DURATION = config.get("silence_duration", 1.5)
     MIN_RECORDING_DURATION = config.get("min_recording_duration", 1.0)
     MIN_FILE_SIZE = config.get("min_file_size", 1000)
+    PREROLL_MS = config.get("preroll_ms", 500)
+
+    # Fuente de audio: micrófono, reproducción de WAVs o tubería con nombre
+    audio_source_config = config.get("audio_source", {})
+    AUDIO_SOURCE_TYPE = audio_source_config.get("type", "microphone")
+    AUDIO_SOURCE_PATH = audio_source_config.get("path")
+    AUDIO_SOURCE_REALTIME = audio_source_config.get("realtime", True)
+    AUDIO_SOURCE_GAP_SECONDS = audio_source_config.get("gap_seconds", 1.5)
+    AUDIO_SOURCE_LOOP = audio_source_config.get("loop", False)
+
+    # Interrupción de la respuesta hablada cuando el usuario empieza a hablar
+    barge_in_config = config.get("barge_in", {})
+    BARGE_IN_ENABLED = barge_in_config.get("enabled", False)
+    BARGE_IN_ECHO_RATIO = barge_in_config.get("echo_ratio", 2.0)
+
+    # Historial de audio de los últimos minutos (archivo mapeado en memoria)
+    audio_history_config = config.get("audio_history", {})
+    AUDIO_HISTORY_ENABLED = audio_history_config.get("enabled", False)
+    AUDIO_HISTORY_MINUTES = audio_history_config.get("minutes", 10)
+    AUDIO_HISTORY_PATH = audio_history_config.get("path", "audio_history.bin")
+
+    # Enrutado entre todos los proveedores de IA con clave
+    ai_router_config = config.get("ai_router", {})
+    AI_ROUTER_ENABLED = ai_router_config.get("enabled", True)
+    AI_ROUTER_HEDGE = ai_router_config.get("hedge", False)
+    AI_ROUTER_HEDGE_MIN_DELAY = ai_router_config.get("hedge_min_delay", 0.3)
+
+    # Caché de respuestas de la IA
+    ai_cache_config = config.get("ai_cache", {})
+    AI_CACHE_ENABLED = ai_cache_config.get("enabled", True)
+    AI_CACHE_MAX_ENTRIES = ai_cache_config.get("max_entries", 500)
+    AI_CACHE_TTL = ai_cache_config.get("ttl_seconds", 86400)
+    AI_CACHE_PATH = ai_cache_config.get("path", "ai_cache.json")
+    AI_CACHE_NEVER_CACHE = ai_cache_config.get("never_cache", [])
+
+    # Hora, fecha, temporizadores y cálculos se responden en local, sin red
+    LOCAL_INTENTS_ENABLED = config.get("local_intents", True)
 
     # Configuración avanzada de Whisper
     WHISPER_NO_SPEECH_THRESHOLD = config.get("whisper_no_speech_threshold", 0.6)
     WHISPER_TEMPERATURE = config.get("whisper_temperature", 0.0)
     WHISPER_LOG_PROB_THRESHOLD = config.get("whisper_log_prob_threshold", -1.0)
 
+    # Configuración del motor STT
+    stt_config = config.get("stt", {})
+    STT_STREAMING = stt_config.get("streaming", False)
+    STT_PARTIAL_INTERVAL = stt_config.get("partial_interval", 0.4)
+    STT_TIERS = stt_config.get("tiers", {})
+    STT_BEAM_SIZE = stt_config.get("beam_size", 5)
+    STT_ADAPTIVE_DECODING = stt_config.get("adaptive_decoding", True)
+    STT_ESCALATE_LOGPROB = stt_config.get("escalate_logprob", -0.6)
+    STT_ESCALATE_COMPRESSION = stt_config.get("escalate_compression", 2.4)
+    STT_TRIM_SILENCE = stt_config.get("trim_silence", True)
+    STT_TRIM_PADDING = stt_config.get("trim_padding", 0.2)
+    STT_TRIM_MERGE_GAP = stt_config.get("trim_merge_gap", 0.3)
+    STT_COMPUTE_TYPE = stt_config.get("compute_type", "default")
+    STT_CPU_THREADS = stt_config.get("cpu_threads", 0)
+    STT_NUM_WORKERS = stt_config.get("num_workers", 1)
+    STT_IDLE_UNLOAD_SECONDS = stt_config.get("idle_unload_seconds", 300)
+    STT_WORKER_PROCESS = stt_config.get("worker_process", False)
+
+    # Detector ligero de palabra de activación
+    wake_spotter_config = config.get("wake_spotter", {})
+    WAKE_SPOTTER_ENABLED = wake_spotter_config.get("enabled", False)
+    WAKE_SPOTTER_TEMPLATES_DIR = wake_spotter_config.get("templates_dir", "wake_templates")
+    WAKE_SPOTTER_THRESHOLD = wake_spotter_config.get("threshold", None)
+
     # Configuración ElevenLabs
     eleven_config = config.get("elevenlabs", {})
     ELEVEN_KEY = eleven_config.get("api_key")
@@ -91,12 +91,12 @@ class ConfigFileWatcher(EventListener):
             # Si el modo voz está habilitado, también escuchar por voz
             if self.agent.voice_input_enabled:
                 def voice_listener():
-                    from stt import record_audio, speech_to_text
+                    from stt import record_audio, speech_to_text, FAST_TIER
                     self.ui.set_mic_status(True)
-                    filename = record_audio(duration=timeout)
+                    audio = record_audio(duration=timeout)
                     self.ui.set_mic_status(False)
-                    if filename:
-                        text = speech_to_text(filename)
+                    if audio is not None:
+                        text = speech_to_text(audio, tier=FAST_TIER)
                         if text:
                             user_response[0] = text
                             response_received.set()
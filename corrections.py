@@ -1,13 +1,67 @@
 import json
+import os
+import re
+
+CORRECTIONS_FILE = "corrections.json"
+
+
+class CorrectionMatcher:
+    """Aplica todas las correcciones en una sola pasada de izquierda a derecha.
+
+    Las claves se compilan en una única alternancia de regex ordenada de más
+    larga a más corta, así que con claves solapadas ("oráis" / "qué oráis")
+    siempre gana la más larga, sin depender del orden del JSON. Las claves solo
+    casan con palabras completas y sin distinguir mayúsculas, y lo ya corregido
+    no se vuelve a corregir.
+    """
+
+    def __init__(self, corrections):
+        self._lookup = {wrong.lower(): right for wrong, right in corrections.items() if wrong.strip()}
+        keys = sorted(self._lookup, key=len, reverse=True)
+        self._regex = None
+        if keys:
+            alternation = "|".join(re.escape(key) for key in keys)
+            self._regex = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+    def apply(self, text):
+        if self._regex is None or not text:
+            return text
+        result = self._regex.sub(lambda m: self._lookup[m.group(0).lower()], text)
+        # Las correcciones vacías (ruido como "suscríbete") dejan espacios dobles
+        return " ".join(result.split()) if result != text else result
+
+
+def load_corrections(path=None):
+    path = path or CORRECTIONS_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"❌ No se pudo cargar {path}: {e}")
+        return None
+
+
+corrections = load_corrections() or {}
+_matcher = CorrectionMatcher(corrections)
+_mtime = os.path.getmtime(CORRECTIONS_FILE) if os.path.exists(CORRECTIONS_FILE) else None
+
+
+def get_matcher():
+    """Matcher actual; se recompila si corrections.json ha cambiado desde la última vez."""
+    global corrections, _matcher, _mtime
+    try:
+        mtime = os.path.getmtime(CORRECTIONS_FILE)
+    except OSError:
+        return _matcher
+    if mtime != _mtime:
+        _mtime = mtime
+        loaded = load_corrections()
+        # Un JSON a medio guardar no debe dejar a Jarvis sin correcciones
+        if loaded is not None:
+            corrections = loaded
+            _matcher = CorrectionMatcher(corrections)
+    return _matcher
 
-try:
-    with open("corrections.json", "r", encoding="utf-8") as f:
-        corrections = json.load(f)
-except Exception as e:
-    print(f"❌ No se pudo cargar corrections.json: {e}")
-    corrections = {}
 
 def apply_corrections(text):
-    for wrong, right in corrections.items():
-        text = text.replace(wrong, right)
-    return text
+    return get_matcher().apply(text)
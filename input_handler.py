@@ -1,7 +1,8 @@
 import threading
 import time
 from stt import record_audio, speech_to_text
-from config_loader import WAKE_WORD, INTERACTIVE_MODE_DURATION, VOICE_INPUT_ENABLED
+from config_loader import INTERACTIVE_MODE_DURATION, VOICE_INPUT_ENABLED
+from wake_words import get_wake_matcher
 
 DEBUG_INPUT = True
 
@@ -18,18 +19,19 @@ class InputHandler:
             return "salir"
 
     def get_voice_input(self):
-        filename = record_audio()
-        if filename:
-            text = speech_to_text(filename)
+        audio = record_audio()
+        if audio is not None:
+            text = speech_to_text(audio)
             return text
         return ""
 
     def process_input(self, text):
         text_lower = text.lower()
-        wake = WAKE_WORD.lower()
+        match = get_wake_matcher().find(text_lower)
 
-        if wake in text_lower:
-            after_wake = text_lower.split(wake, 1)[-1].strip()
+        if match:
+            wake = match.wake
+            after_wake = text_lower[match.end:].strip(" ,.")
             if after_wake:
                 if DEBUG_INPUT:
                     print(f"[DEBUG] Wake word '{wake}' + command detected: {after_wake}")
@@ -1,11 +1,28 @@
-from tts import init_tts, speak_response
-from ai import ask_ai
-from config_loader import WAKE_WORDS, DEBUG_STT, VOICE_INPUT_ENABLED, TTS_MODE
-from stt import record_audio, speech_to_text
+import time
+_process_started_at = time.time()
+
+from tts import init_tts, speak_response, stop_speaking, set_playback_callback, SpeechStream
+from ai import (
+    ask_ai, ask_ai_stream, flush_response_cache, get_cache_status, get_router_status, get_local_intents_status
+)
+from local_intents import get_intent_engine
+from config_loader import DEBUG_STT, VOICE_INPUT_ENABLED, TTS_MODE, STT_STREAMING, BARGE_IN_ENABLED, AI_STREAMING
+from stt import (
+    record_audio, speech_to_text, stream_speech_to_text,
+    get_audio_capture, start_audio_capture, stop_audio_capture, stop_stt_worker,
+    has_model_cascade, get_stt_timings, get_stt_model_status, set_model_status_callback,
+    preload_models, COMMAND_TIER, FAST_TIER, REVIEW_TIER
+)
+from wake_spotter import create_wake_spotter
+from wake_words import get_wake_matcher
+from barge_in import BargeInMonitor
+from cancellation import (
+    CommandRunner, CancelToken, CommandCancelled, run_cancellable, iterate_cancellable, is_cancel_request
+)
 from memory import Memory
 import threading
-import time
 import os
+import re
 import sys
 
 from ui_bridge import UIBridge
@@ -14,6 +31,35 @@ from config_display import format_config_display, get_config_summary
 
 from events_core import EventManager
 from config_reloader import ConfigFileWatcher
+from startup import BootOrchestrator
+
+BARGE_IN_PREROLL_MS = 100
+
+REVIEW_PHRASES = [
+    "qué acabo de decir", "que acabo de decir", "qué he dicho", "que he dicho",
+    "retranscribe", "vuelve a transcribir"
+]
+_REVIEW_RANGE = re.compile(r"hace\s+(\d+)\s+(?:a|y|hasta)\s+(?:hace\s+)?(\d+)\s+(segundos?|minutos?)")
+_REVIEW_LAST = re.compile(r"últimos?\s+(\d+)\s+(segundos?|minutos?)")
+
+def parse_review_request(text):
+    """Detecta peticiones de re-transcripción del historial de audio.
+
+    Devuelve None, o (inicio, fin) en segundos hacia atrás; (None, None) es la última frase.
+    """
+    if not any(phrase in text for phrase in REVIEW_PHRASES):
+        return None
+    match = _REVIEW_RANGE.search(text)
+    if match:
+        unit = 60 if match.group(3).startswith("minuto") else 1
+        a, b = int(match.group(1)) * unit, int(match.group(2)) * unit
+        return max(a, b), min(a, b)
+    match = _REVIEW_LAST.search(text)
+    if match:
+        unit = 60 if match.group(2).startswith("minuto") else 1
+        return int(match.group(1)) * unit, 0
+    return None, None
+
 
 class ThreadSafeStdoutRedirector:
     def __init__(self, ui_bridge):
@@ -58,31 +104,54 @@ class ThreadSafeStdoutRedirector:
 
 
 class JarvisAgent:
-    def __init__(self, ui: UIBridge):
+    def __init__(self, ui: UIBridge, boot: BootOrchestrator = None):
         self.ui = ui
+        self.boot = boot or BootOrchestrator()
         self.memory = Memory()
-        self.tts_engine = init_tts()
+        self.tts_engine = None
         self.running = True
         self.listening = True
         self.waiting_for_command = False
         self.voice_input_enabled = VOICE_INPUT_ENABLED
-        self.integrations_manager = create_integrations_manager()
+        self.commands = CommandRunner()
+        self.integrations_manager = None
         self.ui.set_jarvis_agent(self)
         self._audio_thread = None
+        self.wake_spotter = None
+        set_model_status_callback(self.report_stt_models)
+        set_playback_callback(get_audio_capture().mark_playback)
+        get_intent_engine().on_timer = self.timer_finished
+
+        # Las fases lentas arrancan en segundo plano; la UI y los comandos de texto no las esperan
+        self.boot.submit("tts", init_tts, self._set_tts_engine)
+        self.boot.submit("integraciones", create_integrations_manager, self._set_integrations_manager)
+        if self.voice_input_enabled:
+            self.boot.submit("whisper", preload_models)
+
+        self.event_manager = EventManager()
+        self.register_event_listeners()
+
+    def _set_tts_engine(self, engine):
+        self.tts_engine = engine
+
+    def _set_integrations_manager(self, manager):
+        self.integrations_manager = manager
 
+    def finish_boot(self):
+        """Espera a las fases en segundo plano y publica su estado en la UI."""
+        self.boot.wait()
         self.ui.send_message("Jarvis iniciado correctamente.", sender="System")
         self.ui.set_tts_engine(str(self.tts_engine.name if hasattr(self.tts_engine, 'name') else "Local"))
         self.ui.update_memory_info(memory_entries=self.memory.size(), corrections=self.memory.corrections_count())
+        self.report_stt_models()
 
-        capabilities = self.integrations_manager.get_all_capabilities()
-        self.ui.show_integrations(capabilities)
+        if self.integrations_manager is not None:
+            self.ui.show_integrations(self.integrations_manager.get_all_capabilities())
 
         # Mostrar solo resumen al inicio
         summary = get_config_summary()
         self.ui.send_message(f"🚀 CONFIGURACIÓN DE INICIO: {summary}", sender="System")
-
-        self.event_manager = EventManager()
-        self.register_event_listeners()
+        self.ui.send_message(self.boot.report(), sender="System")
 
     def show_full_configuration(self):
         """Muestra la configuración completa al usuario manualmente"""
@@ -100,6 +169,7 @@ class JarvisAgent:
         while not self.ui.ready:
             time.sleep(0.1)
         self.ui.send_message("Jarvis listo. Di 'Oye Jarvis' o escribe un comando.", sender="System")
+        self.finish_boot()
 
         if self.voice_input_enabled:
             self.start_audio_input()
@@ -108,6 +178,11 @@ class JarvisAgent:
 
     def start_audio_input(self):
         if self._audio_thread is None or not self._audio_thread.is_alive():
+            # El micrófono se abre una sola vez; todas las grabaciones leen del buffer compartido
+            if not start_audio_capture():
+                self.ui.send_message("⚠️ No se pudo abrir la fuente de audio.", sender="System")
+                return
+            self.wake_spotter = create_wake_spotter()
             self._audio_thread = threading.Thread(target=self.audio_input_loop, daemon=True)
             self._audio_thread.start()
             self.ui.send_message("🎤 Modo de voz activado.", sender="System")
@@ -115,24 +190,31 @@ class JarvisAgent:
     def stop_audio_input(self):
         if self._audio_thread and self._audio_thread.is_alive():
             self.ui.send_message("🔇 Modo de voz desactivado.", sender="System")
+        stop_audio_capture()
 
     def audio_input_loop(self):
         while self.running and self.voice_input_enabled:
+            if not get_audio_capture().running:
+                # Una reproducción de WAVs ha terminado o la tubería se ha cerrado
+                self.ui.send_message("🏁 La fuente de audio ya no entrega datos.", sender="System")
+                break
+
             if not self.listening:
                 time.sleep(0.1)
                 continue
 
-            if DEBUG_STT:
-                self.ui.send_message("[DEBUG STT] Escuchando...", sender="Debug")
-
-            self.ui.set_mic_status(True)
-            filename = record_audio(duration=12)
-            self.ui.set_mic_status(False)
+            if self.wake_spotter is not None and not self.waiting_for_command:
+                self.spotter_input_step()
+                continue
 
-            if not filename:
+            if has_model_cascade() and not STT_STREAMING and not self.waiting_for_command:
+                self.cascade_input_step()
                 continue
 
-            text = speech_to_text(filename)
+            if DEBUG_STT:
+                self.ui.send_message("[DEBUG STT] Escuchando...", sender="Debug")
+
+            text = self.listen(duration=12)
             if not text:
                 continue
 
@@ -140,41 +222,174 @@ class JarvisAgent:
             if DEBUG_STT:
                 self.ui.send_message(f"[DEBUG STT] Texto recibido tras STT: '{text}'", sender="Debug")
 
-            wake_detected = None
-            for wake in WAKE_WORDS:
-                if wake in text:
-                    wake_detected = wake
-                    break
-
-            if wake_detected:
-                after_wake = text.split(wake_detected, 1)[-1].strip(" ,")
+            wake_match = get_wake_matcher().find(text)
+            if wake_match:
+                if DEBUG_STT:
+                    self.ui.send_message(f"[DEBUG STT] Activación '{wake_match.wake}' en '{wake_match.heard}' "
+                                         f"(puntuación {wake_match.score:.2f})", sender="Debug")
+                after_wake = text[wake_match.end:].strip(" ,.")
                 if after_wake:
-                    self.process_command(after_wake, from_voice=True)
+                    self.submit_command(after_wake, from_voice=True)
                 else:
                     self.ui.send_message("Te escucho. ¿Qué necesitas?", sender="Jarvis")
                     speak_response("Te escucho. ¿Qué necesitas?", self.tts_engine)
                     self.waiting_for_command = True
                     self.await_command_window()
+                    self.waiting_for_command = False
             elif self.waiting_for_command:
-                self.process_command(text, from_voice=True)
+                self.submit_command(text, from_voice=True)
                 self.waiting_for_command = False
 
+    def spotter_input_step(self):
+        """Espera a que el spotter MFCC detecte la palabra de activación y solo entonces usa Whisper."""
+        position = self.wake_spotter.wait_for_wake(
+            get_audio_capture(),
+            lambda: self.running and self.voice_input_enabled and self.listening
+        )
+        if position is None:
+            return
+
+        if DEBUG_STT:
+            self.ui.send_message(
+                f"[DEBUG STT] Wake spotter activado (distancia {self.wake_spotter.last_distance:.2f})", sender="Debug"
+            )
+        text = self.listen(duration=12).lower()
+        command = get_wake_matcher().command_after(text)
+        if command is None:
+            command = text.strip(" ,.")
+        if command:
+            self.submit_command(command, from_voice=True)
+        else:
+            self.ui.send_message("Te escucho. ¿Qué necesitas?", sender="Jarvis")
+            speak_response("Te escucho. ¿Qué necesitas?", self.tts_engine)
+            self.await_command_window()
+
+    def cascade_input_step(self):
+        """El modelo rápido busca la palabra de activación; el de comandos re-decodifica el mismo audio."""
+        self.ui.set_mic_status(True)
+        try:
+            audio = record_audio(duration=12)
+        finally:
+            self.ui.set_mic_status(False)
+        if audio is None:
+            return
+
+        text = speech_to_text(audio, tier=FAST_TIER).lower()
+        self.report_stt_timings()
+        matcher = get_wake_matcher()
+        if matcher.find(text) is None:
+            return
+
+        if DEBUG_STT:
+            self.ui.send_message(f"[DEBUG STT] [{FAST_TIER}] Activación detectada en: '{text}'", sender="Debug")
+        command_text = speech_to_text(audio, tier=COMMAND_TIER).lower()
+        self.report_stt_timings()
+        after_wake = matcher.command_after(command_text)
+        if after_wake is None:
+            after_wake = matcher.command_after(text)
+        if after_wake:
+            self.submit_command(after_wake, from_voice=True)
+        else:
+            self.ui.send_message("Te escucho. ¿Qué necesitas?", sender="Jarvis")
+            speak_response("Te escucho. ¿Qué necesitas?", self.tts_engine)
+            self.await_command_window()
+
+    def listen(self, duration=12, streaming=None, tier=COMMAND_TIER, start_pos=None):
+        """Graba y transcribe una frase. En modo streaming muestra hipótesis parciales en la UI.
+
+        ``start_pos`` hace que la frase empiece en esa posición del buffer de captura.
+        """
+        if streaming is None:
+            streaming = STT_STREAMING
+        self.ui.set_mic_status(True)
+        try:
+            if streaming:
+                return stream_speech_to_text(on_partial=self.show_partial_transcript, max_duration=duration,
+                                             start_pos=start_pos)
+            # Tras una interrupción el pre-roll sería eco de la propia respuesta
+            audio = record_audio(duration=duration, start_pos=start_pos,
+                                 preroll_ms=BARGE_IN_PREROLL_MS if start_pos is not None else None)
+            if audio is None:
+                return ""
+            self.ui.set_mic_status(False)
+            text = speech_to_text(audio, tier=tier)
+            self.report_stt_timings()
+            return text
+        finally:
+            self.ui.set_mic_status(False)
+
+    def review_transcription(self, start_seconds, end_seconds, from_voice=True):
+        """Re-transcribe audio del historial con el tier de revisión y guarda el resultado en memoria."""
+        history = get_audio_capture().history
+        if history is None:
+            self.ui.send_message("⚠️ El historial de audio está desactivado (audio_history.enabled).", sender="System")
+            return
+
+        if start_seconds is None:
+            # Por voz, la frase más reciente es la propia petición
+            audio = history.last_utterance(skip=1 if from_voice else 0)
+            label = "la última frase"
+        else:
+            audio = history.read_seconds_ago(start_seconds, end_seconds)
+            label = f"de hace {start_seconds}s a hace {end_seconds}s"
+        if audio is None or not len(audio):
+            self.ui.send_message("⚠️ No hay audio guardado para eso.", sender="System")
+            return
+
+        self.ui.send_message(f"🔁 Re-transcribiendo {label} ({len(audio) / history.samples_per_second:.1f}s) "
+                             f"con el modelo '{REVIEW_TIER}'...", sender="System")
+        text = speech_to_text(audio, tier=REVIEW_TIER)
+        self.report_stt_timings()
+        if text:
+            self.memory.add_entry(f"[Re-transcripción de {label}] {text}")
+            self.ui.update_memory_info(memory_entries=self.memory.size(), corrections=self.memory.corrections_count())
+            response = f"Dijiste: «{text}»"
+        else:
+            response = "No he entendido nada en ese audio."
+        self.ui.send_message(response, sender="Jarvis")
+        if from_voice and self.voice_input_enabled:
+            speak_response(response, self.tts_engine)
+
+    def report_stt_timings(self):
+        self.ui.update_stt_timings(get_stt_timings())
+
+    def report_stt_models(self):
+        self.ui.update_stt_models(get_stt_model_status())
+
+    def show_partial_transcript(self, text):
+        self.ui.send_message(f"… {text}", sender="Parcial")
+
     def await_command_window(self, duration=10):
         start = time.time()
         while time.time() - start < duration and self.running:
-            self.ui.set_mic_status(True)
-            filename = record_audio(duration=12)
-            self.ui.set_mic_status(False)
-            if not filename:
-                continue
-            text = speech_to_text(filename)
+            text = self.listen(duration=12)
             if not text:
                 continue
-            self.process_command(text, from_voice=True)
+            self.submit_command(text, from_voice=True)
             break
 
-    def process_command(self, command, from_voice=True):
-        self.listening = False
+    def submit_command(self, command, from_voice=True):
+        """Ejecuta el comando en segundo plano cancelando el que esté en curso.
+
+        "Para"/"cancelar" solo cancelan; la entrada (voz o texto) sigue
+        escuchando mientras el comando piensa, así que lo último que se dice o
+        escribe siempre manda.
+        """
+        if is_cancel_request(command):
+            self.cancel_command("voz" if from_voice else "texto")
+            return
+        self.commands.submit(self.process_command, command, from_voice)
+
+    def cancel_command(self, reason):
+        """Aborta el comando en curso: petición a la IA, integración y voz."""
+        stop_speaking()
+        if not self.commands.cancel(reason):
+            self.ui.send_message("Nada que cancelar.", sender="System")
+
+    def process_command(self, command, from_voice=True, token=None):
+        token = token or CancelToken()
+        token.on_cancel(stop_speaking)
+        barge_in = None
         try:
             self.ui.send_message(f"🔴 Procesando comando: '{command}'", sender="Debug")
             if not command or len(command.strip()) < 3:
@@ -192,30 +407,151 @@ class JarvisAgent:
                 self.show_full_configuration()
                 return
 
+            review = parse_review_request(normalized)
+            if review is not None:
+                self.review_transcription(*review, from_voice=from_voice)
+                return
+
             self.ui.send_message(f"🧬 Pensando sobre: '{command}'", sender="Jarvis")
 
-            integration_response = self.integrations_manager.process_command(command)
+            integration_response = None
+            if self.integrations_manager is not None:
+                integration_response = run_cancellable(token, self.integrations_manager.process_command, command)
+            spoken = from_voice and self.voice_input_enabled
+            streamed = False
             if integration_response:
                 response = integration_response.get("response", "Comando procesado por integración.")
+            elif AI_STREAMING:
+                response, barge_in = self.stream_ai_response(command, spoken, token)
+                streamed = True
             else:
-                response = ask_ai(command, self.memory)
+                response = run_cancellable(token, ask_ai, command, self.memory)
+            self.ui.update_ai_cache(get_cache_status())
+            self.ui.update_ai_router(get_router_status())
+            self.ui.update_local_intents(get_local_intents_status())
 
-            if response and response.strip():
+            if not (response and response.strip()):
+                self.ui.send_message("⚠️ No se pudo generar respuesta", sender="System")
+            elif not streamed:
                 self.ui.send_message(response, sender="Jarvis")
-                if from_voice and self.voice_input_enabled:
+                if spoken:
                     self.ui.send_message("🔊 Reproduciendo por voz...", sender="System")
-                    speak_response(response, self.tts_engine)
-            else:
-                self.ui.send_message("⚠️ No se pudo generar respuesta", sender="System")
+                    barge_in = self.speak(response)
+            token.raise_if_cancelled()
 
             self.ui.update_memory_info(memory_entries=self.memory.size(), corrections=self.memory.corrections_count())
 
+        except CommandCancelled:
+            barge_in = None
+            self.ui.send_message(f"⏹️ Cancelado ({token.reason}): '{command}'", sender="System")
         except Exception as e:
             self.ui.send_message(f"❌ Error al procesar comando: {e}", sender="Error")
         finally:
             self.ui.send_message("🔴 Procesamiento completado", sender="Debug")
-            time.sleep(0.5)
-            self.listening = True
+            if barge_in is None:
+                if not token.cancelled:
+                    time.sleep(0.5)
+                self.listening = True
+        if barge_in is not None:
+            self.handle_barge_in(barge_in)
+
+    def timer_finished(self, duration):
+        """Aviso de un temporizador puesto con las intenciones locales.
+
+        Se habla por el mismo camino que un comando, con vigilancia de
+        interrupciones y cancelable, pero no corta el que esté en curso: espera
+        a que termine para no perder la respuesta que el usuario pidió.
+        """
+        self.commands.enqueue(self.announce_timer, duration)
+
+    def announce_timer(self, duration, token):
+        token.on_cancel(stop_speaking)
+        text = f"Ha terminado el temporizador de {duration}."
+        self.ui.send_message(f"⏰ {text}", sender="Jarvis")
+        barge_in = None
+        try:
+            if self.voice_input_enabled:
+                barge_in = self.speak(text)
+        finally:
+            if barge_in is None:
+                self.listening = True
+        if barge_in is not None:
+            self.handle_barge_in(barge_in)
+
+    def start_barge_in_monitor(self):
+        """Empieza a vigilar el micrófono durante la reproducción, o None si no procede."""
+        capture = get_audio_capture()
+        if not (BARGE_IN_ENABLED and self.voice_input_enabled and capture.running):
+            return None
+        monitor = BargeInMonitor(capture, on_barge_in=stop_speaking)
+        monitor.start()
+        return monitor
+
+    def speak(self, text):
+        """Habla la respuesta vigilando el micrófono.
+
+        Si el usuario empieza a hablar encima, se corta la reproducción y se
+        devuelve la posición del buffer donde empezó su voz; si no, None.
+        """
+        # Mientras suena la respuesta no se escucha: el micrófono oiría a Jarvis
+        self.listening = False
+        monitor = self.start_barge_in_monitor()
+        try:
+            speak_response(text, self.tts_engine)
+        finally:
+            if monitor is not None:
+                monitor.stop()
+        return monitor.onset_pos if monitor is not None else None
+
+    def stream_ai_response(self, command, spoken, token):
+        """Muestra la respuesta de la IA según se genera y, si ``spoken``, la habla frase a frase.
+
+        Devuelve ``(texto, posición de interrupción o None)``. Si el usuario
+        interrumpe, se deja de generar y el chat conserva lo recibido hasta
+        entonces; si se cancela el comando, además se lanza ``CommandCancelled``.
+        """
+        stream_id = self.ui.new_stream()
+        monitor = None
+
+        def on_first_sentence():
+            nonlocal monitor
+            self.listening = False
+            self.ui.send_message("🔊 Reproduciendo por voz...", sender="System")
+            monitor = self.start_barge_in_monitor()
+
+        speech = SpeechStream(self.tts_engine, on_start=on_first_sentence) if spoken else None
+        chunks = iterate_cancellable(token, ask_ai_stream(command, self.memory))
+        response = ""
+        try:
+            for chunk in chunks:
+                response += chunk
+                self.ui.stream_message(stream_id, response)
+                if speech is not None:
+                    if speech.interrupted:
+                        break
+                    speech.feed(chunk)
+        finally:
+            chunks.close()
+            self.ui.stream_message(stream_id, response, final=True)
+            if speech is not None and token.cancelled:
+                speech.cancel()
+            elif speech is not None:
+                speech.close()
+            if monitor is not None:
+                monitor.stop()
+        return response, monitor.onset_pos if monitor is not None else None
+
+    def handle_barge_in(self, position):
+        """El usuario interrumpió: se transcribe desde el inicio de su voz y se procesa como comando nuevo."""
+        self.ui.send_message("✋ Interrupción detectada, te escucho.", sender="System")
+        text = self.listen(duration=12, streaming=False, start_pos=position).lower()
+        command = get_wake_matcher().command_after(text)
+        if command is None:
+            command = text.strip(" ,.")
+        # Se vuelve a escuchar ya: un "para" solo cancela y no lanza ningún comando que lo reactive
+        self.listening = True
+        if command:
+            self.submit_command(command, from_voice=True)
 
     def apply_config_changes(self):
         from config_loader import VOICE_INPUT_ENABLED, TTS_MODE, AI_PROVIDER
@@ -227,6 +563,7 @@ class JarvisAgent:
 
         if old_voice_enabled != self.voice_input_enabled:
             if self.voice_input_enabled:
+                threading.Thread(target=preload_models, daemon=True).start()
                 self.start_audio_input()
             else:
                 self.stop_audio_input()
@@ -257,7 +594,8 @@ class JarvisAgent:
 
         try:
             self.ui.send_message("🔄 Recargando integraciones...", sender="System")
-            self.integrations_manager.shutdown_all()
+            if self.integrations_manager is not None:
+                self.integrations_manager.shutdown_all()
             self.integrations_manager = create_integrations_manager()
             capabilities = self.integrations_manager.get_all_capabilities()
             self.ui.show_integrations(capabilities)
@@ -286,18 +624,15 @@ class JarvisAgent:
             return None
 
         self.ui.send_message("🎤 Esperando confirmación...", sender="System")
-        self.ui.set_mic_status(True)
-        filename = record_audio(duration=timeout)
-        self.ui.set_mic_status(False)
-        if not filename:
-            return None
-        text = speech_to_text(filename)
+        text = self.listen(duration=timeout, streaming=False, tier=FAST_TIER)
         if text:
             self.ui.send_message(f"👂 Escuchado: '{text}'", sender="Jarvis")
         return text
 
 def main():
     try:
+        boot = BootOrchestrator(started_at=_process_started_at)
+        boot.record("imports", time.time() - _process_started_at)
         ui = UIBridge()
         redirector = ThreadSafeStdoutRedirector(ui)
         sys.stdout = redirector
@@ -305,7 +640,7 @@ def main():
 
         def backend_loop():
             try:
-                agent = JarvisAgent(ui)
+                agent = JarvisAgent(ui, boot)
                 agent.run()
             except Exception as e:
                 ui.send_message(f"❌ Error en backend: {e}", sender="Error")
@@ -316,8 +651,42 @@ def main():
     except KeyboardInterrupt:
         print("\n👋 Jarvis desactivado por el usuario.")
     finally:
+        stop_audio_capture()
+        stop_stt_worker()
+        flush_response_cache()
         if 'redirector' in locals():
             redirector.stop()
 
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Jarvis Terminal")
+    parser.add_argument("command", nargs="?", choices=["transcribe"],
+                        help="transcribe: transcripción offline de una carpeta o glob de grabaciones")
+    parser.add_argument("target", nargs="?", metavar="DIR|GLOB",
+                        help="grabaciones a transcribir con 'transcribe'")
+    parser.add_argument("--output", default=None,
+                        help="archivo JSONL de salida de 'transcribe' (por defecto transcripciones.jsonl)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="procesos en paralelo para 'transcribe' (por defecto según CPU/GPU)")
+    parser.add_argument("--tune-stt", nargs="?", const="", metavar="CLIPS_DIR",
+                        help="mide las configuraciones de Whisper con clips WAV+TXT y guarda la mejor en config.json")
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="factor de tiempo real máximo aceptable para --tune-stt (por defecto 0.5)")
+    parser.add_argument("--models", default="",
+                        help="tamaños de modelo a probar con --tune-stt, separados por comas")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.command == "transcribe":
+        if not args.target:
+            print("Uso: python jarvis.py transcribe <carpeta|glob> [--output salida.jsonl] [--jobs N]")
+        else:
+            from batch_transcribe import transcribe_batch
+            transcribe_batch(args.target, output_path=args.output, jobs=args.jobs)
+    elif args.tune_stt is not None:
+        from stt_tuner import tune_stt
+        models = [m.strip() for m in args.models.split(",") if m.strip()]
+        tune_stt(args.tune_stt or None, budget_rtf=args.budget, models=models or None)
+    else:
+        main()
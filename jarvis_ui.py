@@ -3,7 +3,6 @@ from textual.widgets import Header, Footer, Static, Input
 from textual.containers import Container, Horizontal, Vertical
 from textual.reactive import reactive
 from textual.message import Message
-import psutil
 import time
 import threading
 
@@ -12,9 +11,11 @@ class ChatLog(Static):
         super().__init__(**kwargs)
         self.log_content = ""
         self.auto_scroll = True
-        self.max_lines = 1000  # Límite de líneas para rendimiento
+        self.max_lines = 1000  # Límite de mensajes para rendimiento
+        self.entries = []
+        self.streams = {}
 
-    def append_message(self, msg: str, sender="Jarvis"):
+    def _add_entry(self, msg: str, sender):
         sender_lower = sender.lower()
         if sender_lower == "jarvis":
             prefix = "[bold green]🤖 Jarvis:[/bold green] "
@@ -31,16 +32,33 @@ class ChatLog(Static):
         else:
             prefix = f"[bold]{sender}:[/bold] "
 
-        new_line = f"{prefix}{msg}\n"
-        self.log_content += new_line
-        
-        # Mantener solo las últimas líneas para rendimiento
-        lines = self.log_content.split('\n')
-        if len(lines) > self.max_lines:
-            self.log_content = '\n'.join(lines[-self.max_lines:])
-        
+        self.entries.append([prefix, msg])
+        return self.entries[-1]
+
+    def append_message(self, msg: str, sender="Jarvis"):
+        self._add_entry(msg, sender)
+        self._render()
+
+    def update_stream(self, stream_id, msg: str, sender="Jarvis", final=False):
+        """Crea o reescribe en el sitio el mensaje ``stream_id`` (respuestas que llegan por partes)"""
+        entry = self.streams.get(stream_id)
+        if entry is None:
+            if not msg:
+                return
+            entry = self._add_entry(msg, sender)
+            self.streams[stream_id] = entry
+        entry[1] = msg
+        if final:
+            del self.streams[stream_id]
+        self._render()
+
+    def _render(self):
+        # Mantener solo los últimos mensajes para rendimiento
+        if len(self.entries) > self.max_lines:
+            del self.entries[:-self.max_lines]
+        self.log_content = "".join(f"{prefix}{msg}\n" for prefix, msg in self.entries)
         self.update(self.log_content)
-        
+
         # Auto-scroll hacia abajo siempre
         if self.auto_scroll:
             self.call_after_refresh(self.scroll_end)
@@ -64,30 +82,50 @@ class SystemStatsWidget(Static):
 
 class AudioStatusWidget(Static):
     mic_status = reactive(False)
+    stt_timings = reactive("")
+    stt_models = reactive("")
 
     def render(self):
         mic_icon = "🎙️ ON" if self.mic_status else "🔇 OFF"
         mic_color = "green" if self.mic_status else "red"
+        timings = self.stt_timings if self.stt_timings else "[dim]sin datos[/dim]"
+        models = self.stt_models if self.stt_models else "[dim]sin cargar[/dim]"
         return (
             f"[bold cyan]🎤 AUDIO[/bold cyan]\n"
-            f"Micrófono: [bold {mic_color}]{mic_icon}[/bold {mic_color}]"
+            f"Micrófono: [bold {mic_color}]{mic_icon}[/bold {mic_color}]\n"
+            f"STT: {timings}\n"
+            f"Modelos: {models}"
         )
 
     def watch_mic_status(self, mic_status): self.refresh()
+    def watch_stt_timings(self, stt_timings): self.refresh()
+    def watch_stt_models(self, stt_models): self.refresh()
 
 class EnginesWidget(Static):
     tts_engine = reactive("Local")
     ai_engine = reactive("Local")
+    ai_cache = reactive("")
+    ai_router = reactive("")
+    local_intents = reactive("")
 
     def render(self):
+        cache = self.ai_cache if self.ai_cache else "[dim]sin datos[/dim]"
+        router = self.ai_router if self.ai_router else "[dim]sin datos[/dim]"
+        local = self.local_intents if self.local_intents else "[dim]sin datos[/dim]"
         return (
             f"[bold cyan]🤖 MOTORES[/bold cyan]\n"
             f"TTS: [bold green]{self.tts_engine}[/bold green]\n"
-            f"AI: [bold green]{self.ai_engine}[/bold green]"
+            f"AI: [bold green]{self.ai_engine}[/bold green]\n"
+            f"Proveedores: {router}\n"
+            f"Caché IA: {cache}\n"
+            f"Local: {local}"
         )
 
     def watch_tts_engine(self, tts_engine): self.refresh()
     def watch_ai_engine(self, ai_engine): self.refresh()
+    def watch_ai_cache(self, ai_cache): self.refresh()
+    def watch_ai_router(self, ai_router): self.refresh()
+    def watch_local_intents(self, local_intents): self.refresh()
 
 class MemoryWidget(Static):
     memory_entries = reactive(0)
@@ -139,12 +177,27 @@ class InfoPanel(Static):
     def set_mic_status(self, active: bool):
         self.audio_status.mic_status = active
 
+    def set_stt_timings(self, timings: str):
+        self.audio_status.stt_timings = timings
+
+    def set_stt_models(self, status: str):
+        self.audio_status.stt_models = status
+
     def set_tts_engine(self, name: str):
         self.engines.tts_engine = name
 
     def set_ai_engine(self, name: str):
         self.engines.ai_engine = name
 
+    def set_ai_cache(self, status: str):
+        self.engines.ai_cache = status
+
+    def set_ai_router(self, status: str):
+        self.engines.ai_router = status
+
+    def set_local_intents(self, status: str):
+        self.engines.local_intents = status
+
     def update_memory_info(self, memory_entries, corrections):
         self.memory.memory_entries = memory_entries
         self.memory.corrections = corrections
@@ -221,7 +274,7 @@ class JarvisApp(App):
     }
     """
 
-    BINDINGS = [("ctrl+c", "quit", "Quit")]
+    BINDINGS = [("ctrl+c", "quit", "Quit"), ("escape", "cancel_command", "Cancelar")]
 
     # Definir eventos personalizados
     class MessageEvent(Message):
@@ -230,11 +283,29 @@ class JarvisApp(App):
             self.text = text
             self.sender = sender
 
+    class StreamEvent(Message):
+        def __init__(self, stream_id: int, text: str, sender: str = "Jarvis", final: bool = False):
+            super().__init__()
+            self.stream_id = stream_id
+            self.text = text
+            self.sender = sender
+            self.final = final
+
     class MicStatusEvent(Message):
         def __init__(self, active: bool):
             super().__init__()
             self.active = active
 
+    class SttTimingsEvent(Message):
+        def __init__(self, timings: str):
+            super().__init__()
+            self.timings = timings
+
+    class SttModelsEvent(Message):
+        def __init__(self, status: str):
+            super().__init__()
+            self.status = status
+
     class TTSEngineEvent(Message):
         def __init__(self, name: str):
             super().__init__()
@@ -245,6 +316,21 @@ class JarvisApp(App):
             super().__init__()
             self.name = name
 
+    class AICacheEvent(Message):
+        def __init__(self, status: str):
+            super().__init__()
+            self.status = status
+
+    class AIRouterEvent(Message):
+        def __init__(self, status: str):
+            super().__init__()
+            self.status = status
+
+    class LocalIntentsEvent(Message):
+        def __init__(self, status: str):
+            super().__init__()
+            self.status = status
+
     class MemoryInfoEvent(Message):
         def __init__(self, memory_entries: int, corrections: int):
             super().__init__()
@@ -261,6 +347,7 @@ class JarvisApp(App):
         self.start_time = time.time()
         self._is_ready = False
         self.on_user_input_callback = None
+        self.on_cancel_callback = None
         self.chat_log = None
 
     @property
@@ -290,6 +377,7 @@ class JarvisApp(App):
         self._is_ready = True
 
     def refresh_stats(self):
+        import psutil
         cpu = psutil.cpu_percent()
         ram = psutil.virtual_memory().percent
         uptime_seconds = int(time.time() - self.start_time)
@@ -307,6 +395,11 @@ class JarvisApp(App):
             else:
                 self.chat_log.append_message("⚠️ No handler for input!", sender="System")
 
+    def action_cancel_command(self):
+        """Escape: cancela el comando en curso (IA, integración y voz)"""
+        if self.on_cancel_callback:
+            threading.Thread(target=self.on_cancel_callback, daemon=True).start()
+
     # Manejar eventos personalizados
     def on_message_event(self, event: MessageEvent):
         """Maneja eventos de mensajes desde hilos externos"""
@@ -320,15 +413,35 @@ class JarvisApp(App):
             if hasattr(self, 'chat_log'):
                 self.chat_log.append_message(f"Error displaying message: {e}", "Error")
 
+    def on_stream_event(self, event: StreamEvent):
+        """Actualiza en el sitio un mensaje en streaming"""
+        if self.chat_log:
+            self.chat_log.update_stream(event.stream_id, event.text, event.sender, event.final)
+
     def on_mic_status_event(self, event: MicStatusEvent):
         self.info_panel.set_mic_status(event.active)
 
+    def on_stt_timings_event(self, event: SttTimingsEvent):
+        self.info_panel.set_stt_timings(event.timings)
+
+    def on_stt_models_event(self, event: SttModelsEvent):
+        self.info_panel.set_stt_models(event.status)
+
     def on_tts_engine_event(self, event: TTSEngineEvent):
         self.info_panel.set_tts_engine(event.name)
 
     def on_ai_engine_event(self, event: AIEngineEvent):
         self.info_panel.set_ai_engine(event.name)
 
+    def on_ai_cache_event(self, event: AICacheEvent):
+        self.info_panel.set_ai_cache(event.status)
+
+    def on_ai_router_event(self, event: AIRouterEvent):
+        self.info_panel.set_ai_router(event.status)
+
+    def on_local_intents_event(self, event: LocalIntentsEvent):
+        self.info_panel.set_local_intents(event.status)
+
     def on_memory_info_event(self, event: MemoryInfoEvent):
         self.info_panel.update_memory_info(event.memory_entries, event.corrections)
 
@@ -0,0 +1,413 @@
+# local_intents.py - Intenciones que se resuelven en local, sin consultar a ningún proveedor de IA
+
+import datetime
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict, namedtuple
+
+# triggers: palabras que hacen probar la intención; vocabulary: palabras que puede llevar la frase
+# además de FILLER (NUMBER admite cualquier número), o None si el manejador valida la frase entera
+Intent = namedtuple("Intent", "name triggers vocabulary handler")
+
+# Palabras de cortesía que no cambian la intención ("oye jarvis, dime la hora por favor")
+FILLER = {"jarvis", "oye", "hey", "hola", "por", "favor", "me", "puedes", "podrias", "dime", "decir", "sabes",
+          "quiero", "saber", "a", "y"}
+
+WEEKDAYS = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+MONTHS = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre",
+          "octubre", "noviembre", "diciembre"]
+
+NUMBER_WORDS = {
+    "cero": 0, "un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5, "seis": 6,
+    "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "once": 11, "doce": 12, "trece": 13, "catorce": 14,
+    "quince": 15, "dieciseis": 16, "diecisiete": 17, "dieciocho": 18, "diecinueve": 19, "veinte": 20,
+    "veintiuno": 21, "veintiun": 21, "veintidos": 22, "veintitres": 23, "veinticuatro": 24, "veinticinco": 25,
+    "veintiseis": 26, "veintisiete": 27, "veintiocho": 28, "veintinueve": 29, "treinta": 30, "cuarenta": 40,
+    "cincuenta": 50, "sesenta": 60, "setenta": 70, "ochenta": 80, "noventa": 90, "cien": 100, "ciento": 100,
+    "doscientos": 200, "trescientos": 300, "cuatrocientos": 400, "quinientos": 500, "seiscientos": 600,
+    "setecientos": 700, "ochocientos": 800, "novecientos": 900,
+}
+
+OPERATORS = {
+    "+": "+", "mas": "+", "plus": "+",
+    "-": "-", "menos": "-",
+    "*": "*", "x": "*", "×": "*", "por": "*", "multiplicado": "*",
+    "/": "/", "÷": "/", "entre": "/", "dividido": "/",
+    "^": "^", "elevado": "^",
+}
+# Palabras que acompañan al operador sin cambiarlo: "multiplicado por", "dividido entre", "elevado a"
+_OPERATOR_TAILS = {"*": {"por"}, "/": {"por", "entre"}, "^": {"a", "al"}}
+_PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
+MAX_EXPONENT = 100
+
+UNITS = {"segundo": 1, "segundos": 1, "seg": 1, "minuto": 60, "minutos": 60, "min": 60, "hora": 3600, "horas": 3600}
+
+_TOKEN = re.compile(r"\d+(?:[.,]\d+)?|[+\-*/×÷^]|\w+")
+
+# Marca de vocabulario: el tokenizador nunca produce "#", así que no choca con ninguna palabra
+NUMBER = "#"
+
+
+def tokenize(text):
+    """Tokens en minúsculas y sin tildes; los números y operadores sueltos son tokens propios."""
+    text = text.lower()
+    text = "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+    return _TOKEN.findall(text)
+
+
+def _is_number(token):
+    return token[0].isdigit() or token in NUMBER_WORDS
+
+
+def _only(tokens, vocabulary):
+    numbers = NUMBER in vocabulary
+    return all(t in vocabulary or t in FILLER or (numbers and _is_number(t)) for t in tokens)
+
+
+def parse_number(tokens, i):
+    """Número en cifras o en palabras ("treinta y cinco") desde ``tokens[i]``: ``(valor, siguiente)`` o None."""
+    token = tokens[i]
+    if token[0].isdigit():
+        return float(token.replace(",", ".")), i + 1
+    if token not in NUMBER_WORDS:
+        return None
+    value = 0
+    j = i
+    while j < len(tokens) and tokens[j] in NUMBER_WORDS:
+        word = NUMBER_WORDS[tokens[j]]
+        value += word
+        j += 1
+        # "treinta y cinco", pero no "cinco y medio"
+        if 30 <= word < 100 and j + 1 < len(tokens) and tokens[j] == "y" and NUMBER_WORDS.get(tokens[j + 1], 10) < 10:
+            j += 1
+        elif word < 100 and (j >= len(tokens) or NUMBER_WORDS.get(tokens[j], 100) >= 100):
+            break
+    if j < len(tokens) and tokens[j] == "mil":
+        value, j = value * 1000, j + 1
+    return float(value), j
+
+
+def format_number(value):
+    """Número para leer en voz alta: coma decimal y, fuera de 10^-4..10^15, notación científica."""
+    if value and not 1e-4 <= abs(value) < 1e15:
+        mantissa, exponent = f"{value:.4e}".split("e")
+        return f"{format_number(float(mantissa))} por 10 elevado a {int(exponent)}"
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.4f}".rstrip("0").replace(".", ",")
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    parts = []
+    for size, singular, plural in ((3600, "hora", "horas"), (60, "minuto", "minutos"), (1, "segundo", "segundos")):
+        amount, seconds = divmod(seconds, size)
+        if amount:
+            parts.append(f"{amount} {singular if amount == 1 else plural}")
+    return " y ".join(parts) if parts else "0 segundos"
+
+
+def parse_duration(tokens):
+    """Suma las cantidades con unidad: "1 hora y media", "media hora", "2 minutos 30 segundos". None si no hay."""
+    total = 0.0
+    found = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("media", "medio") and i + 1 < len(tokens) and tokens[i + 1] in UNITS:
+            total += UNITS[tokens[i + 1]] / 2
+            found = True
+            i += 2
+            continue
+        number = parse_number(tokens, i) if token[0].isdigit() or token in NUMBER_WORDS else None
+        if number is not None and number[1] < len(tokens) and tokens[number[1]] in UNITS:
+            unit = UNITS[tokens[number[1]]]
+            total += number[0] * unit
+            found = True
+            i = number[1] + 1
+            if tokens[i:i + 2] in (["y", "media"], ["y", "medio"]):
+                total += unit / 2
+                i += 2
+            continue
+        i += 1
+    return total if found and total > 0 else None
+
+
+def parse_expression(tokens):
+    """Lista alterna de números y operadores, o None si los tokens no son solo una operación."""
+    items = []
+    sign = 1.0
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        expecting_number = not items or isinstance(items[-1], str)
+        if expecting_number:
+            # "menos" donde se espera un número es el signo del operando: "10 entre menos 2", "5 - - 5"
+            if token == "menos" or token == "-":
+                sign = -sign
+                i += 1
+                continue
+            number = parse_number(tokens, i) if _is_number(token) else None
+            if number is None:
+                return None
+            items.append(sign * number[0])
+            sign = 1.0
+            i = number[1]
+            if tokens[i:i + 2] == ["al", "cuadrado"]:
+                items += ["^", 2.0]
+                i += 2
+            elif tokens[i:i + 2] == ["al", "cubo"]:
+                items += ["^", 3.0]
+                i += 2
+        else:
+            operator = OPERATORS.get(token)
+            if operator is None:
+                return None
+            items.append(operator)
+            i += 1
+            if i < len(tokens) and tokens[i] in _OPERATOR_TAILS.get(operator, ()):
+                i += 1
+    if len(items) < 3 or isinstance(items[-1], str):
+        return None
+    return items
+
+
+def evaluate(items):
+    """Evalúa la expresión respetando la precedencia (sin ``eval``)."""
+    output, operators = [], []
+
+    def reduce():
+        op = operators.pop()
+        b, a = output.pop(), output.pop()
+        if op == "+":
+            output.append(a + b)
+        elif op == "-":
+            output.append(a - b)
+        elif op == "*":
+            output.append(a * b)
+        elif op == "/":
+            if b == 0:
+                raise ZeroDivisionError
+            output.append(a / b)
+        else:
+            if abs(b) > MAX_EXPONENT:
+                raise OverflowError
+            if a < 0 and b != int(b):
+                # (-8) ** 0.5 sería un número complejo
+                raise ValueError("potencia sin resultado real")
+            output.append(a ** b)
+
+    for item in items:
+        if isinstance(item, str):
+            # ^ es asociativo por la derecha
+            while operators and (_PRECEDENCE[operators[-1]] > _PRECEDENCE[item] or
+                                 (_PRECEDENCE[operators[-1]] == _PRECEDENCE[item] and item != "^")):
+                reduce()
+            operators.append(item)
+        else:
+            output.append(item)
+    while operators:
+        reduce()
+    # Una multiplicación de números enormes no lanza error, da infinito
+    if not math.isfinite(output[0]):
+        raise OverflowError
+    return output[0]
+
+
+# --- Manejadores: la frase ya cumple el vocabulario de la intención; devuelven la respuesta o None ---
+
+def _time(engine, tokens, now):
+    return f"{'Es la' if now.hour in (1, 13) else 'Son las'} {now.strftime('%H:%M')}."
+
+
+def _date(engine, tokens, now):
+    if "dia" in tokens and "hoy" not in tokens and "estamos" not in tokens:
+        return None
+    return f"Hoy es {WEEKDAYS[now.weekday()]}, {now.day} de {MONTHS[now.month - 1]} de {now.year}."
+
+
+_CANCEL_VERBS = {"cancela", "cancelar", "quita", "quitar", "borra", "borrar", "para", "parar"}
+
+
+def _cancel_timers(engine, tokens, now):
+    if not _CANCEL_VERBS & set(tokens):
+        return None
+    cancelled = engine.cancel_timers()
+    if not cancelled:
+        return "No hay ningún temporizador en marcha."
+    return f"He cancelado {cancelled} temporizador{'es' if cancelled > 1 else ''}."
+
+
+def _set_timer(engine, tokens, now):
+    seconds = parse_duration(tokens)
+    if seconds is None:
+        return None
+    engine.start_timer(seconds)
+    return f"Temporizador de {format_duration(seconds)} en marcha."
+
+
+def _arithmetic(engine, tokens, now):
+    tokens = [t for t in tokens if t not in {"cuanto", "cuantos", "es", "son", "calcula", "calculame", "jarvis", "oye",
+                                             "dime", "hace", "resultado", "de", "favor", "me", "sabes", "what", "is"}]
+    # "por favor" ya ha perdido el "favor"; un "por" suelto al final no es una multiplicación
+    while tokens and tokens[-1] == "por":
+        tokens.pop()
+    items = parse_expression(tokens)
+    if items is None:
+        return None
+    try:
+        result = evaluate(items)
+    except ZeroDivisionError:
+        return "No se puede dividir entre cero."
+    except OverflowError:
+        return "Ese número es demasiado grande."
+    except ValueError:
+        return "Esa potencia no tiene un resultado real."
+    return f"{' '.join(tokens)} son {format_number(result)}."
+
+
+def _thanks(engine, tokens, now):
+    return "¡De nada! Estoy aquí para ayudarte."
+
+
+def _how_are_you(engine, tokens, now):
+    return "Estoy funcionando perfectamente, gracias por preguntar. ¿Y tú qué tal?"
+
+
+def _greeting(engine, tokens, now):
+    return "¡Hola! Soy Jarvis, tu asistente virtual. ¿En qué puedo ayudarte?"
+
+
+DEFAULT_INTENTS = [
+    Intent("hora", {"hora", "horas", "time"},
+           {"que", "hora", "horas", "es", "son", "la", "las", "ahora", "actual", "what", "time", "is", "it",
+            "tienes", "mira"},
+           _time),
+    Intent("fecha", {"fecha", "dia", "date"},
+           {"que", "fecha", "dia", "es", "hoy", "estamos", "en", "cual", "la", "el", "de", "today", "date", "what",
+            "is", "s"},
+           _date),
+    Intent("cancelar_temporizador", {"temporizador", "temporizadores", "timer"},
+           _CANCEL_VERBS | {"el", "los", "temporizador", "temporizadores", "timer", "todos"},
+           _cancel_timers),
+    Intent("temporizador", {"temporizador", "timer", "cronometro", "avisame", "alarma"},
+           {"pon", "ponme", "programa", "activa", "inicia", "crea", "un", "una", "el", "temporizador", "timer",
+            "cronometro", "avisame", "alarma", "de", "en", "dentro", "durante", "para", "segundo", "segundos", "seg",
+            "minuto", "minutos", "min", "hora", "horas", "media", "medio", NUMBER},
+           _set_timer),
+    Intent("calculo", {"cuanto", "cuantos", "calcula", "calculame", "+", "-", "*", "/", "×", "÷", "^", "x",
+                       "mas", "menos", "por", "entre", "multiplicado", "dividido", "elevado", "cuadrado", "cubo"},
+           None, _arithmetic),
+    Intent("gracias", {"gracias", "thanks"},
+           {"gracias", "muchas", "mil", "thanks", "thank", "you", "vale", "ok", "genial", "perfecto"},
+           _thanks),
+    Intent("como_estas", {"estas", "tal", "how"},
+           {"como", "estas", "que", "tal", "te", "va", "how", "are", "you"},
+           _how_are_you),
+    Intent("saludo", {"hola", "buenas", "buenos", "hello", "hi", "hey"},
+           {"hola", "buenas", "buenos", "dias", "tardes", "noches", "hello", "hi", "hey"},
+           _greeting),
+]
+
+
+class LocalIntentEngine:
+    """Resuelve en local las frases que no necesitan un LLM (hora, fecha, temporizadores, cálculos...).
+
+    Cada intención declara sus palabras disparadoras; al construir el motor se
+    compila un índice token → intenciones, así que una frase solo se prueba
+    contra las intenciones cuyas palabras contiene, en orden de prioridad. La
+    frase entera (no subcadenas) tiene que caber en el vocabulario de la
+    intención, de modo que "a qué hora abre el banco" o "avísame si llueve en
+    5 minutos" siguen yendo al proveedor.
+    """
+
+    def __init__(self, intents=None, on_timer=None):
+        self.intents = list(intents if intents is not None else DEFAULT_INTENTS)
+        self.on_timer = on_timer
+        self.hits = 0
+        self.lookups = 0
+        self.seconds = 0.0
+        self._index = defaultdict(list)
+        for priority, intent in enumerate(self.intents):
+            for trigger in intent.triggers:
+                self._index[trigger].append(priority)
+        self._timers = set()
+        self._lock = threading.Lock()
+
+    def match(self, text, now=None):
+        """``(nombre de la intención, respuesta)`` o None si la frase debe ir al proveedor."""
+        tokens = tokenize(text)
+        candidates = sorted({priority for token in tokens for priority in self._index.get(token, ())})
+        if not candidates:
+            return None
+        now = now or datetime.datetime.now()
+        for priority in candidates:
+            intent = self.intents[priority]
+            if intent.vocabulary is not None and not _only(tokens, intent.vocabulary):
+                continue
+            response = intent.handler(self, tokens, now)
+            if response is not None:
+                return intent.name, response
+        return None
+
+    def resolve(self, text, now=None):
+        """Respuesta local o None, contando aciertos y tiempo para ``status``."""
+        t0 = time.perf_counter()
+        result = self.match(text, now)
+        with self._lock:
+            self.lookups += 1
+            self.seconds += time.perf_counter() - t0
+            if result is not None:
+                self.hits += 1
+        return result[1] if result is not None else None
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def status(self):
+        """Resumen para el panel lateral: aciertos y tiempo medio de resolución."""
+        if not self.lookups:
+            return ""
+        average_us = self.seconds / self.lookups * 1e6
+        return f"{self.hits}/{self.lookups} ({self.hit_rate:.0%}), {average_us:.0f} µs"
+
+    def start_timer(self, seconds):
+        label = format_duration(seconds)
+
+        def finished():
+            with self._lock:
+                self._timers.discard(timer)
+            if self.on_timer is not None:
+                self.on_timer(label)
+
+        timer = threading.Timer(seconds, finished)
+        timer.daemon = True
+        with self._lock:
+            self._timers.add(timer)
+        timer.start()
+        return timer
+
+    def cancel_timers(self):
+        with self._lock:
+            timers, self._timers = self._timers, set()
+        for timer in timers:
+            timer.cancel()
+        return len(timers)
+
+    @property
+    def active_timers(self):
+        return len(self._timers)
+
+
+_engine = None
+
+
+def get_intent_engine():
+    global _engine
+    if _engine is None:
+        _engine = LocalIntentEngine()
+    return _engine
@@ -0,0 +1,168 @@
+# response_cache.py - Caché LRU con caducidad de las respuestas de la IA
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from corrections import apply_corrections
+
+# Preguntas cuya respuesta cambia con el tiempo: nunca se cachean
+NEVER_CACHE_WORDS = {
+    "hora", "horas", "fecha", "hoy", "mañana", "manana", "ayer", "dia", "semana", "mes", "año", "ano",
+    "ahora", "tiempo", "clima", "temperatura", "noticias", "ultimo", "ultima", "recuerda", "recuerdas",
+    "time", "date", "today", "now", "weather",
+}
+
+SAVE_DELAY = 5.0
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_query(text):
+    """Forma canónica de una consulta: corregida, en minúsculas, sin tildes ni puntuación."""
+    text = apply_corrections(text or "").lower()
+    text = "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def context_hash(context):
+    return hashlib.sha1((context or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Respuestas de la IA indexadas por consulta normalizada, proveedor, modelo y contexto.
+
+    Las entradas caducan tras ``ttl`` segundos y, al pasar de ``max_entries``,
+    se descarta la usada hace más tiempo. La caché se guarda en ``path`` como
+    mucho cada ``save_delay`` segundos (y con ``flush`` al salir) para sobrevivir
+    a reinicios. Cada entrada recuerda cuánto tardó el proveedor, así que cada
+    acierto suma ese tiempo a ``saved_seconds``.
+
+    ``never_cache`` admite palabras sueltas o frases; una frase bloquea la
+    consulta si aparece entera, con las mismas palabras seguidas.
+    """
+
+    def __init__(self, path=None, max_entries=500, ttl=86400, never_cache=(), save_delay=SAVE_DELAY):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+        extra = [normalize_query(w) for w in never_cache]
+        self.never_cache = NEVER_CACHE_WORDS | {w for w in extra if w and " " not in w}
+        self.never_cache_phrases = [w for w in extra if " " in w]
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(query, provider, model, context=""):
+        raw = json.dumps([normalize_query(query), provider, model, context_hash(context)], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def cacheable(self, query):
+        normalized = normalize_query(query)
+        words = set(normalized.split())
+        if not words or words & self.never_cache:
+            return False
+        padded = f" {normalized} "
+        return not any(f" {phrase} " in padded for phrase in self.never_cache_phrases)
+
+    def get(self, key):
+        return self.lookup([key])
+
+    def lookup(self, keys):
+        """Primera respuesta vigente entre ``keys``; cuenta como una sola consulta en las estadísticas."""
+        with self._lock:
+            now = time.time()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry["expires"] < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry["latency"]
+                return entry["response"]
+            self.misses += 1
+            return None
+
+    def put(self, key, response, latency):
+        with self._lock:
+            self._entries[key] = {"response": response, "expires": time.time() + self.ttl, "latency": latency}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._schedule_save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def status(self):
+        """Resumen para el panel lateral: aciertos, tasa y tiempo ahorrado."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return f"{len(self)} resp."
+        return f"{self.hits}/{lookups} ({self.hit_rate:.0%}), {self.saved_seconds:.1f}s ahorrados"
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar la caché de IA {self.path}: {e}")
+            return
+        now = time.time()
+        # El archivo está en orden LRU: las últimas son las más recientes
+        for key, entry in stored.items():
+            if entry.get("expires", 0) > now:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_save(self):
+        """Agrupa las escrituras: reescribir el JSON entero en cada respuesta no sale gratis."""
+        if self.path and self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Escribe ya los cambios pendientes (también lo hace el temporizador de guardado)."""
+        # El temporizador y el cierre pueden coincidir: se escribe de uno en uno y en orden
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is None:
+                    return
+                self._save_timer.cancel()
+                self._save_timer = None
+                data = json.dumps(self._entries, ensure_ascii=False)
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"⚠️ No se pudo guardar la caché de IA {self.path}: {e}")
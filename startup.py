@@ -0,0 +1,57 @@
+# startup.py - Orquestador de arranque: fases en paralelo con informe de tiempos
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class BootOrchestrator:
+    """Lanza las fases lentas del arranque en segundo plano y mide cuánto tarda cada una.
+
+    Cada fase se ejecuta en su propio hilo; ``on_done(resultado)`` se llama en
+    cuanto termina, de modo que el agente puede usar cada recurso (TTS,
+    integraciones, Whisper) sin esperar a los demás.
+    """
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at or time.time()
+        self.timings = {}
+        self.errors = {}
+        self._futures = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="boot")
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings[name] = seconds
+
+    def submit(self, name, func, on_done=None):
+        def run_phase():
+            t0 = time.time()
+            try:
+                result = func()
+                if on_done is not None:
+                    on_done(result)
+                return result
+            except Exception as e:
+                with self._lock:
+                    self.errors[name] = e
+                print(f"❌ Error en fase de arranque '{name}': {e}")
+            finally:
+                self.record(name, time.time() - t0)
+
+        future = self._executor.submit(run_phase)
+        self._futures.append(future)
+        return future
+
+    def wait(self, timeout=None):
+        wait(self._futures, timeout=timeout)
+        self._executor.shutdown(wait=False)
+
+    def report(self):
+        """Resumen de una línea: tiempo por fase y total desde el inicio del proceso."""
+        with self._lock:
+            phases = [f"{name} {seconds:.2f}s" + (" ❌" if name in self.errors else "")
+                      for name, seconds in self.timings.items()]
+        phases.append(f"total {time.time() - self.started_at:.2f}s")
+        return "⏱️ Arranque: " + " | ".join(phases)
@@ -1,85 +1,554 @@
 # ===========================
 # stt.py (versión mejorada, escucha natural, robusto)
 # ===========================
-import numpy as np
-import wave
+import glob
+import math
 import os
+import numpy as np
 import time
-import torch
-import pyaudio
-from faster_whisper import WhisperModel
+import threading
+import wave
 from config_loader import (
-    SAMPLE_RATE, CHANNELS, VOLUME_THRESHOLD, WHISPER_MODEL_SIZE,
-    USE_GPU, WHISPER_NO_SPEECH_THRESHOLD, WHISPER_TEMPERATURE,
-    WHISPER_LOG_PROB_THRESHOLD, SILENCE_DURATION
+    SAMPLE_RATE, CHANNELS,
+    WHISPER_NO_SPEECH_THRESHOLD, WHISPER_TEMPERATURE,
+    WHISPER_LOG_PROB_THRESHOLD, SILENCE_DURATION, MIN_FILE_SIZE,
+    STT_PARTIAL_INTERVAL, STT_BEAM_SIZE, STT_ADAPTIVE_DECODING,
+    STT_ESCALATE_LOGPROB, STT_ESCALATE_COMPRESSION, STT_TRIM_SILENCE,
+    STT_TRIM_PADDING, STT_TRIM_MERGE_GAP, VAD_MODE, PREROLL_MS,
+    AUDIO_SOURCE_TYPE, AUDIO_SOURCE_PATH, AUDIO_SOURCE_REALTIME,
+    AUDIO_SOURCE_GAP_SECONDS, AUDIO_SOURCE_LOOP, STT_WORKER_PROCESS,
+    AUDIO_HISTORY_ENABLED, AUDIO_HISTORY_MINUTES, AUDIO_HISTORY_PATH
 )
+from vad import create_vad, speech_regions
+from stt_models import WhisperModelManager, COMMAND_TIER, FAST_TIER, REVIEW_TIER
+from stt_worker import SttWorker
+from audio_history import AudioHistory
+from corrections import apply_corrections
 
 DEBUG_STT = True  # Debug activado
 
-# Carga modelo Whisper
-whisper_device = "cuda" if torch.cuda.is_available() and USE_GPU else "cpu"
-print(f"🔍 Cargando modelo Whisper ({WHISPER_MODEL_SIZE}) en {whisper_device}...")
-whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device=whisper_device, compute_type="default")
-print("✅ Whisper listo")
+# Modelos Whisper (un modelo por tamaño, compartido entre tiers); se cargan al primer uso
+model_manager = WhisperModelManager()
 
-def rms_from_bytes(data_bytes):
-    audio_data = np.frombuffer(data_bytes, dtype=np.int16)
-    if len(audio_data) == 0:
+_stt_worker = None
+_stt_worker_lock = threading.Lock()
+_model_status_callback = None
+
+def get_stt_worker():
+    """Proceso de Whisper compartido (solo con ``stt.worker_process``), arrancado bajo demanda."""
+    global _stt_worker
+    with _stt_worker_lock:
+        if _stt_worker is None:
+            _stt_worker = SttWorker()
+            _stt_worker.on_change = _model_status_callback
+            _stt_worker.start()
+        return _stt_worker
+
+def stop_stt_worker():
+    if _stt_worker is not None:
+        _stt_worker.stop()
+
+def preload_models():
+    """Carga por adelantado todos los tiers configurados (se usa en segundo plano al arrancar)."""
+    if STT_WORKER_PROCESS:
+        get_stt_worker().preload()
+    else:
+        model_manager.load_all()
+
+CHUNK = 1024
+WHISPER_SAMPLE_RATE = 16000
+CAPTURE_BUFFER_SECONDS = 30
+
+
+class AudioRingBuffer:
+    """Buffer circular preasignado de muestras int16.
+
+    Un único escritor (el callback de PyAudio) y varios lectores, sin locks:
+    el escritor copia las muestras y solo después avanza ``position``, un
+    contador monotónico de muestras escritas. Los lectores trabajan con
+    posiciones absolutas y descartan lo que el escritor ya ha sobrescrito.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self.position = 0
+
+    def write(self, samples):
+        n = len(samples)
+        if n == 0:
+            return
+        position = self.position
+        if n > self.capacity:
+            position += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = position % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._data[start:end] = samples
+        else:
+            first = self.capacity - start
+            self._data[start:] = samples[:first]
+            self._data[:end - self.capacity] = samples[first:]
+        # Publicar la nueva posición solo cuando los datos ya están copiados
+        self.position = position + n
+
+    def read(self, start, end=None):
+        """Devuelve una copia de las muestras [start, end) todavía disponibles."""
+        published = self.position
+        end = published if end is None else min(end, published)
+        start = max(start, end - self.capacity, 0)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+
+        i = start % self.capacity
+        j = i + (end - start)
+        if j <= self.capacity:
+            out = self._data[i:j].copy()
+        else:
+            out = np.concatenate((self._data[i:], self._data[:j - self.capacity]))
+
+        # Si el escritor ha dado la vuelta mientras copiábamos, el principio
+        # de la copia puede estar corrupto: se descarta
+        overwritten = self.position - self.capacity - start
+        if overwritten > 0:
+            out = out[overwritten:]
+        return out
+
+
+class MicrophoneSource:
+    """Fuente de audio por defecto: el micrófono vía PyAudio en modo callback."""
+
+    def __init__(self):
+        self._pa = None
+        self._stream = None
+
+    @property
+    def active(self):
+        return self._stream is not None
+
+    def describe(self):
+        return "micrófono"
+
+    def start(self, capture):
+        import pyaudio
+        pa_continue = pyaudio.paContinue
+
+        def callback(in_data, frame_count, time_info, status):
+            capture.write(np.frombuffer(in_data, dtype=np.int16))
+            return (None, pa_continue)
+
+        self._pa = pyaudio.PyAudio()
+        try:
+            self._stream = self._pa.open(format=pyaudio.paInt16, channels=capture.channels,
+                                         rate=capture.rate, input=True,
+                                         frames_per_buffer=capture.chunk,
+                                         stream_callback=callback)
+            self._stream.start_stream()
+        except Exception as e:
+            print(f"❌ Error inicializando audio: {e}")
+            self._stream = None
+            self._pa.terminate()
+            self._pa = None
+            return False
+        return True
+
+    def stop(self):
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception as e:
+                print(f"⚠️ Error cerrando stream de audio: {e}")
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+
+class _ThreadedSource:
+    """Base de las fuentes que alimentan el buffer desde un hilo propio."""
+
+    def __init__(self):
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, capture):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(capture,), daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+    def _run(self, capture):
+        raise NotImplementedError
+
+
+class ReplaySource(_ThreadedSource):
+    """Reproduce WAVs (un archivo, un directorio o un glob) como si fueran el micrófono.
+
+    En tiempo real respeta el ritmo del audio; con ``realtime=False`` solo
+    escribe cuando alguien espera datos (``AudioCapture.wait_for``), así que va
+    tan rápido como el pipeline lo consuma sin saltarse nada. Antes del primer
+    archivo y tras cada uno (también el último) inserta ``gap_seconds`` de
+    silencio para que el VAD cierre la frase; nunca menos de lo que el VAD
+    necesita para cerrarla.
+    """
+
+    def __init__(self, path, realtime=True, gap_seconds=1.5, loop=False):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.gap_seconds = gap_seconds
+        self.loop = loop
+
+    def describe(self):
+        return f"replay {self.path} ({'tiempo real' if self.realtime else 'máxima velocidad'})"
+
+    def files(self):
+        if os.path.isdir(self.path):
+            return sorted(glob.glob(os.path.join(self.path, "*.wav")))
+        return sorted(glob.glob(self.path))
+
+    def _gap(self, capture, length):
+        """Silencio a añadir tras ``length`` muestras de audio.
+
+        El VAD exige algo más de ``silence_duration`` en tramas enteras y el
+        grabador lee bloques de ``chunk`` completos: el silencio dura al menos
+        ``silence_duration`` más dos bloques y el total se redondea a bloques,
+        así que la frase se cierra antes de que empiece el siguiente archivo o
+        se acabe la fuente.
+        """
+        block = capture.chunk * capture.channels
+        seconds = max(self.gap_seconds, SILENCE_DURATION + 2 * capture.chunk / capture.rate)
+        samples = int(np.ceil(seconds * capture.rate)) * capture.channels
+        samples += -(length + samples) % block
+        return np.zeros(samples, dtype=np.int16)
+
+    def _run(self, capture):
+        files = self.files()
+        if not files:
+            print(f"❌ No hay archivos WAV que reproducir en {self.path}")
+            return
+        block = capture.chunk * capture.channels
+        # El mismo silencio al principio: el VAD adaptativo calibra el suelo de ruido antes de la primera frase
+        lead = self._gap(capture, 0)
+        started = time.time()
+        written = 0
+        while not self._stop.is_set():
+            for path in files:
+                try:
+                    audio = float32_to_capture(load_wav(path), capture.rate, capture.channels)
+                    if lead is not None:
+                        audio, lead = np.concatenate((lead, audio)), None
+                    audio = np.concatenate((audio, self._gap(capture, len(audio))))
+                except Exception as e:
+                    print(f"⚠️ No se pudo reproducir {path}: {e}")
+                    continue
+                if DEBUG_STT:
+                    print(f"[DEBUG STT] Reproduciendo {path}")
+                for offset in range(0, len(audio), block):
+                    if not self._pace(capture, started, written):
+                        return
+                    capture.write(audio[offset:offset + block])
+                    written += min(block, len(audio) - offset)
+            if not self.loop:
+                break
+        print(f"🏁 Reproducción de audio terminada ({len(files)} archivos)")
+
+    def _pace(self, capture, started, written):
+        """Espera hasta poder escribir el siguiente bloque. Devuelve False si hay que parar."""
+        poll = capture.chunk / capture.rate / 4
+        while not self._stop.is_set():
+            if self.realtime:
+                ahead = written / capture.samples_per_second - (time.time() - started)
+                if ahead <= 0:
+                    return True
+                time.sleep(min(ahead, poll))
+            elif capture.ring.position < capture.demand:
+                return True
+            else:
+                time.sleep(poll / 4)
+        return False
+
+
+class FifoSource(_ThreadedSource):
+    """Lee PCM int16 crudo (a ``sample_rate``/``channels`` de la config) de una tubería con nombre.
+
+    Si no existe la crea; cuando el escritor cierra, vuelve a esperar a otro, p. ej.:
+    ``ffmpeg -i frase.mp3 -f s16le -ac 1 -ar 16000 - > jarvis_audio.fifo``
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def describe(self):
+        return f"tubería {self.path}"
+
+    def start(self, capture):
+        if not os.path.exists(self.path):
+            try:
+                os.mkfifo(self.path)
+            except (OSError, AttributeError) as e:
+                print(f"❌ No se pudo crear la tubería {self.path}: {e}")
+                return False
+        return super().start(capture)
+
+    def _run(self, capture):
+        block_bytes = capture.chunk * capture.channels * 2
+        while not self._stop.is_set():
+            # open() bloquea hasta que aparece un escritor
+            with open(self.path, "rb") as fifo:
+                pending = b""
+                while not self._stop.is_set():
+                    data = fifo.read(block_bytes)
+                    if not data:
+                        break
+                    data = pending + data
+                    usable = len(data) - len(data) % (2 * capture.channels)
+                    pending = data[usable:]
+                    if usable:
+                        capture.write(np.frombuffer(data[:usable], dtype=np.int16))
+
+
+AUDIO_SOURCES = {
+    "microphone": lambda **kwargs: MicrophoneSource(),
+    "replay": lambda path=None, realtime=True, gap_seconds=1.5, loop=False, **kwargs:
+        ReplaySource(path, realtime=realtime, gap_seconds=gap_seconds, loop=loop),
+    "fifo": lambda path=None, **kwargs: FifoSource(path),
+}
+
+
+def create_audio_source(kind=None, **kwargs):
+    """Crea la fuente de ``audio_source`` de la config (o la indicada)."""
+    if kind is None:
+        kind = AUDIO_SOURCE_TYPE
+        kwargs = {"path": AUDIO_SOURCE_PATH, "realtime": AUDIO_SOURCE_REALTIME,
+                  "gap_seconds": AUDIO_SOURCE_GAP_SECONDS, "loop": AUDIO_SOURCE_LOOP, **kwargs}
+    factory = AUDIO_SOURCES.get(kind)
+    if factory is None or (kind != "microphone" and not kwargs.get("path")):
+        print(f"⚠️ audio_source '{kind}' desconocida o sin ruta, usando el micrófono")
+        factory = AUDIO_SOURCES["microphone"]
+    return factory(**kwargs)
+
+
+class AudioCapture:
+    """Servicio de captura de audio siempre abierto.
+
+    Arranca la fuente (micrófono por defecto, o una reproducción de WAVs o una
+    tubería) una sola vez y vuelca todo lo que llega en un AudioRingBuffer.
+    Cada grabación es una ventana de lectura sobre ese buffer, así que no se
+    reabre el dispositivo ni se pierde audio entre llamadas.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, channels=CHANNELS, chunk=CHUNK,
+                 buffer_seconds=CAPTURE_BUFFER_SECONDS, source=None):
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.ring = AudioRingBuffer(rate * channels * buffer_seconds)
+        self.source = source
+        # Posición más avanzada que algún lector ha pedido (marca el ritmo del replay rápido)
+        self.demand = 0
+        self._started = False
+        self.history = None
+        self._history_base = 0
+        # Posiciones de la última reproducción del TTS: lo grabado entre ambas es eco de Jarvis
+        self.playback_start = None
+        self.playback_end = 0
+        self.playing = False
+
+    @property
+    def position(self):
+        return self.ring.position
+
+    @property
+    def samples_per_second(self):
+        return self.rate * self.channels
+
+    @property
+    def running(self):
+        return self._started and self.source.active
+
+    def start(self):
+        if self.running:
+            return True
+        if self.source is None:
+            self.source = create_audio_source()
+        if AUDIO_HISTORY_ENABLED and self.history is None:
+            self._open_history()
+        if not self.source.start(self):
+            return False
+        self._started = True
+        if DEBUG_STT:
+            print(f"[DEBUG STT] Captura de audio iniciada desde {self.source.describe()} "
+                  f"({self.rate} Hz, {self.channels} canal/es)")
+        return True
+
+    def stop(self):
+        self._started = False
+        if self.source is not None:
+            self.source.stop()
+        if self.history is not None:
+            self.history.close()
+
+    def _open_history(self):
+        try:
+            self.history = AudioHistory(AUDIO_HISTORY_PATH, AUDIO_HISTORY_MINUTES, self.rate, self.channels)
+        except Exception as e:
+            print(f"⚠️ No se pudo abrir el historial de audio {AUDIO_HISTORY_PATH}: {e}")
+            return
+        # El historial avanza a la par que el buffer: basta un desplazamiento fijo entre posiciones
+        self._history_base = self.history.position - self.ring.position
+        if DEBUG_STT:
+            print(f"[DEBUG STT] Historial de audio: {AUDIO_HISTORY_MINUTES} min en {AUDIO_HISTORY_PATH}")
+
+    def write(self, samples):
+        """Punto de entrada de las fuentes: buffer en memoria y, si está activo, historial en disco."""
+        self.ring.write(samples)
+        if self.history is not None:
+            self.history.write(samples)
+
+    def mark_playback(self, playing):
+        """Lo llama el TTS al empezar (``True``) y al terminar (``False``) de hablar."""
+        if playing:
+            self.playback_start = self.position
+        else:
+            self.playback_end = self.position
+        self.playing = playing
+
+    def overlaps_playback(self, start, end):
+        """True si [start, end) se solapa con la última reproducción del TTS o con la que sigue sonando."""
+        if self.playback_start is None or self.playback_start >= end:
+            return False
+        return self.playing or self.playback_end > start
+
+    def mark_utterance(self, start, end):
+        if self.history is not None:
+            self.history.mark_utterance(start + self._history_base, end + self._history_base)
+
+    def wait_for(self, position, timeout=1.0):
+        """Espera a que el buffer alcance ``position``. Devuelve False si vence el timeout."""
+        self.demand = max(self.demand, position)
+        deadline = time.time() + timeout
+        poll = self.chunk / self.rate / 4
+        while self.ring.position < position:
+            if not self.running or time.time() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def read(self, start, end=None):
+        return self.ring.read(start, end)
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+def get_audio_capture():
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture()
+        return _capture
+
+def start_audio_capture():
+    return get_audio_capture().start()
+
+def stop_audio_capture():
+    if _capture is not None:
+        _capture.stop()
+
+def rms_from_samples(samples):
+    if len(samples) == 0:
         return 0.0
-    rms = np.sqrt(np.mean(np.square(audio_data.astype(np.float32))))
+    rms = np.sqrt(np.mean(np.square(samples.astype(np.float32))))
     return rms / 32768.0
 
-def record_audio_simple(max_duration=12, silence_threshold=None, silence_duration=None):
-    if silence_threshold is None:
-        silence_threshold = VOLUME_THRESHOLD
-    if silence_duration is None:
-        silence_duration = SILENCE_DURATION
+def rms_from_bytes(data_bytes):
+    return rms_from_samples(np.frombuffer(data_bytes, dtype=np.int16))
 
-    CHUNK = 1024
-    FORMAT = pyaudio.paInt16
-    RATE = SAMPLE_RATE
+def record_audio_simple(max_duration=12, silence_threshold=None, silence_duration=None, on_chunk=None,
+                        preroll_ms=None, start_pos=None):
+    """Graba una ventana del buffer de captura hasta detectar el final del habla.
 
-    p = pyaudio.PyAudio()
-    try:
-        stream = p.open(format=FORMAT, channels=CHANNELS, rate=RATE,
-                        input=True, frames_per_buffer=CHUNK)
-    except Exception as e:
-        print(f"❌ Error inicializando audio: {e}")
+    La lectura empieza ``preroll_ms`` antes del momento de la llamada: como el
+    micrófono nunca se cierra, el buffer ya contiene lo dicho justo antes (por
+    ejemplo, si el usuario empieza a hablar mientras se abre la ventana), pero
+    nunca antes del final de la última reproducción del TTS, que sería eco de
+    la propia respuesta. La frase final arranca en el inicio de habla detectado
+    menos ese mismo pre-roll, así que no se pierden sílabas.
+    Con ``start_pos`` la lectura empieza en esa posición del buffer (menos el
+    pre-roll), p. ej. donde el usuario interrumpió la respuesta. Sin él, una
+    ventana que se solapa con la voz de Jarvis se descarta: lo grabado sería
+    su propia respuesta y no una orden.
+
+    ``on_chunk(start_pos, read_pos, speech_detected)`` se llama tras cada bloque
+    leído; lo usa el modo streaming para decodificar mientras se habla.
+    """
+    capture = get_audio_capture()
+    if not capture.start():
         return None
 
+    chunk_samples = capture.chunk * capture.channels
+    vad = create_vad(rate=capture.rate, channels=capture.channels,
+                     silence_duration=silence_duration, silence_threshold=silence_threshold)
+
     if DEBUG_STT:
-        print(f"[DEBUG STT] Grabando audio (máximo {max_duration}s)...")
+        print(f"[DEBUG STT] Grabando audio (máximo {max_duration}s, VAD {VAD_MODE})...")
 
-    frames = []
-    silence_counter = 0
-    speech_detected = False
-    start_time = time.time()
+    preroll_ms = PREROLL_MS if preroll_ms is None else preroll_ms
+    preroll_samples = int(preroll_ms / 1000 * capture.rate) * capture.channels
+    live_pos = capture.position
+    echo_guard = start_pos is None
+    if start_pos is None:
+        start_pos = max(0, live_pos - preroll_samples, capture.playback_end)
+    else:
+        start_pos = max(0, start_pos - preroll_samples)
+    read_pos = start_pos
+    onset_pos = None
+    chunks = 0
 
     try:
         while True:
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            frames.append(data)
-
-            volume = rms_from_bytes(data)
-            if len(frames) % 10 == 0 and DEBUG_STT:
-                print(f"[DEBUG STT] Volumen: {volume:.4f}, Habla detectada: {speech_detected}")
-
-            speech_threshold = VOLUME_THRESHOLD * 1.2
-            if volume > speech_threshold:
-                speech_detected = True
-                silence_counter = 0
-            elif volume < silence_threshold:
-                silence_counter += CHUNK / RATE
-            else:
-                silence_counter += (CHUNK / RATE) * 0.5
+            if not capture.wait_for(read_pos + chunk_samples):
+                print("❌ Error durante grabación: la fuente de audio no entrega datos")
+                return None
+            data = capture.read(read_pos, read_pos + chunk_samples)
+            read_pos += chunk_samples
+            chunks += 1
+
+            vad.process(data)
+            speech_detected = vad.speech_detected
+            if speech_detected and onset_pos is None:
+                onset_pos = read_pos - chunk_samples
+            if chunks % 10 == 0 and DEBUG_STT:
+                floor = getattr(vad, "noise_floor", None)
+                floor_str = f", suelo de ruido: {floor:.4f}" if floor is not None else ""
+                print(f"[DEBUG STT] Volumen: {vad.level:.4f}{floor_str}, Habla detectada: {speech_detected}")
 
-            elapsed = time.time() - start_time
+            if on_chunk is not None:
+                on_chunk(start_pos, read_pos, speech_detected)
+
+            elapsed = (read_pos - live_pos) / capture.samples_per_second
             if elapsed >= max_duration:
                 if DEBUG_STT:
                     print("[DEBUG STT] Tiempo máximo alcanzado.")
                 break
 
-            if speech_detected and silence_counter >= silence_duration:
+            if vad.ended:
                 if DEBUG_STT:
                     print("[DEBUG STT] Silencio detectado tras habla, terminando grabación.")
                 break
@@ -87,87 +556,351 @@ def record_audio_simple(max_duration=12, silence_threshold=None, silence_duratio
     except Exception as e:
         print(f"❌ Error durante grabación: {e}")
         return None
-    finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
 
-    if len(frames) == 0:
-        print("[DEBUG STT] No se grabó ningún frame.")
+    if onset_pos is not None:
+        start_pos = max(start_pos, onset_pos - preroll_samples)
+    if echo_guard and capture.overlaps_playback(start_pos, read_pos):
+        if DEBUG_STT:
+            print("[DEBUG STT] La grabación se solapa con la voz de Jarvis, descartando.")
+        return None
+    audio = capture.read(start_pos, read_pos)
+    if audio.nbytes < MIN_FILE_SIZE:
+        if DEBUG_STT:
+            print(f"[DEBUG STT] Grabación muy corta ({audio.nbytes} bytes), descartando.")
         return None
+    if onset_pos is not None:
+        # Solo las ventanas con habla son frases; las vencidas en silencio no se guardan como tales
+        capture.mark_utterance(start_pos, read_pos)
 
-    # Guardar archivo WAV
-    filename = "command.wav"
-    try:
-        wf = wave.open(filename, 'wb')
-        wf.setnchannels(CHANNELS)
-        try:
-            wf.setsampwidth(p.get_sample_size(FORMAT))
-        except:
-            wf.setsampwidth(2)  # Fallback por defecto
-        wf.setframerate(RATE)
-        wf.writeframes(b''.join(frames))
-        wf.close()
-
-        size = os.path.getsize(filename)
-        if size < 1000:
-            if DEBUG_STT:
-                print(f"[DEBUG STT] Archivo muy pequeño ({size} bytes), descartando.")
-            return None
+    if DEBUG_STT:
+        print(f"[DEBUG STT] Grabación en memoria: {len(audio) / capture.samples_per_second:.2f}s ({audio.nbytes} bytes)")
+    return audio
 
-        if DEBUG_STT:
-            print(f"[DEBUG STT] Grabación guardada como {filename} ({size} bytes)")
-        return filename
+def resample(audio, rate_in, rate_out):
+    """Cambia la frecuencia de muestreo de un buffer float32 mono.
 
-    except Exception as e:
-        print(f"❌ Error guardando archivo WAV: {e}")
-        return None
+    Al bajar de frecuencia (44,1/48 kHz → 16 kHz) se filtra con ``resample_poly``
+    para que lo que queda por encima del nuevo Nyquist no se pliegue sobre la
+    voz; al subir basta con interpolar.
+    """
+    rate_in, rate_out = int(rate_in), int(rate_out)
+    if rate_in == rate_out or not len(audio):
+        return audio
+    if rate_out < rate_in:
+        from scipy.signal import resample_poly
+        g = math.gcd(rate_in, rate_out)
+        return resample_poly(audio, rate_out // g, rate_in // g).astype(np.float32)
+    n_out = int(len(audio) * rate_out / rate_in)
+    return np.interp(np.linspace(0, len(audio) - 1, n_out), np.arange(len(audio)), audio).astype(np.float32)
 
-def record_audio(duration=12):
-    return record_audio_simple(max_duration=duration)
+def audio_to_float32(samples, rate=None, channels=None):
+    """Convierte muestras int16 capturadas al formato que espera Whisper:
+    float32 mono en [-1, 1] a 16 kHz."""
+    rate = rate or SAMPLE_RATE
+    channels = channels or CHANNELS
+    audio = np.asarray(samples)
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    else:
+        audio = audio.astype(np.float32, copy=False)
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    return resample(audio, rate, WHISPER_SAMPLE_RATE)
 
-def speech_to_text(filename):
-    try:
-        if DEBUG_STT:
-            print(f"[DEBUG STT] Transcribiendo archivo: {filename}")
+def float32_to_capture(audio, rate=None, channels=None):
+    """Inversa de audio_to_float32: float32 mono a 16 kHz → int16 intercalado al formato de captura."""
+    rate = rate or SAMPLE_RATE
+    channels = channels or CHANNELS
+    audio = resample(audio, WHISPER_SAMPLE_RATE, rate)
+    samples = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    return samples
+
+def trim_to_speech(audio):
+    """Recorta un buffer float32 a 16 kHz a sus zonas con habla (silencio inicial, final e intermedio largo)."""
+    regions = speech_regions(audio, WHISPER_SAMPLE_RATE, padding=STT_TRIM_PADDING, merge_gap=STT_TRIM_MERGE_GAP)
+    if not regions:
+        # Mejor decodificar de más que perder una frase dicha muy bajo
+        return audio
+    if len(regions) == 1:
+        trimmed = audio[regions[0][0]:regions[0][1]]
+    else:
+        trimmed = np.concatenate([audio[start:end] for start, end in regions])
+    if DEBUG_STT and len(audio):
+        removed = 1 - len(trimmed) / len(audio)
+        print(f"[DEBUG STT] Recorte de silencio: {len(audio) / WHISPER_SAMPLE_RATE:.2f}s → "
+              f"{len(trimmed) / WHISPER_SAMPLE_RATE:.2f}s ({removed:.0%} descartado, {len(regions)} zonas)")
+    return trimmed
 
-        segments, info = whisper_model.transcribe(
-            filename,
-            language="es",
-            beam_size=5,
-            temperature=WHISPER_TEMPERATURE,
-            no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
-            log_prob_threshold=WHISPER_LOG_PROB_THRESHOLD,
-            compression_ratio_threshold=2.4
-        )
+def load_wav(path):
+    """Lee un WAV PCM de 16 bits y lo devuelve como float32 mono a 16 kHz."""
+    with wave.open(path, "rb") as wf:
+        rate, channels = wf.getframerate(), wf.getnchannels()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return audio_to_float32(samples, rate, channels)
 
-        text = "".join([s.text for s in segments]).strip()
+def record_audio(duration=12, start_pos=None, preroll_ms=None):
+    return record_audio_simple(max_duration=duration, start_pos=start_pos, preroll_ms=preroll_ms)
 
+NOISE_PATTERNS = [
+    "subtítulos por la comunidad",
+    "gracias por ver",
+    "suscríbete",
+    "amara.org"
+]
+
+def filter_transcript(text):
+    """Descarta transcripciones demasiado cortas o alucinaciones típicas de Whisper."""
+    if len(text) < 3:
         if DEBUG_STT:
-            print(f"[DEBUG STT] Confianza promedio: {info.language_probability:.2f}")
-            print(f"[DEBUG STT] Texto transcrito: '{text}'")
+            print("[DEBUG STT] Texto muy corto, descartando.")
+        return ""
 
-        if len(text) < 3:
+    text_lower = text.lower()
+    for pattern in NOISE_PATTERNS:
+        if pattern in text_lower:
             if DEBUG_STT:
-                print("[DEBUG STT] Texto muy corto, descartando.")
+                print(f"[DEBUG STT] Texto filtrado como ruido: '{text}'")
             return ""
 
-        noise_patterns = [
-            "subtítulos por la comunidad",
-            "gracias por ver",
-            "suscríbete",
-            "amara.org"
-        ]
+    return text
 
-        text_lower = text.lower()
-        for pattern in noise_patterns:
-            if pattern in text_lower:
-                if DEBUG_STT:
-                    print(f"[DEBUG STT] Texto filtrado como ruido: '{text}'")
-                return ""
+def get_stt_timings():
+    summary = model_manager.timings_summary()
+    escalation = decode_stats.summary()
+    return f"{summary} · {escalation}" if summary and escalation else summary
+
+def get_stt_model_status():
+    if STT_WORKER_PROCESS:
+        # Consultar el estado no arranca el proceso (en modo solo texto nunca se usa)
+        worker = _stt_worker
+        return worker.model_status if worker is not None else "proceso STT sin arrancar"
+    return model_manager.status_summary()
+
+def set_model_status_callback(callback):
+    """Registra ``callback()`` para cuando un modelo se carga o se descarga por inactividad."""
+    global _model_status_callback
+    _model_status_callback = callback
+    model_manager.on_change = callback
+    if _stt_worker is not None:
+        _stt_worker.on_change = callback
+
+def has_model_cascade():
+    return model_manager.has_cascade()
+
+class DecodeStats:
+    """Cuenta cuántas decodificaciones voraces han necesitado escalar a beam search."""
+
+    def __init__(self):
+        self.total = 0
+        self.escalated = 0
 
-        return text
+    def record(self, escalated):
+        self.total += 1
+        if escalated:
+            self.escalated += 1
+
+    def summary(self):
+        if not self.total:
+            return ""
+        return f"escaladas {self.escalated}/{self.total} ({self.escalated / self.total:.0%})"
+
+decode_stats = DecodeStats()
+
+def _temperature_fallback():
+    """Temperaturas para reintentos: la configurada y luego valores crecientes hasta 1.0."""
+    temperatures = [WHISPER_TEMPERATURE]
+    temperatures += [t for t in (0.2, 0.4, 0.6, 0.8, 1.0) if t > WHISPER_TEMPERATURE]
+    return temperatures
+
+def _decode_greedy(model, audio):
+    segments, info = model.transcribe(
+        audio,
+        language="es",
+        beam_size=1,
+        temperature=WHISPER_TEMPERATURE,
+        no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
+        log_prob_threshold=WHISPER_LOG_PROB_THRESHOLD,
+        compression_ratio_threshold=None
+    )
+    return list(segments), info
+
+def _decode_full(model, audio):
+    segments, info = model.transcribe(
+        audio,
+        language="es",
+        beam_size=STT_BEAM_SIZE,
+        temperature=_temperature_fallback() if STT_ADAPTIVE_DECODING else WHISPER_TEMPERATURE,
+        no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
+        log_prob_threshold=WHISPER_LOG_PROB_THRESHOLD,
+        compression_ratio_threshold=2.4
+    )
+    return list(segments), info
+
+def needs_escalation(segments):
+    """Decide si una decodificación voraz es poco fiable. Devuelve (escalar, motivo)."""
+    speech = [s for s in segments if s.no_speech_prob < WHISPER_NO_SPEECH_THRESHOLD]
+    if not speech:
+        return False, ""
+    total = sum(s.end - s.start for s in speech) or len(speech)
+    avg_logprob = sum(s.avg_logprob * ((s.end - s.start) or 1) for s in speech) / total
+    if avg_logprob < STT_ESCALATE_LOGPROB:
+        return True, f"avg_logprob {avg_logprob:.2f}"
+    worst_ratio = max(s.compression_ratio for s in speech)
+    if worst_ratio > STT_ESCALATE_COMPRESSION:
+        return True, f"compression_ratio {worst_ratio:.2f}"
+    return False, ""
+
+def decode(audio, tier=COMMAND_TIER):
+    """Decodifica con la estrategia configurada (voraz y escalado adaptativo, o completa).
+
+    Devuelve (texto sin filtrar, info de faster-whisper, si hubo que escalar).
+    A diferencia de ``speech_to_text``, deja pasar las excepciones.
+    """
+    model = model_manager.get(tier)
+    escalate = False
+    if STT_ADAPTIVE_DECODING:
+        segments, info = _decode_greedy(model, audio)
+        escalate, reason = needs_escalation(segments)
+        if escalate:
+            if DEBUG_STT:
+                print(f"[DEBUG STT] [{tier}] Confianza baja ({reason}), re-decodificando con beam {STT_BEAM_SIZE}")
+            segments, info = _decode_full(model, audio)
+        decode_stats.record(escalate)
+    else:
+        segments, info = _decode_full(model, audio)
+    return "".join([s.text for s in segments]).strip(), info, escalate
+
+def decode_segments(audio, initial_prompt=None):
+    """Decodificación voraz rápida para hipótesis parciales: [(fin del segmento, texto)]."""
+    segments, _ = model_manager.get(COMMAND_TIER).transcribe(
+        audio,
+        language="es",
+        beam_size=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
+        initial_prompt=initial_prompt
+    )
+    return [(seg.end, seg.text.strip()) for seg in segments if seg.text.strip()]
+
+def speech_to_text(audio, tier=COMMAND_TIER):
+    """Transcribe audio capturado (array int16/float32) o, por compatibilidad, una ruta a un archivo.
+
+    ``tier`` elige el modelo: "fast" para palabras de activación y confirmaciones,
+    "command" para los comandos.
+    """
+    try:
+        if isinstance(audio, str):
+            if DEBUG_STT:
+                print(f"[DEBUG STT] Transcribiendo archivo: {audio}")
+        else:
+            audio = audio_to_float32(audio)
+            if STT_TRIM_SILENCE:
+                audio = trim_to_speech(audio)
+            if DEBUG_STT:
+                print(f"[DEBUG STT] Transcribiendo {len(audio) / WHISPER_SAMPLE_RATE:.2f}s de audio en memoria")
+
+        t0 = time.time()
+        if STT_WORKER_PROCESS:
+            text, language_probability, escalated = get_stt_worker().decode(audio, tier)
+            if STT_ADAPTIVE_DECODING:
+                decode_stats.record(escalated)
+        else:
+            text, info, _ = decode(audio, tier)
+            language_probability = info.language_probability
+        model_manager.record_timing(tier, time.time() - t0)
+
+        if DEBUG_STT:
+            print(f"[DEBUG STT] [{tier}] {time.time() - t0:.2f}s, confianza promedio: {language_probability:.2f}")
+            print(f"[DEBUG STT] Texto transcrito: '{text}'")
+            if STT_ADAPTIVE_DECODING:
+                print(f"[DEBUG STT] {decode_stats.summary()}")
+
+        return apply_corrections(filter_transcript(text))
 
     except Exception as e:
         print(f"❌ STT error: {e}")
         return ""
+
+
+class StreamingTranscriber:
+    """Transcripción incremental mientras el usuario sigue hablando.
+
+    Re-decodifica con búsqueda voraz la ventana de audio aún no confirmada.
+    Los segmentos que coinciden en dos decodificaciones seguidas se confirman
+    y la ventana avanza hasta su final, de modo que al terminar el habla solo
+    queda por decodificar una cola corta.
+    """
+
+    def __init__(self, on_partial=None, interval=None):
+        self.on_partial = on_partial
+        self.interval = STT_PARTIAL_INTERVAL if interval is None else interval
+        self.capture = get_audio_capture()
+        self.committed = []
+        self.committed_pos = None
+        self._previous = []
+        self._last_decode_pos = 0
+        self.end_pos = None
+
+    def _decode(self, start, end):
+        audio = audio_to_float32(self.capture.read(start, end), self.capture.rate, self.capture.channels)
+        prompt = " ".join(self.committed) or None
+        if STT_WORKER_PROCESS:
+            return get_stt_worker().decode_segments(audio, initial_prompt=prompt)
+        return decode_segments(audio, initial_prompt=prompt)
+
+    def on_chunk(self, start_pos, read_pos, speech_detected):
+        self.end_pos = read_pos
+        if self.committed_pos is None:
+            self.committed_pos = start_pos
+        if not speech_detected:
+            # Mientras no haya habla, la ventana sigue al audio para no decodificar silencio
+            self.committed_pos = max(self.committed_pos, read_pos - int(self.capture.samples_per_second * 0.5))
+            return
+        if read_pos - self._last_decode_pos < self.interval * self.capture.samples_per_second:
+            return
+        self._last_decode_pos = read_pos
+
+        hypothesis = self._decode(self.committed_pos, read_pos)
+        # Confirmar el prefijo estable (todos menos el último segmento, que puede seguir cambiando)
+        stable = 0
+        while (stable < len(hypothesis) - 1 and stable < len(self._previous)
+               and hypothesis[stable][1] == self._previous[stable][1]):
+            stable += 1
+        if stable:
+            self.committed.extend(text for _, text in hypothesis[:stable])
+            self.committed_pos += int(hypothesis[stable - 1][0] * self.capture.samples_per_second)
+            hypothesis = hypothesis[stable:]
+        self._previous = hypothesis
+
+        if self.on_partial:
+            partial = " ".join(self.committed + [text for _, text in hypothesis])
+            if partial:
+                self.on_partial(partial)
+
+    def finish(self):
+        """Decodifica la cola pendiente y devuelve el texto completo."""
+        start, end = self.committed_pos, self.end_pos
+        tail = []
+        if start is not None and end > start:
+            tail = [text for _, text in self._decode(start, end)]
+        return " ".join(self.committed + tail).strip()
+
+
+def stream_speech_to_text(on_partial=None, max_duration=12, start_pos=None):
+    """Graba y transcribe a la vez, emitiendo hipótesis parciales con ``on_partial(texto)``."""
+    transcriber = StreamingTranscriber(on_partial)
+    try:
+        audio = record_audio_simple(max_duration=max_duration, on_chunk=transcriber.on_chunk, start_pos=start_pos)
+        if audio is None:
+            return ""
+        t0 = time.time()
+        text = transcriber.finish()
+        if DEBUG_STT:
+            print(f"[DEBUG STT] Decodificación final de cola en {time.time() - t0:.2f}s: '{text}'")
+        return apply_corrections(filter_transcript(text))
+    except Exception as e:
+        print(f"❌ STT streaming error: {e}")
+        return ""
@@ -0,0 +1,168 @@
+# stt_models.py - Niveles de modelos Whisper (tiers) compartidos por el motor STT
+
+import gc
+import threading
+import time
+from config_loader import (
+    WHISPER_MODEL_SIZE, USE_GPU, STT_TIERS, STT_COMPUTE_TYPE,
+    STT_CPU_THREADS, STT_NUM_WORKERS, STT_IDLE_UNLOAD_SECONDS
+)
+
+COMMAND_TIER = "command"
+FAST_TIER = "fast"
+REVIEW_TIER = "review"
+IDLE_CHECK_INTERVAL = 10
+
+
+def _process_rss():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+class WhisperModelManager:
+    """Gestiona varios modelos Whisper por nivel de uso.
+
+    Cada tier ("fast", "command", ...) apunta a un tamaño de modelo; los tiers
+    con el mismo tamaño comparten instancia. Un tier no configurado recurre al
+    de comandos, así que sin configuración extra todo usa ``whisper_model_size``.
+    torch y faster-whisper solo se importan al cargar el primer modelo.
+
+    Los modelos sin uso durante ``idle_unload`` segundos se descargan y se
+    vuelven a cargar de forma transparente en la siguiente petición.
+    """
+
+    def __init__(self, tiers=None, compute_type=None, cpu_threads=None, num_workers=None, idle_unload=None):
+        self.tiers = {COMMAND_TIER: WHISPER_MODEL_SIZE}
+        self.tiers.update(tiers if tiers is not None else STT_TIERS)
+        self.compute_type = compute_type or STT_COMPUTE_TYPE
+        self.cpu_threads = STT_CPU_THREADS if cpu_threads is None else cpu_threads
+        self.num_workers = STT_NUM_WORKERS if num_workers is None else num_workers
+        self.idle_unload = STT_IDLE_UNLOAD_SECONDS if idle_unload is None else idle_unload
+        self.device = None
+        self._models = {}
+        self._loading = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._unloader = None
+        self.timings = {}
+        self.load_times = {}
+        self.memory = {}
+        self.on_change = None
+
+    def resolve(self, tier):
+        return tier if tier in self.tiers else COMMAND_TIER
+
+    def has_cascade(self):
+        """True si hay un tier rápido con un modelo distinto al de comandos."""
+        return self.tiers.get(FAST_TIER, self.tiers[COMMAND_TIER]) != self.tiers[COMMAND_TIER]
+
+    def get(self, tier=COMMAND_TIER):
+        size = self.tiers[self.resolve(tier)]
+        while True:
+            with self._lock:
+                self._last_used[size] = time.time()
+                model = self._models.get(size)
+                if model is not None:
+                    return model
+                loading = self._loading.get(size)
+                if loading is None:
+                    loading = self._loading[size] = threading.Event()
+                    break
+            # Otro hilo ya está cargando este tamaño: esperar a que termine (o falle) y volver a mirar
+            loading.wait()
+
+        # La carga tarda segundos: se hace fuera del lock para no bloquear el resto de tiers ni el estado
+        try:
+            model = self._load(size)
+            with self._lock:
+                self._models[size] = model
+                self._last_used[size] = time.time()
+        finally:
+            with self._lock:
+                del self._loading[size]
+            loading.set()
+        self._start_unloader()
+        if self.on_change:
+            self.on_change()
+        return model
+
+    def _load(self, size):
+        import torch
+        from faster_whisper import WhisperModel
+        if self.device is None:
+            self.device = "cuda" if torch.cuda.is_available() and USE_GPU else "cpu"
+        print(f"🔍 Cargando modelo Whisper ({size}, {self.compute_type}) en {self.device}...")
+        rss_before = _process_rss()
+        t0 = time.time()
+        model = WhisperModel(size, device=self.device, compute_type=self.compute_type,
+                             cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+        self.load_times[size] = time.time() - t0
+        rss_after = _process_rss()
+        if rss_before is not None and rss_after is not None:
+            self.memory[size] = max(rss_after - rss_before, 0)
+        print(f"✅ Whisper {size} listo en {self.load_times[size]:.2f}s")
+        return model
+
+    def _start_unloader(self):
+        with self._lock:
+            if self.idle_unload and (self._unloader is None or not self._unloader.is_alive()):
+                self._unloader = threading.Thread(target=self._unload_idle_loop, daemon=True)
+                self._unloader.start()
+
+    def _unload_idle_loop(self):
+        while True:
+            time.sleep(min(IDLE_CHECK_INTERVAL, self.idle_unload))
+            if self.unload_idle() and self.on_change:
+                self.on_change()
+            with self._lock:
+                if not self._models and not self._loading:
+                    self._unloader = None
+                    return
+
+    def unload_idle(self):
+        """Descarga los modelos sin uso reciente. Devuelve True si se descargó alguno."""
+        now = time.time()
+        unloaded = []
+        with self._lock:
+            for size in list(self._models):
+                if now - self._last_used.get(size, 0) >= self.idle_unload:
+                    # Una decodificación en curso conserva su referencia; la memoria se libera al terminar
+                    del self._models[size]
+                    unloaded.append(size)
+        if unloaded:
+            gc.collect()
+            print(f"💤 Whisper descargado por inactividad: {', '.join(unloaded)}")
+        return bool(unloaded)
+
+    def load_all(self):
+        for tier in self.tiers:
+            self.get(tier)
+
+    def record_timing(self, tier, seconds):
+        self.timings[self.resolve(tier)] = seconds
+
+    def timings_summary(self):
+        """Texto compacto con el último tiempo de decodificación por tier."""
+        return " · ".join(
+            f"{tier} ({self.tiers[tier]}) {seconds:.2f}s" for tier, seconds in self.timings.items()
+        )
+
+    def status_summary(self):
+        """Estado de cada modelo: memoria residente estimada o descargado, y latencia de (re)carga."""
+        parts = []
+        with self._lock:
+            for size in dict.fromkeys(self.tiers.values()):
+                load = self.load_times.get(size)
+                load_str = f", carga {load:.1f}s" if load is not None else ""
+                if size in self._models:
+                    mem = self.memory.get(size)
+                    mem_str = f"{mem / 2**20:.0f} MB" if mem is not None else "cargado"
+                    parts.append(f"{size}: {mem_str}{load_str}")
+                elif size in self._loading:
+                    parts.append(f"{size}: cargando…{load_str}")
+                else:
+                    parts.append(f"{size}: 💤{load_str}")
+        return f"{self.compute_type} · " + " · ".join(parts)
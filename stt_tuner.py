@@ -0,0 +1,146 @@
+# stt_tuner.py - Banco de pruebas que elige la configuración STT más rápida para esta máquina
+
+import glob
+import json
+import os
+import re
+import time
+from config_loader import WHISPER_MODEL_SIZE, WHISPER_NO_SPEECH_THRESHOLD, USE_GPU
+
+DEFAULT_CLIPS_DIR = "stt_clips"
+DEFAULT_MODELS = ["tiny", "base", "small"]
+DEFAULT_BEAMS = [1, 3, 5]
+DEFAULT_BUDGET_RTF = 0.5
+
+
+def normalize_words(text):
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """WER por distancia de edición entre palabras."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_clips(clips_dir):
+    """Carga pares (nombre, audio, referencia): cada ``clip.wav`` necesita su ``clip.txt``."""
+    from stt import load_wav
+    clips = []
+    for wav_path in sorted(glob.glob(os.path.join(clips_dir, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(txt_path):
+            print(f"⚠️ {wav_path} sin transcripción de referencia ({txt_path}), se omite")
+            continue
+        with open(txt_path, "r", encoding="utf-8") as f:
+            reference = f.read().strip()
+        clips.append((os.path.basename(wav_path), load_wav(wav_path), reference))
+    return clips
+
+
+def candidate_profiles(models, device):
+    cores = os.cpu_count() or 4
+    threads = sorted({max(1, cores // 2), cores})
+    compute_types = ["float16", "int8_float16"] if device == "cuda" else ["int8", "int8_float32", "float32"]
+    for size in models:
+        for compute_type in compute_types:
+            for cpu_threads in (threads if device == "cpu" else [0]):
+                yield size, compute_type, cpu_threads
+
+
+def benchmark(clips, models=None, beams=None):
+    """Mide RTF (tiempo de decodificación / duración del audio) y WER de cada combinación."""
+    import torch
+    from stt import WHISPER_SAMPLE_RATE
+    from stt_models import WhisperModelManager, COMMAND_TIER
+
+    models = models or DEFAULT_MODELS
+    beams = beams or DEFAULT_BEAMS
+    audio_seconds = sum(len(audio) for _, audio, _ in clips) / WHISPER_SAMPLE_RATE
+    results = []
+    device = "cuda" if torch.cuda.is_available() and USE_GPU else "cpu"
+
+    for size, compute_type, cpu_threads in candidate_profiles(models, device):
+        try:
+            manager = WhisperModelManager(tiers={COMMAND_TIER: size}, compute_type=compute_type,
+                                          cpu_threads=cpu_threads, idle_unload=0)
+            model = manager.get()
+            # Calentamiento: la primera decodificación incluye inicializaciones perezosas
+            list(model.transcribe(clips[0][1], language="es", beam_size=1)[0])
+        except Exception as e:
+            print(f"⚠️ {size}/{compute_type} no disponible: {e}")
+            continue
+
+        for beam_size in beams:
+            t0 = time.time()
+            errors = []
+            for _, audio, reference in clips:
+                segments, _ = model.transcribe(audio, language="es", beam_size=beam_size,
+                                               no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD)
+                errors.append(word_error_rate(reference, "".join(s.text for s in segments)))
+            result = {
+                "whisper_model_size": size,
+                "compute_type": compute_type,
+                "cpu_threads": cpu_threads,
+                "beam_size": beam_size,
+                "rtf": (time.time() - t0) / audio_seconds,
+                "wer": sum(errors) / len(errors),
+            }
+            results.append(result)
+            print(f"   {size:>6} {compute_type:>13} hilos={cpu_threads:<2} beam={beam_size} "
+                  f"→ RTF {result['rtf']:.3f}, WER {result['wer']:.1%}")
+    return results
+
+
+def pick_best(results, budget_rtf):
+    """La más precisa dentro del presupuesto de latencia; si ninguna cabe, la más rápida."""
+    within = [r for r in results if r["rtf"] <= budget_rtf]
+    if within:
+        return min(within, key=lambda r: (r["wer"], r["rtf"]))
+    return min(results, key=lambda r: r["rtf"])
+
+
+def write_config(best, path="config.json"):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    config["whisper_model_size"] = best["whisper_model_size"]
+    stt_config = config.setdefault("stt", {})
+    stt_config["compute_type"] = best["compute_type"]
+    stt_config["cpu_threads"] = best["cpu_threads"]
+    stt_config["beam_size"] = best["beam_size"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+
+def tune_stt(clips_dir=None, budget_rtf=DEFAULT_BUDGET_RTF, models=None, beams=None, config_path="config.json"):
+    clips_dir = clips_dir or DEFAULT_CLIPS_DIR
+    clips = load_clips(clips_dir)
+    if not clips:
+        print(f"❌ No hay clips en {clips_dir}/ (se necesitan pares clip.wav + clip.txt)")
+        return None
+
+    if not models:
+        models = DEFAULT_MODELS + ([WHISPER_MODEL_SIZE] if WHISPER_MODEL_SIZE not in DEFAULT_MODELS else [])
+    print(f"🔬 Ajustando STT con {len(clips)} clips (presupuesto RTF ≤ {budget_rtf})...")
+    results = benchmark(clips, models, beams)
+    if not results:
+        print("❌ Ninguna configuración pudo ejecutarse")
+        return None
+
+    best = pick_best(results, budget_rtf)
+    write_config(best, config_path)
+    print(f"✅ Mejor configuración: Whisper {best['whisper_model_size']}, {best['compute_type']}, "
+          f"hilos {best['cpu_threads']}, beam {best['beam_size']} "
+          f"(RTF {best['rtf']:.3f}, WER {best['wer']:.1%}) → guardada en {config_path}")
+    return best
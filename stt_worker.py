@@ -0,0 +1,233 @@
+# stt_worker.py - Whisper en un proceso aparte: el audio llega por memoria compartida
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+INITIAL_BUFFER_SECONDS = 60
+REQUEST_TIMEOUT = 120
+RESTART_BACKOFF = [1, 2, 5, 10]
+STABLE_SECONDS = 60
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: el hijo comparte el resource_tracker del padre, que es quien libera el bloque
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_silenced(target, requests, results):
+    """Punto de entrada del hijo: sin salida a la terminal, que la ocupa la UI.
+
+    Se redirigen también los descriptores 1 y 2 para callar a las librerías
+    nativas; errores y estado de los modelos vuelven por la cola de resultados.
+    """
+    devnull = open(os.devnull, "w")
+    os.dup2(devnull.fileno(), 1)
+    os.dup2(devnull.fileno(), 2)
+    sys.stdout = sys.stderr = devnull
+    target(requests, results)
+
+
+def _worker_main(requests, results):
+    """Bucle del proceso hijo: decodifica lo que le llega y devuelve el resultado ya simplificado."""
+    import stt
+    # Su salida acaba en /dev/null: no merece la pena formatear trazas
+    stt.DEBUG_STT = False
+    block = None
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, op, shm_name, length, kwargs = request
+        try:
+            if op == "preload":
+                stt.model_manager.load_all()
+                value = None
+            else:
+                if shm_name is None:
+                    audio = length  # ruta a un archivo
+                else:
+                    if block is None or block.name != shm_name:
+                        if block is not None:
+                            block.close()
+                        block = _attach(shm_name)
+                    audio = np.ndarray((length,), dtype=np.float32, buffer=block.buf)
+                if op == "decode":
+                    text, info, escalated = stt.decode(audio, **kwargs)
+                    value = (text, info.language_probability, escalated)
+                else:
+                    value = stt.decode_segments(audio, **kwargs)
+                # La vista sobre el bloque debe soltarse antes de poder cerrarlo
+                del audio
+            results.put((request_id, value, None, stt.model_manager.status_summary()))
+        except Exception as e:
+            results.put((request_id, None, str(e), stt.model_manager.status_summary()))
+    if block is not None:
+        block.close()
+
+
+class SttWorker:
+    """Cliente del proceso de Whisper, con supervisión y reinicio automático.
+
+    El audio se copia en un bloque de ``multiprocessing.shared_memory`` y por la
+    cola solo viajan el nombre del bloque y la longitud; el hijo lo lee sin
+    deserializar nada. Las peticiones son de una en una (el bloque es único).
+    Si el proceso muere, un hilo supervisor lo relanza con espera creciente y la
+    petición en curso se reintenta una vez en el proceso nuevo.
+    """
+
+    def __init__(self, target=_worker_main):
+        self._ctx = mp.get_context("spawn")
+        self._target = target
+        self._lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._shm = None
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._supervisor = None
+        self._spawned_at = 0
+        self._stopping = False
+        self._preloaded = False
+        self.restarts = 0
+        self.model_status = "proceso STT iniciando"
+        self.on_change = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        with self._process_lock:
+            if self._process is None:
+                self._spawn()
+        if self._supervisor is None:
+            self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+            self._supervisor.start()
+
+    def _spawn(self):
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(target=_run_silenced, name="jarvis-stt", daemon=True,
+                                          args=(self._target, self._requests, self._results))
+        self._process.start()
+        self._spawned_at = time.time()
+        if self._preloaded:
+            # Tras un reinicio, volver a dejar los modelos en caliente
+            self._requests.put((next(self._ids), "preload", None, 0, {}))
+
+    def _supervise(self):
+        failures = 0
+        while not self._stopping:
+            process = self._process
+            process.join(timeout=1.0)
+            if self._stopping or process.is_alive():
+                continue
+            failures = 1 if time.time() - self._spawned_at > STABLE_SECONDS else failures + 1
+            delay = RESTART_BACKOFF[min(failures, len(RESTART_BACKOFF)) - 1]
+            print(f"⚠️ Proceso STT caído (código {process.exitcode}), reiniciando en {delay}s...")
+            time.sleep(delay)
+            if self._stopping:
+                break
+            with self._process_lock:
+                if self._process is process:
+                    self._spawn()
+                    self.restarts += 1
+
+    def _ensure_buffer(self, samples):
+        size = samples * 4
+        if self._shm is None or self._shm.size < size:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+            capacity = max(size, INITIAL_BUFFER_SECONDS * 16000 * 4)
+            self._shm = shared_memory.SharedMemory(create=True, size=capacity)
+        return self._shm
+
+    def _call(self, op, audio, kwargs):
+        with self._lock:
+            if self._process is None:
+                self.start()
+            for attempt in range(2):
+                process, results = self._process, self._results
+                request_id = next(self._ids)
+                if audio is None or isinstance(audio, str):
+                    request = (request_id, op, None, audio, kwargs)
+                else:
+                    shm = self._ensure_buffer(len(audio))
+                    np.ndarray((len(audio),), dtype=np.float32, buffer=shm.buf)[:] = audio
+                    request = (request_id, op, shm.name, len(audio), kwargs)
+                self._requests.put(request)
+                try:
+                    return self._wait_result(request_id, process, results)
+                except RuntimeError:
+                    if attempt:
+                        raise
+                    # Esperar a que el supervisor levante el proceso nuevo y reintentar una vez
+                    deadline = time.time() + RESTART_BACKOFF[-1] + 5
+                    while self._process is process and time.time() < deadline:
+                        time.sleep(0.1)
+
+    def _wait_result(self, request_id, process, results):
+        deadline = time.time() + REQUEST_TIMEOUT
+        while True:
+            try:
+                result_id, value, error, status = results.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    raise RuntimeError("el proceso STT terminó durante la decodificación")
+                if time.time() >= deadline:
+                    # Una decodificación colgada bloquea el proceso: se mata y el supervisor lo relanza
+                    process.terminate()
+                    raise RuntimeError(f"el proceso STT no respondió en {REQUEST_TIMEOUT}s")
+                continue
+            self._update_status(status)
+            if result_id != request_id:
+                # Respuesta de una precarga o de una petición que ya venció
+                continue
+            if error is not None:
+                raise Exception(error)
+            return value
+
+    def _update_status(self, status):
+        status = f"{status} · proceso aparte" + (f" ({self.restarts} reinicios)" if self.restarts else "")
+        if status != self.model_status:
+            self.model_status = status
+            if self.on_change:
+                self.on_change()
+
+    def decode(self, audio, tier):
+        """Equivalente a ``stt.decode`` en el proceso hijo: (texto, probabilidad de idioma, escalado)."""
+        return self._call("decode", audio, {"tier": tier})
+
+    def decode_segments(self, audio, initial_prompt=None):
+        return self._call("segments", audio, {"initial_prompt": initial_prompt})
+
+    def preload(self):
+        self._preloaded = True
+        self._call("preload", None, {})
+
+    def stop(self):
+        self._stopping = True
+        if self._process is not None:
+            try:
+                self._requests.put(None)
+                self._process.join(timeout=3)
+            except Exception:
+                pass
+            if self._process.is_alive():
+                self._process.terminate()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
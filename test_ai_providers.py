@@ -0,0 +1,182 @@
+import importlib.util
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if importlib.util.find_spec("httpx") is None:
+    raise unittest.SkipTest("httpx no está instalado")
+
+import config_loader
+from ai import (
+    SYSTEM_PROMPT, ClaudeProvider, GeminiProvider, GroqProvider, Provider, ProviderRegistry, build_messages,
+    get_http_client
+)
+
+
+class CountingProvider(Provider):
+    name, label, key_attr = "fake", "Fake", "gemini_key"
+
+    def __init__(self):
+        self.built = []
+
+    def build(self, key, http):
+        client = (key, http)
+        self.built.append(client)
+        return client
+
+
+def test_registry_reuses_the_client_until_the_key_changes():
+    original = config_loader.gemini_key
+    provider = CountingProvider()
+    registry = ProviderRegistry([provider])
+    try:
+        config_loader.gemini_key = "clave-1"
+        first = registry.client("fake")
+        assert registry.client("fake") is first
+        assert first == ("clave-1", get_http_client())
+        assert len(provider.built) == 1
+
+        # Al recargar la configuración con otra clave, solo entonces se reconstruye
+        config_loader.gemini_key = "clave-2"
+        second = registry.client("fake")
+        assert second is not first and second[0] == "clave-2"
+        assert registry.client("fake") is second
+        # El pool HTTP es el mismo para todos los clientes
+        assert second[1] is first[1]
+        assert len(provider.built) == 2
+    finally:
+        config_loader.gemini_key = original
+
+
+def test_stream_turns_unexpected_errors_into_text():
+    import ai
+    original = ai.configured_providers
+
+    def broken():
+        raise KeyError("ai_provider")
+
+    ai.configured_providers = broken
+    try:
+        assert list(ai.ask_ai_stream("explícame la relatividad")) == ["Error procesando consulta: 'ai_provider'"]
+        assert ai.ask_ai("explícame la relatividad") == "Error procesando consulta: 'ai_provider'"
+    finally:
+        ai.configured_providers = original
+
+
+class StandInAPI:
+    """Servidor local con las rutas de Groq, Gemini y Claude que contesta ``answer`` en trozos.
+
+    Habla HTTP/1.1 con keep-alive y anota qué conexión usó cada petición, para
+    comprobar que los clientes reutilizan el pool compartido.
+    """
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                api.requests.append((self.path, dict(self.headers), body, self.client_address))
+                streaming = body.get("stream") or "alt=sse" in self.path
+                if self.path.startswith("/openai/v1/chat/completions"):
+                    events = api.chat_completions(streaming)
+                elif self.path.startswith("/v1beta/models/"):
+                    events = api.gemini(streaming)
+                else:
+                    events = api.claude(streaming)
+                if streaming:
+                    payload = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    payload = json.dumps(events)
+                    content_type = "application/json"
+                data = payload.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def pieces(self):
+        words = self.answer.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def chat_completions(self, streaming):
+        base = {"id": "x", "created": 0, "model": "stand-in"}
+        if not streaming:
+            return {**base, "object": "chat.completion", "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": self.answer}}]}
+        return [{**base, "object": "chat.completion.chunk", "choices": [
+            {"index": 0, "finish_reason": None, "delta": {"content": piece}}]} for piece in self.pieces()]
+
+    def gemini(self, streaming):
+        if not streaming:
+            return {"candidates": [{"content": {"parts": [{"text": self.answer}]}}]}
+        return [{"candidates": [{"content": {"parts": [{"text": piece}]}}]} for piece in self.pieces()]
+
+    def claude(self, streaming):
+        if not streaming:
+            return {"content": [{"type": "text", "text": self.answer}]}
+        return ([{"type": "message_start"}]
+                + [{"type": "content_block_delta", "delta": {"type": "text_delta", "text": piece}}
+                   for piece in self.pieces()]
+                + [{"type": "message_stop"}])
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def stand_in_registry(url):
+    groq, gemini, claude = GroqProvider(), GeminiProvider(), ClaudeProvider()
+    groq.base_url = url
+    gemini.URL = url + "/v1beta/models/{model}:{method}"
+    claude.URL = url + "/v1/messages"
+    return ProviderRegistry([groq, gemini, claude])
+
+
+def test_providers_answer_streamed_and_whole_over_one_connection():
+    keys = {attr: getattr(config_loader, attr) for attr in ("groq_key", "gemini_key", "claude_key")}
+    api = StandInAPI("Madrid es la capital de España.")
+    try:
+        for attr in keys:
+            setattr(config_loader, attr, f"clave-{attr}")
+        registry = stand_in_registry(api.url)
+        messages = build_messages("¿Cuál es la capital de España?")
+        names = ["claude", "gemini"]
+        if importlib.util.find_spec("groq") is not None:
+            names.insert(0, "groq")
+        for name in names:
+            assert registry.complete(name, messages) == api.answer, name
+            chunks = list(registry.stream(name, messages))
+            assert len(chunks) == 6 and "".join(chunks) == api.answer, name
+            assert registry.client(name) is registry.client(name)
+
+        assert len(api.requests) == 2 * len(names)
+        # Todas las consultas viajaron por la misma conexión keep-alive del pool
+        assert len({client for _, _, _, client in api.requests}) == 1
+
+        gemini = [request for request in api.requests if request[0].startswith("/v1beta/")]
+        assert [path.split("?")[0].rsplit(":", 1)[1] for path, _, _, _ in gemini] == [
+            "generateContent", "streamGenerateContent"]
+        assert all("key=clave-gemini_key" in path for path, _, _, _ in gemini)
+        assert gemini[0][2]["systemInstruction"]["parts"][0]["text"] == SYSTEM_PROMPT
+        claude = [request for request in api.requests if request[0] == "/v1/messages"]
+        assert [body.get("stream", False) for _, _, body, _ in claude] == [False, True]
+        assert claude[0][1]["x-api-key"] == "clave-claude_key" and claude[0][2]["system"] == SYSTEM_PROMPT
+    finally:
+        api.close()
+        for attr, value in keys.items():
+            setattr(config_loader, attr, value)
@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ai_router import FIRST_TOKEN, AllProvidersFailed, ProviderRouter
+
+
+class StandInProvider:
+    """Servidor HTTP local que imita a un proveedor con latencia y fallos configurables."""
+
+    def __init__(self, name, delay=0.0, status=200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                provider.requests += 1
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(provider.delay)
+                body = json.dumps({"provider": provider.name}).encode()
+                self.send_response(provider.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start(**providers):
+    return {name: StandInProvider(name, **settings) for name, settings in providers.items()}
+
+
+def caller(servers):
+    def call(name):
+        request = urllib.request.Request(servers[name].url, data=b"{}", method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.load(response)["provider"]
+    return call
+
+
+def stop(servers):
+    for server in servers.values():
+        server.close()
+
+
+def test_routes_to_fastest_measured_provider():
+    servers = start(groq=dict(delay=0.25), openai=dict(delay=0.02))
+    try:
+        router = ProviderRouter()
+        call = caller(servers)
+        # Sin medidas gana el preferido; después, el más rápido
+        assert router.call(["groq", "openai"], call, preferred="groq") == ("groq", "groq")
+        assert router.call(["openai"], call) == ("openai", "openai")
+        assert router.ranked(["groq", "openai"], preferred="groq") == ["openai", "groq"]
+        before = servers["groq"].requests
+        for _ in range(3):
+            assert router.call(["groq", "openai"], call, preferred="groq")[0] == "openai"
+        assert servers["groq"].requests == before
+    finally:
+        stop(servers)
+
+
+def test_fails_over_and_demotes_erroring_provider():
+    servers = start(groq=dict(status=500), openai=dict(delay=0.02))
+    try:
+        router = ProviderRouter()
+        name, result = router.call(["groq", "openai"], caller(servers), preferred="groq")
+        assert (name, result) == ("openai", "openai")
+        assert router.stats["groq"].failures == 1
+        for _ in range(2):
+            try:
+                router.call(["groq"], caller(servers))
+            except AllProvidersFailed:
+                pass
+        assert not router.stats["groq"].healthy
+        assert router.ranked(["groq", "openai"], preferred="groq") == ["openai", "groq"]
+        assert "err" in router.status()
+    finally:
+        stop(servers)
+
+
+def test_hedges_after_p95_delay_and_takes_first_answer():
+    servers = start(groq=dict(delay=0.02), claude=dict(delay=0.02))
+    try:
+        router = ProviderRouter(hedge_min_delay=0.05)
+        call = caller(servers)
+        for _ in range(5):
+            router.call(["groq"], call)
+        servers["groq"].delay = 1.0
+        discarded = []
+        t0 = time.time()
+        name, result = router.call(["groq", "claude"], call, preferred="groq", hedge=True,
+                                   discard=discarded.append)
+        elapsed = time.time() - t0
+        assert (name, result) == ("claude", "claude")
+        assert elapsed < 0.5
+        time.sleep(1.2)
+        assert discarded == ["groq"]
+    finally:
+        stop(servers)
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    servers = start(groq=dict(delay=0.02), claude=dict(delay=0.02))
+    try:
+        router = ProviderRouter(hedge_min_delay=0.2)
+        assert router.call(["groq", "claude"], caller(servers), preferred="groq", hedge=True)[0] == "groq"
+        time.sleep(0.3)
+        assert servers["claude"].requests == 0
+    finally:
+        stop(servers)
+
+
+def test_first_token_latency_is_tracked_apart_from_full_answers():
+    router = ProviderRouter(hedge_min_delay=0.0)
+    for _ in range(5):
+        router.record("groq", 2.0, ok=True)
+        router.record("groq", 0.2, ok=True, kind=FIRST_TOKEN)
+        router.record("claude", 1.0, ok=True)
+        router.record("claude", 0.4, ok=True, kind=FIRST_TOKEN)
+    # Groq tarda más en acabar pero empieza antes: cada modo elige por su propia medida
+    assert router.ranked(["groq", "claude"]) == ["claude", "groq"]
+    assert router.ranked(["groq", "claude"], kind=FIRST_TOKEN) == ["groq", "claude"]
+    assert router.hedge_delay("groq") == 2.0
+    assert router.hedge_delay("groq", FIRST_TOKEN) == 0.2
+    assert "groq 2.00s, 1.er trozo 0.20s ✓" in router.status()
+
+
+def test_all_providers_failing_reports_every_error():
+    servers = start(groq=dict(status=500), gemini=dict(status=503))
+    try:
+        router = ProviderRouter()
+        try:
+            router.call(["groq", "gemini"], caller(servers), preferred="groq")
+        except AllProvidersFailed as failure:
+            assert [name for name, _ in failure.errors] == ["groq", "gemini"]
+            assert "503" in str(failure)
+        else:
+            raise AssertionError("se esperaba AllProvidersFailed")
+    finally:
+        stop(servers)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+import numpy as np
+
+from audio_history import AudioHistory
+
+RATE = 100
+
+
+def open_history(tmp, minutes=0.1):
+    # 0.1 min a 100 Hz: 600 muestras de capacidad
+    return AudioHistory(os.path.join(tmp, "history.bin"), minutes, RATE, 1)
+
+
+def test_history_wraps_around_and_keeps_the_latest_samples():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = open_history(tmp)
+        assert history.capacity == 600
+        data = np.arange(1000, dtype=np.int16)
+        history.write(data[:450])
+        history.write(data[450:])
+        assert history.position == 1000
+        assert history.read(0).tolist() == data[400:].tolist()
+        assert history.read(550, 650).tolist() == data[550:650].tolist()
+        assert history.read_seconds_ago(2, 1).tolist() == data[800:900].tolist()
+        assert len(history.read(100, 300)) == 0
+        history.close()
+
+
+def test_history_read_ending_exactly_on_the_wrap():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = open_history(tmp)
+        data = np.arange(700, dtype=np.int16)
+        history.write(data)
+        assert history.read(500, 600).tolist() == data[500:600].tolist()
+        assert history.read(550, 650).tolist() == data[550:650].tolist()
+        history.close()
+
+
+def test_history_survives_reopening_and_resets_on_format_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = open_history(tmp)
+        history.write(np.arange(50, dtype=np.int16))
+        history.close()
+        reopened = open_history(tmp)
+        assert reopened.position == 50
+        assert reopened.read(40).tolist() == list(range(40, 50))
+        reopened.close()
+        resized = open_history(tmp, minutes=0.2)
+        assert resized.position == 0
+        resized.close()
+
+
+def test_last_utterance_skips_recent_ones():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = open_history(tmp)
+        history.write(np.arange(300, dtype=np.int16))
+        history.mark_utterance(10, 20)
+        history.mark_utterance(100, 105)
+        assert history.last_utterance().tolist() == list(range(100, 105))
+        assert history.last_utterance(skip=1).tolist() == list(range(10, 20))
+        assert history.last_utterance(skip=2) is None
+        history.close()
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+
+from batch_transcribe import load_done, prepare_resume
+
+
+def write_lines(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def record(path, **fields):
+    return json.dumps({"file": path, **fields}, ensure_ascii=False) + "\n"
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_load_done_skips_errors_and_a_truncated_last_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "out.jsonl")
+        assert load_done(output) == set()
+        write_lines(output, [record("a.wav", text="hola"), record("b.wav", error="corrupto"),
+                             record("b.wav", text="adiós"), record("c.wav", error="corrupto"),
+                             '{"file": "d.wav", "te'])
+        assert load_done(output) == {"a.wav", "b.wav"}
+
+
+def test_resume_retries_errors_without_duplicating_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "out.jsonl")
+        write_lines(output, [record("a.wav", text="hola"), record("b.wav", error="corrupto"),
+                             record("b.wav", error="otra vez"), '{"file": "c.wav", "te'])
+        pending = prepare_resume(output, ["a.wav", "b.wav", "c.wav", "d.wav"])
+        assert pending == ["b.wav", "c.wav", "d.wav"]
+        # Solo queda lo terminado: los reintentos añadirán su propia línea al final
+        assert read_records(output) == [{"file": "a.wav", "text": "hola"}]
+
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(record("b.wav", text="adiós"))
+            f.write(record("c.wav", error="corrupto"))
+        assert prepare_resume(output, ["a.wav", "b.wav", "c.wav"]) == ["c.wav"]
+        assert [r["file"] for r in read_records(output)] == ["a.wav", "b.wav"]
+
+
+def test_resume_leaves_a_finished_output_untouched():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "out.jsonl")
+        assert prepare_resume(output, ["a.wav"]) == ["a.wav"]
+        assert not os.path.exists(output)
+        # Un error sin reintento (el archivo ya no está en la carpeta) se conserva
+        lines = [record("a.wav", text="hola"), record("z.wav", error="corrupto")]
+        write_lines(output, lines)
+        assert prepare_resume(output, ["a.wav"]) == []
+        with open(output, encoding="utf-8") as f:
+            assert f.read() == "".join(lines)
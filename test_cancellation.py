@@ -0,0 +1,130 @@
+import threading
+import time
+
+from cancellation import (
+    CancelToken, CommandCancelled, CommandRunner, is_cancel_request, iterate_cancellable, run_cancellable
+)
+
+
+def test_cancel_runs_callbacks_once_and_late_callbacks_immediately():
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append("tts"))
+    token.cancel("Escape")
+    token.cancel("otra vez")
+    token.on_cancel(lambda: calls.append("tarde"))
+    assert calls == ["tts", "tarde"]
+    assert token.reason == "Escape"
+
+
+def test_run_cancellable_returns_result_or_aborts_blocking_call():
+    token = CancelToken()
+    assert run_cancellable(token, lambda a, b: a + b, 2, 3) == 5
+
+    threading.Timer(0.05, token.cancel, args=("comando nuevo",)).start()
+    t0 = time.time()
+    try:
+        run_cancellable(token, time.sleep, 2)
+    except CommandCancelled as e:
+        assert str(e) == "comando nuevo"
+    else:
+        raise AssertionError("se esperaba CommandCancelled")
+    assert time.time() - t0 < 0.5
+
+
+def test_iterate_cancellable_stops_consumer_and_closes_source():
+    closed = threading.Event()
+
+    def slow_stream():
+        try:
+            for i in range(100):
+                time.sleep(0.05)
+                yield i
+        finally:
+            closed.set()
+
+    token = CancelToken()
+    received = []
+    t0 = time.time()
+    try:
+        for item in iterate_cancellable(token, slow_stream()):
+            received.append(item)
+            if item == 1:
+                threading.Timer(0.01, token.cancel).start()
+    except CommandCancelled:
+        pass
+    assert received == [0, 1]
+    assert time.time() - t0 < 0.5
+    assert closed.wait(1)
+
+
+def test_iterate_cancellable_propagates_errors():
+    def broken():
+        yield "hola"
+        raise RuntimeError("conexión perdida")
+
+    try:
+        list(iterate_cancellable(CancelToken(), broken()))
+    except RuntimeError as e:
+        assert "conexión perdida" in str(e)
+    else:
+        raise AssertionError("se esperaba RuntimeError")
+
+
+def test_newer_command_cancels_the_running_one():
+    runner = CommandRunner(grace=1)
+    log = []
+    finished = threading.Event()
+
+    def command(name, token):
+        try:
+            run_cancellable(token, time.sleep, 0.2 if name == "segundo" else 5)
+            log.append(f"{name} terminado")
+        except CommandCancelled as e:
+            log.append(f"{name} cancelado: {e}")
+        if name == "segundo":
+            finished.set()
+
+    runner.submit(command, "primero")
+    time.sleep(0.05)
+    runner.submit(command, "segundo")
+    assert finished.wait(2)
+    assert log == ["primero cancelado: comando nuevo", "segundo terminado"]
+    time.sleep(0.05)
+    assert not runner.busy
+    assert not runner.cancel("Escape")
+
+
+def test_enqueued_command_waits_for_the_running_one():
+    runner = CommandRunner(grace=1)
+    log = []
+    release = threading.Event()
+    done = threading.Event()
+
+    def command(name, token):
+        token.on_cancel(lambda: log.append(f"{name} cancelado"))
+        if name == "usuario":
+            release.wait(2)
+        log.append(f"{name} terminado")
+        if name == "aviso":
+            done.set()
+
+    runner.enqueue(command, "primero")
+    for _ in range(100):
+        if not runner.busy:
+            break
+        time.sleep(0.01)
+    runner.submit(command, "usuario")
+    runner.enqueue(command, "aviso")
+    time.sleep(0.05)
+    assert log == ["primero terminado"]
+    release.set()
+    assert done.wait(1)
+    assert log == ["primero terminado", "usuario terminado", "aviso terminado"]
+
+
+def test_cancel_phrases():
+    for phrase in ["para", "Cancela.", "para ya, por favor", "cállate, jarvis", "stop"]:
+        assert is_cancel_request(phrase), phrase
+    for phrase in ["para qué sirve esto", "cancela la reunión de mañana", "pon música para dormir", "", "jarvis"]:
+        assert not is_cancel_request(phrase), phrase
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import time
+
+import corrections
+from corrections import CorrectionMatcher
+
+
+def test_longest_key_wins_regardless_of_order():
+    matcher = CorrectionMatcher({"oráis": "hora es", "qué oráis": "qué hora es"})
+    assert matcher.apply("oye jarvis qué oráis") == "oye jarvis qué hora es"
+    assert matcher.apply("son las oráis") == "son las hora es"
+
+
+def test_single_pass_does_not_rewrite_replacements():
+    matcher = CorrectionMatcher({"v s code": "VSCode", "code": "VSCode"})
+    assert matcher.apply("abre v s code") == "abre VSCode"
+    assert matcher.apply("abre code") == "abre VSCode"
+
+
+def test_matches_whole_words_only():
+    matcher = CorrectionMatcher({"git": "Git", "tf": "Terraform"})
+    assert matcher.apply("usa git y digital") == "usa Git y digital"
+    assert matcher.apply("haz un tf plan, no un tfplan") == "haz un Terraform plan, no un tfplan"
+
+
+def test_case_insensitive_and_punctuated_keys():
+    matcher = CorrectionMatcher({"gerbis": "jarvis", "¡suscríbete!": ""})
+    assert matcher.apply("Oye Gerbis, hola") == "Oye jarvis, hola"
+    assert matcher.apply("hola ¡Suscríbete! adiós") == "hola adiós"
+
+
+def test_empty_dictionary_leaves_text_untouched():
+    assert CorrectionMatcher({}).apply("  texto  ") == "  texto  "
+
+
+def test_matcher_rebuilds_when_file_changes():
+    original = corrections.CORRECTIONS_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corrections.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"grok": "groq"}, f)
+        corrections.CORRECTIONS_FILE = path
+        try:
+            assert corrections.apply_corrections("usa grok") == "usa groq"
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"grok": "Groq"}, f)
+            future = time.time() + 5
+            os.utime(path, (future, future))
+            assert corrections.apply_corrections("usa grok") == "usa Groq"
+        finally:
+            corrections.CORRECTIONS_FILE = original
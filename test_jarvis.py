@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+try:
+    import jarvis
+except ImportError as e:
+    # El agente importa la interfaz (textual); sin ella no hay nada que probar aquí
+    raise unittest.SkipTest(f"jarvis no se puede importar: {e}")
+
+from cancellation import CommandRunner
+
+
+class RecordingUI:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, message, sender="System"):
+        self.messages.append((sender, message))
+
+    def set_mic_status(self, active):
+        pass
+
+
+def make_agent(transcript):
+    """Agente sin arrancar (ni audio ni TTS) cuyo ``listen`` devuelve ``transcript``."""
+    agent = jarvis.JarvisAgent.__new__(jarvis.JarvisAgent)
+    agent.ui = RecordingUI()
+    agent.commands = CommandRunner()
+    agent.listening = False
+    agent.voice_input_enabled = True
+    agent.listen = lambda **kwargs: transcript
+    agent.processed = []
+    done = threading.Event()
+
+    def process_command(command, from_voice=True, token=None):
+        agent.processed.append(command)
+        done.set()
+
+    agent.process_command = process_command
+    agent.done = done
+    return agent
+
+
+def test_spoken_cancel_after_barge_in_resumes_listening():
+    agent = make_agent("para")
+    agent.handle_barge_in(1234)
+    assert agent.listening
+    assert agent.processed == []
+
+
+def test_barge_in_command_runs_and_resumes_listening():
+    agent = make_agent("jarvis, pon música")
+    agent.handle_barge_in(1234)
+    assert agent.done.wait(1)
+    assert agent.listening
+    assert agent.processed == ["pon música"]
+
+
+def test_silent_barge_in_resumes_listening():
+    agent = make_agent("")
+    agent.handle_barge_in(1234)
+    assert agent.listening
+    assert agent.processed == []
+
+
+def test_timer_announcement_waits_for_the_running_command():
+    agent = make_agent("")
+    spoken = []
+    agent.speak = lambda text: spoken.append(text)
+    cancelled = threading.Event()
+    started = threading.Event()
+    release = threading.Event()
+    finished = []
+
+    def long_command(token):
+        started.set()
+        token.on_cancel(cancelled.set)
+        release.wait(2)
+        finished.append(spoken[:])
+
+    agent.commands.submit(long_command)
+    assert started.wait(1)
+    agent.timer_finished("5 minutos")
+    time.sleep(0.05)
+    # El comando del usuario sigue vivo y el aviso no se ha dicho todavía
+    assert not cancelled.is_set() and spoken == []
+    release.set()
+    for _ in range(100):
+        if spoken:
+            break
+        time.sleep(0.01)
+    assert finished == [[]]
+    assert not cancelled.is_set()
+    assert spoken == ["Ha terminado el temporizador de 5 minutos."]
+    assert ("Jarvis", "⏰ Ha terminado el temporizador de 5 minutos.") in agent.ui.messages
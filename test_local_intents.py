@@ -0,0 +1,97 @@
+import datetime
+import threading
+
+from local_intents import LocalIntentEngine, format_number, parse_duration, tokenize
+
+NOW = datetime.datetime(2026, 10, 17, 13, 5)
+
+
+def resolve(engine, text):
+    return engine.match(text, NOW)
+
+
+def test_time_and_date_answer_only_whole_questions():
+    engine = LocalIntentEngine()
+    assert resolve(engine, "¿Qué hora es?") == ("hora", "Es la 13:05.")
+    assert resolve(engine, "oye jarvis, dime la hora por favor")[0] == "hora"
+    assert resolve(engine, "¿Qué día es hoy?") == ("fecha", "Hoy es sábado, 17 de octubre de 2026.")
+    # Con algo más que la pregunta, la respuesta es cosa del proveedor
+    assert resolve(engine, "¿A qué hora abre el banco?") is None
+    assert resolve(engine, "¿Qué día se celebra el Pilar?") is None
+
+
+def test_no_substring_misfires():
+    engine = LocalIntentEngine()
+    # "tiempo" no es la hora y "hi" dentro de una palabra no es un saludo
+    assert resolve(engine, "¿Qué tiempo hace hoy?") is None
+    assert resolve(engine, "háblame de Chicago") is None
+    assert resolve(engine, "¿Cuánto cuesta un billete a Roma?") is None
+    assert resolve(engine, "hola")[0] == "saludo"
+    assert resolve(engine, "muchas gracias")[0] == "gracias"
+
+
+def test_arithmetic_respects_precedence_and_number_words():
+    engine = LocalIntentEngine()
+    assert resolve(engine, "¿cuánto es 2 + 3 * 4?")[1].endswith("son 14.")
+    assert resolve(engine, "cuánto es treinta y cinco por dos por favor")[1].endswith("son 70.")
+    assert resolve(engine, "calcula 2 elevado a 10")[1].endswith("son 1024.")
+    assert resolve(engine, "cuánto es 7 dividido entre 2")[1].endswith("son 3,5.")
+    assert resolve(engine, "cuánto es 1,5 más 2")[1].endswith("son 3,5.")
+    assert resolve(engine, "cuánto es cinco entre cero")[1] == "No se puede dividir entre cero."
+
+
+def test_unary_minus_negates_the_next_operand():
+    engine = LocalIntentEngine()
+    assert resolve(engine, "cuánto es 10 entre menos 2")[1].endswith("son -5.")
+    assert resolve(engine, "cuánto es 2 por menos 3")[1].endswith("son -6.")
+    assert resolve(engine, "cuánto es 5 - - 5")[1].endswith("son 10.")
+    assert resolve(engine, "cuánto es menos 3 más 5")[1].endswith("son 2.")
+    assert resolve(engine, "cuánto es 3 menos") is None
+
+
+def test_results_without_a_real_or_readable_value_are_refused():
+    engine = LocalIntentEngine()
+    for text in ["cuánto es menos 8 elevado a 0,5", "cuánto es -8 ^ 0.5"]:
+        assert resolve(engine, text)[1] == "Esa potencia no tiene un resultado real.", text
+    assert resolve(engine, "cuánto es menos 2 elevado a 3")[1].endswith("son -8.")
+    big = "cuánto es " + " por ".join(["10 elevado a 100"] * 4)
+    assert resolve(engine, big)[1] == "Ese número es demasiado grande."
+
+
+def test_large_and_tiny_results_are_read_in_scientific_notation():
+    assert resolve(LocalIntentEngine(), "cuánto es 2 elevado a 100")[1].endswith("son 1,2677 por 10 elevado a 30.")
+    assert format_number(999999999999999.0) == "999999999999999"
+    assert format_number(-2.0 ** 60) == "-1,1529 por 10 elevado a 18"
+    assert format_number(0.00001) == "1 por 10 elevado a -5"
+    assert format_number(0.0) == "0"
+    assert format_number(3.14159) == "3,1416"
+
+
+def test_timers_fire_and_can_be_cancelled():
+    fired = threading.Event()
+    finished = []
+    engine = LocalIntentEngine(on_timer=lambda label: (finished.append(label), fired.set()))
+    assert parse_duration(tokenize("una hora y media")) == 5400
+    assert parse_duration(tokenize("media hora")) == 1800
+    assert parse_duration(tokenize("2 minutos 30 segundos")) == 150
+    assert resolve(engine, "pon un temporizador de 5 minutos") == ("temporizador", "Temporizador de 5 minutos en marcha.")
+    assert resolve(engine, "cancela el temporizador") == ("cancelar_temporizador", "He cancelado 1 temporizador.")
+    assert engine.active_timers == 0
+    assert resolve(engine, "pon un temporizador") is None
+    # Una duración dentro de otra pregunta no es una orden
+    assert resolve(engine, "cuánto dura un temporizador de 5 minutos en el horno") is None
+    assert resolve(engine, "avísame si llueve en 5 minutos") is None
+    assert engine.active_timers == 0
+
+    engine.start_timer(0.05)
+    assert fired.wait(1)
+    assert finished == ["0 segundos"]
+
+
+def test_status_reports_hit_rate():
+    engine = LocalIntentEngine()
+    assert engine.status() == ""
+    assert engine.resolve("qué hora es") is not None
+    assert engine.resolve("explícame la relatividad") is None
+    assert engine.hits == 1 and engine.lookups == 2
+    assert engine.status().startswith("1/2 (50%)")
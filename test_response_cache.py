@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+
+from response_cache import ResponseCache, normalize_query
+
+
+def test_normalized_queries_share_a_key():
+    assert normalize_query("¿Qué es  Python?") == normalize_query("que es python") == "que es python"
+    key = ResponseCache.make_key("¿Qué es Python?", "groq", "llama3-8b-8192", "")
+    assert key == ResponseCache.make_key("que es python", "groq", "llama3-8b-8192", "")
+    assert key != ResponseCache.make_key("que es python", "openai", "gpt-3.5-turbo", "")
+    assert key != ResponseCache.make_key("que es python", "groq", "llama3-8b-8192", "usuario: me llamo Ana")
+
+
+def test_lru_eviction_and_hit_statistics():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "respuesta a", latency=1.0)
+    cache.put("b", "respuesta b", latency=2.0)
+    assert cache.get("a") == "respuesta a"
+    cache.put("c", "respuesta c", latency=0.5)
+    assert cache.get("b") is None
+    assert cache.get("c") == "respuesta c"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.saved_seconds == 1.5
+    assert "2/3" in cache.status()
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=0.05)
+    cache.put("a", "respuesta", latency=1.0)
+    assert cache.get("a") == "respuesta"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_time_sensitive_queries_are_never_cached():
+    cache = ResponseCache(never_cache=["bolsa", "Precio del oro"])
+    for query in ["¿Qué hora es?", "dime la fecha", "qué tiempo hace hoy", "cómo va la Bolsa",
+                  "¿A cuánto está el precio del oro?"]:
+        assert not cache.cacheable(query), query
+    assert cache.cacheable("¿Qué es la fotosíntesis?")
+    # Una frase solo bloquea con sus palabras seguidas, no sueltas ni dentro de otras
+    assert cache.cacheable("¿Por qué el oro tiene precio?")
+    assert cache.cacheable("el precio del orodruin")
+
+
+def test_cache_persists_across_instances():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ai_cache.json")
+        cache = ResponseCache(path, ttl=60)
+        cache.put("a", "respuesta guardada", latency=1.2)
+        cache.flush()
+        restored = ResponseCache(path, ttl=60)
+        assert restored.get("a") == "respuesta guardada"
+        assert restored.saved_seconds == 1.2
+
+
+def test_saves_are_batched():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ai_cache.json")
+        cache = ResponseCache(path, ttl=60, save_delay=0.1)
+        for i in range(20):
+            cache.put(str(i), f"respuesta {i}", latency=0.1)
+        # Ninguna inserción escribe por sí sola: lo hace el temporizador, una vez
+        assert not os.path.exists(path)
+        deadline = time.time() + 2
+        while not os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.02)
+        assert len(ResponseCache(path, ttl=60)) == 20
+        assert cache._save_timer is None
@@ -0,0 +1,190 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+import stt
+from audio_history import AudioHistory
+from stt import AudioCapture, AudioRingBuffer, ReplaySource, needs_escalation, record_audio_simple, resample
+
+Segment = namedtuple("Segment", "start end avg_logprob compression_ratio no_speech_prob")
+
+
+def test_ring_buffer_reads_across_the_wrap():
+    ring = AudioRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.write(np.arange(6, 11, dtype=np.int16))
+    assert ring.position == 11
+    # Las posiciones son absolutas: 3..10 siguen en el buffer aunque hayan dado la vuelta
+    assert ring.read(3).tolist() == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert ring.read(5, 9).tolist() == [5, 6, 7, 8]
+
+
+def test_ring_buffer_drops_overwritten_samples():
+    ring = AudioRingBuffer(8)
+    ring.write(np.arange(20, dtype=np.int16))
+    assert ring.read(0).tolist() == list(range(12, 20))
+    assert ring.read(0, 14).tolist() == [12, 13]
+    assert len(ring.read(2, 10)) == 0
+    assert len(ring.read(20)) == 0
+
+
+def test_ring_buffer_write_larger_than_capacity_keeps_the_tail():
+    ring = AudioRingBuffer(4)
+    ring.write(np.arange(3, dtype=np.int16))
+    ring.write(np.arange(100, 110, dtype=np.int16))
+    assert ring.position == 13
+    assert ring.read(0).tolist() == [106, 107, 108, 109]
+
+
+def test_ring_buffer_read_never_goes_past_published_position():
+    ring = AudioRingBuffer(16)
+    ring.write(np.ones(5, dtype=np.int16))
+    assert len(ring.read(0, 100)) == 5
+    assert len(ring.read(3, 2)) == 0
+
+
+def test_confident_greedy_decode_is_kept():
+    segments = [Segment(0.0, 2.0, -0.2, 1.3, 0.01), Segment(2.0, 3.0, -0.4, 1.5, 0.02)]
+    assert needs_escalation(segments) == (False, "")
+    assert needs_escalation([]) == (False, "")
+
+
+def test_low_logprob_is_weighted_by_segment_duration():
+    # Un segmento corto muy dudoso no arrastra la media de uno largo y claro...
+    assert not needs_escalation([Segment(0.0, 4.0, -0.3, 1.4, 0.0), Segment(4.0, 4.5, -1.5, 1.4, 0.0)])[0]
+    # ...pero si domina la frase, se escala
+    escalate, reason = needs_escalation([Segment(0.0, 1.0, -0.3, 1.4, 0.0), Segment(1.0, 4.0, -1.0, 1.4, 0.0)])
+    assert escalate and reason.startswith("avg_logprob")
+
+
+def test_repetitive_output_escalates_on_compression_ratio():
+    escalate, reason = needs_escalation([Segment(0.0, 2.0, -0.2, 3.1, 0.0)])
+    assert escalate and reason == "compression_ratio 3.10"
+
+
+def test_segments_without_speech_are_ignored():
+    assert needs_escalation([Segment(0.0, 2.0, -2.0, 3.0, 0.9)]) == (False, "")
+
+
+def test_upsampling_interpolates_without_scipy():
+    audio = np.linspace(-1, 1, 160, dtype=np.float32)
+    out = resample(audio, 16000, 48000)
+    assert len(out) == 480 and out.dtype == np.float32
+    assert abs(out[0] + 1) < 1e-6 and abs(out[-1] - 1) < 1e-6
+    assert resample(audio, 16000, 16000) is audio
+
+
+def test_downsampling_filters_out_aliases():
+    if importlib.util.find_spec("scipy") is None:
+        raise unittest.SkipTest("scipy no está instalado")
+    t = np.arange(48000) / 48000
+    # 15 kHz no cabe en 16 kHz: sin filtrar se plegaría a 1 kHz, en plena banda de voz
+    audio = np.sin(2 * np.pi * 15000 * t).astype(np.float32)
+    out = resample(audio, 48000, 16000)
+    assert len(out) == 16000
+    assert np.sqrt(np.mean(out[1000:-1000] ** 2)) < 0.05
+
+
+def write_wav(path, samples, rate=16000):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+
+
+def tone(seconds, amplitude=0.5, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+
+
+def replay_capture(path):
+    capture = AudioCapture(rate=16000, channels=1, source=ReplaySource(path, realtime=False))
+    assert capture.start()
+    stt._capture = capture
+    return capture
+
+
+def test_preroll_does_not_reach_back_into_tts_playback():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "silencio.wav")
+        write_wav(path, np.zeros(16000 * 5, dtype=np.int16))
+        capture = replay_capture(path)
+        try:
+            # La cola de "Te escucho" que recoge el micrófono justo antes de abrir la ventana
+            capture.write(tone(0.4))
+            audio = record_audio_simple(max_duration=1, preroll_ms=500)
+            assert np.abs(audio).max() > 1000
+
+            capture.mark_playback(True)
+            capture.write(tone(0.4))
+            capture.mark_playback(False)
+            audio = record_audio_simple(max_duration=1, preroll_ms=500)
+            assert np.abs(audio).max() == 0
+        finally:
+            capture.stop()
+            stt._capture = None
+
+
+def test_replay_closes_every_clip_with_the_default_gap():
+    import vad
+    original_mode = vad.VAD_MODE
+    with tempfile.TemporaryDirectory() as tmp:
+        # Frases recortadas al ras: todo el silencio entre ellas lo pone el replay
+        for i in range(2):
+            write_wav(os.path.join(tmp, f"{i}.wav"), tone(0.6, amplitude=0.5 + 0.2 * i))
+        try:
+            for mode in ("simple", "adaptive"):
+                vad.VAD_MODE = mode
+                capture = replay_capture(tmp)
+                try:
+                    clips = [record_audio_simple(max_duration=5, preroll_ms=0) for _ in range(3)]
+                finally:
+                    capture.stop()
+                assert clips[0] is not None and clips[1] is not None, mode
+                assert 0.5 < len(clips[0]) / 16000 < 2.5 and 0.5 < len(clips[1]) / 16000 < 2.5
+                assert np.abs(clips[1]).max() > np.abs(clips[0]).max()
+                assert clips[2] is None
+        finally:
+            vad.VAD_MODE = original_mode
+            stt._capture = None
+
+
+def test_windows_overlapping_tts_playback_are_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "silencio.wav")
+        write_wav(path, np.zeros(16000 * 5, dtype=np.int16))
+        capture = replay_capture(path)
+        try:
+            capture.mark_playback(True)
+            assert record_audio_simple(max_duration=0.5, preroll_ms=0) is None
+            capture.mark_playback(False)
+            assert record_audio_simple(max_duration=0.5, preroll_ms=0) is not None
+            # Tras una interrupción la ventana empieza a propósito dentro de la reproducción
+            assert record_audio_simple(max_duration=0.5, start_pos=capture.playback_start) is not None
+        finally:
+            capture.stop()
+            stt._capture = None
+
+
+def test_only_windows_with_speech_are_stored_as_utterances():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_wav(os.path.join(tmp, "0.wav"), tone(0.6))
+        capture = AudioCapture(rate=16000, channels=1, source=ReplaySource(os.path.join(tmp, "*.wav"), realtime=False))
+        capture.history = AudioHistory(os.path.join(tmp, "history.bin"), 0.5, 16000, 1)
+        assert capture.start()
+        stt._capture = capture
+        try:
+            # El replay empieza con silencio: esta ventana vence sin habla
+            assert record_audio_simple(max_duration=0.5, preroll_ms=0) is not None
+            assert len(capture.history.utterances) == 0
+            assert record_audio_simple(max_duration=5, preroll_ms=0) is not None
+            assert len(capture.history.utterances) == 1
+        finally:
+            capture.stop()
+            stt._capture = None
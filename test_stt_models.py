@@ -0,0 +1,79 @@
+import threading
+import time
+
+from stt_models import COMMAND_TIER, FAST_TIER, WhisperModelManager
+
+
+class FakeManager(WhisperModelManager):
+    """Sin faster-whisper: cada carga devuelve un objeto nuevo y puede quedarse esperando."""
+
+    def __init__(self, **kwargs):
+        super().__init__(tiers={COMMAND_TIER: "small", FAST_TIER: "tiny"}, compute_type="int8", **kwargs)
+        self.loads = []
+        self.gates = {}
+
+    def _load(self, size):
+        self.loads.append(size)
+        gate = self.gates.get(size)
+        if gate is not None:
+            gate.wait(2)
+        self.load_times[size] = 0.1
+        return object()
+
+
+def test_idle_models_are_unloaded_and_reloaded_on_demand():
+    manager = FakeManager(idle_unload=60)
+    changes = []
+    manager.on_change = lambda: changes.append(1)
+    first = manager.get(COMMAND_TIER)
+    assert manager.get(COMMAND_TIER) is first
+    assert manager.loads == ["small"] and len(changes) == 1
+    assert not manager.unload_idle()
+
+    manager._last_used["small"] -= 61
+    assert manager.unload_idle()
+    assert "small: 💤" in manager.status_summary()
+    assert manager.get(COMMAND_TIER) is not first
+    assert manager.loads == ["small", "small"]
+
+
+def test_a_slow_load_does_not_block_other_tiers_or_status():
+    manager = FakeManager(idle_unload=0)
+    manager.gates["small"] = threading.Event()
+    results = []
+    loaders = [threading.Thread(target=lambda: results.append(manager.get(COMMAND_TIER))) for _ in range(2)]
+    for thread in loaders:
+        thread.start()
+    while not manager.loads:
+        time.sleep(0.01)
+
+    # Mientras "small" carga, el resto del gestor sigue respondiendo
+    assert "small: cargando…" in manager.status_summary()
+    assert manager.get(FAST_TIER) is not None
+
+    manager.gates["small"].set()
+    for thread in loaders:
+        thread.join(2)
+    # Las dos peticiones esperaron a la misma carga
+    assert manager.loads == ["small", "tiny"]
+    assert len(results) == 2 and results[0] is results[1]
+
+
+def test_a_failed_load_lets_the_next_request_retry():
+    manager = FakeManager(idle_unload=0)
+    calls = []
+
+    def flaky(size):
+        calls.append(size)
+        if len(calls) == 1:
+            raise RuntimeError("sin memoria")
+        return object()
+
+    manager._load = flaky
+    try:
+        manager.get(COMMAND_TIER)
+        assert False, "la carga debía fallar"
+    except RuntimeError:
+        pass
+    assert manager.get(COMMAND_TIER) is not None
+    assert calls == ["small", "small"]
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+
+from stt_tuner import pick_best, word_error_rate, write_config
+
+
+def result(size, beam, rtf, wer):
+    return {"whisper_model_size": size, "compute_type": "int8", "cpu_threads": 4,
+            "beam_size": beam, "rtf": rtf, "wer": wer}
+
+
+def test_word_error_rate_counts_edits_per_reference_word():
+    assert word_error_rate("pon un temporizador", "Pon un temporizador.") == 0.0
+    assert word_error_rate("pon un temporizador", "pon temporizador") == 1 / 3
+    assert word_error_rate("qué hora es", "qué ahora es ya") == 2 / 3
+    # Más inserciones que palabras de referencia: el WER pasa de 1
+    assert word_error_rate("hola", "hola qué tal estás") == 3.0
+
+
+def test_word_error_rate_with_empty_reference():
+    assert word_error_rate("", "") == 0.0
+    assert word_error_rate("  ¿? ", "") == 0.0
+    assert word_error_rate("", "gracias por ver el vídeo") == 1.0
+    assert word_error_rate("hola jarvis", "") == 1.0
+
+
+def test_pick_best_prefers_accuracy_within_budget():
+    results = [result("tiny", 1, 0.1, 0.30), result("base", 1, 0.3, 0.15),
+               result("small", 5, 0.9, 0.05)]
+    assert pick_best(results, 0.5)["whisper_model_size"] == "base"
+    # Si nada cabe en el presupuesto, la más rápida
+    assert pick_best(results, 0.05)["whisper_model_size"] == "tiny"
+
+
+def test_pick_best_breaks_ties_by_speed_then_order():
+    results = [result("base", 3, 0.4, 0.10), result("base", 1, 0.2, 0.10), result("small", 1, 0.2, 0.10)]
+    best = pick_best(results, 0.5)
+    assert (best["whisper_model_size"], best["beam_size"]) == ("base", 1)
+    # Empate completo: se queda la primera medida (modelos y beams van de menor a mayor)
+    assert pick_best(results[1:], 0.5) is results[1]
+    assert pick_best(results[1:], 0.1) is results[1]
+
+
+def test_write_config_keeps_unrelated_settings():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"tts": {"voice": "es"}, "stt": {"vad_mode": "adaptive"}}, f)
+        write_config(result("base", 3, 0.3, 0.1), path)
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    assert config["whisper_model_size"] == "base"
+    assert config["stt"] == {"vad_mode": "adaptive", "compute_type": "int8", "cpu_threads": 4, "beam_size": 3}
+    assert config["tts"] == {"voice": "es"}
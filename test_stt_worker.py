@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+import numpy as np
+
+import stt_worker
+from stt_worker import SttWorker, _attach
+
+
+def fake_worker(requests, results):
+    """Mismo protocolo que ``_worker_main``, sin Whisper: "transcribe" la suma del audio.
+
+    Con ``tier="crash:<ruta>"`` el proceso muere la primera vez (mientras no exista la ruta).
+    """
+    print("esto no debe llegar a la terminal")
+    block = None
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, op, shm_name, length, kwargs = request
+        tier = kwargs.get("tier") or ""
+        if tier.startswith("crash:") and not os.path.exists(tier[6:]):
+            open(tier[6:], "w").close()
+            os._exit(3)
+        if block is None or block.name != shm_name:
+            block = _attach(shm_name)
+        audio = np.ndarray((length,), dtype=np.float32, buffer=block.buf)
+        value = (f"{audio.sum():.1f}", 1.0, False)
+        del audio
+        results.put((request_id, value, None, f"fake {op}"))
+    if block is not None:
+        block.close()
+
+
+def test_audio_round_trips_through_shared_memory(capfd):
+    worker = SttWorker(target=fake_worker)
+    try:
+        assert worker.decode(np.ones(16000, dtype=np.float32), "command") == ("16000.0", 1.0, False)
+        # Un audio más largo que el bloque inicial obliga a crear otro
+        long_audio = np.full(stt_worker.INITIAL_BUFFER_SECONDS * 16000 + 10, 0.5, dtype=np.float32)
+        assert worker.decode(long_audio, "command")[0] == f"{len(long_audio) * 0.5:.1f}"
+        assert worker.model_status == "fake decode · proceso aparte"
+    finally:
+        worker.stop()
+    assert "esto no debe llegar" not in capfd.readouterr().out
+
+
+def test_a_crashed_process_is_restarted_and_the_request_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = SttWorker(target=fake_worker)
+        try:
+            assert worker.decode(np.ones(10, dtype=np.float32), "command")[0] == "10.0"
+            first = worker._process
+            text, _, _ = worker.decode(np.ones(20, dtype=np.float32), f"crash:{os.path.join(tmp, 'muerto')}")
+            assert text == "20.0"
+            assert worker._process is not first and worker.alive
+            assert worker.restarts == 1
+            assert "(1 reinicios)" in worker.model_status
+        finally:
+            worker.stop()
@@ -0,0 +1,70 @@
+import time
+
+import tts
+from tts import SentenceSplitter, SpeechStream
+
+
+def feed_words(splitter, text):
+    sentences = []
+    for word in text.split(" "):
+        sentences += splitter.feed(word + " ")
+    return sentences + splitter.flush()
+
+
+def test_splits_on_sentence_end_while_streaming():
+    splitter = SentenceSplitter()
+    text = "Son las cinco de la tarde. ¿Quieres que te ponga una alarma? Dímelo sin problema"
+    assert feed_words(splitter, text) == [
+        "Son las cinco de la tarde.", "¿Quieres que te ponga una alarma?", "Dímelo sin problema"
+    ]
+
+
+def test_abbreviations_decimals_and_short_sentences_are_kept_together():
+    splitter = SentenceSplitter()
+    text = "Vale. El Sr. García pesa 72.5 kilos, etc. y mide bastante."
+    assert feed_words(splitter, text) == ["Vale. El Sr. García pesa 72.5 kilos, etc. y mide bastante."]
+
+
+def test_incomplete_sentence_waits_for_more_text():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Esta frase aún no ha terminado") == []
+    assert splitter.feed(".") == []
+    assert splitter.feed(" Y esta") == ["Esta frase aún no ha terminado."]
+    assert splitter.feed(" otra también.\n") == ["Y esta otra también."]
+
+
+def test_speech_stream_speaks_first_sentence_before_the_rest_arrives():
+    spoken = []
+    original = tts._say
+    tts._say = lambda text, engine: spoken.append((text, time.time())) or True
+    try:
+        stream = SpeechStream(engine=None)
+        stream.feed("La primera frase ya está. La segunda")
+        time.sleep(0.1)
+        assert [text for text, _ in spoken] == ["La primera frase ya está."]
+        stream.feed(" llega más tarde.")
+        assert stream.close()
+        assert [text for text, _ in spoken] == ["La primera frase ya está.", "La segunda llega más tarde."]
+        assert not tts.is_speaking()
+    finally:
+        tts._say = original
+
+
+def test_speech_stream_drops_pending_sentences_when_interrupted():
+    spoken = []
+    original = tts._say
+
+    def say(text, engine):
+        spoken.append(text)
+        tts.stop_speaking()
+        return False
+
+    tts._say = say
+    try:
+        stream = SpeechStream(engine=None)
+        stream.feed("Primera frase completa. Segunda frase completa. Tercera frase completa. ")
+        assert not stream.close()
+        assert stream.interrupted
+        assert spoken == ["Primera frase completa."]
+    finally:
+        tts._say = original
@@ -0,0 +1,102 @@
+import numpy as np
+
+from vad import AdaptiveVAD, EnergyVAD, speech_regions
+
+RATE = 16000
+
+
+def tone(seconds, amplitude, freq=220.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t) * 32767).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def energy_vad(**kwargs):
+    # Habla por encima de 0.12 de RMS, silencio por debajo de 0.08
+    vad = EnergyVAD(rate=RATE, channels=1, silence_threshold=0.08, **kwargs)
+    vad.onset_threshold = 0.12
+    return vad
+
+
+def test_onset_needs_a_run_of_speech_frames():
+    vad = energy_vad(silence_duration=0.5)
+    frame = vad.frame_length
+    vad.process(tone(frame * (vad.onset_frames - 1) / RATE, 0.5))
+    assert not vad.speech_detected
+    vad.process(silence(frame / RATE))
+    vad.process(tone(frame * (vad.onset_frames - 1) / RATE, 0.5))
+    assert not vad.speech_detected
+    vad.process(tone(frame / RATE, 0.5))
+    assert vad.speech_detected and vad.in_speech
+
+
+def test_uncertain_band_counts_half_towards_the_end():
+    vad = energy_vad(silence_duration=0.5)
+    vad.process(tone(0.3, 0.5))
+    # RMS 0.1: entre los dos umbrales, así que 0.6 s solo suman 0.3 s de silencio
+    vad.process(tone(0.6, 0.1 * np.sqrt(2)))
+    assert not vad.ended
+    assert 0.25 < vad.silence_time < 0.35
+    vad.process(silence(0.25))
+    assert vad.ended and not vad.in_speech
+
+
+def test_speech_resets_the_silence_count():
+    vad = energy_vad(silence_duration=0.5)
+    vad.process(tone(0.3, 0.5))
+    vad.process(silence(0.4))
+    vad.process(tone(0.1, 0.5))
+    assert vad.silence_time == 0.0
+    vad.process(silence(0.4))
+    assert not vad.ended
+    vad.process(silence(0.2))
+    assert vad.ended
+
+
+def test_samples_split_across_blocks_are_not_lost():
+    vad = energy_vad(silence_duration=0.5)
+    audio = tone(0.2, 0.5)
+    for offset in range(0, len(audio), 100):
+        vad.process(audio[offset:offset + 100])
+    assert vad.speech_detected
+
+
+def test_adaptive_ignores_loud_noise_but_hears_voice():
+    rng = np.random.default_rng(0)
+    noise = (rng.normal(0, 0.2, RATE) * 32767).clip(-32768, 32767).astype(np.int16)
+    vad = AdaptiveVAD(rate=RATE, channels=1, silence_duration=0.5)
+    vad.process(noise)
+    assert not vad.speech_detected
+    # El suelo de ruido queda en ~0.2: la voz tiene que superarlo en speech_threshold_multiplier
+    vad.process(tone(0.3, 0.8))
+    assert vad.speech_detected
+
+
+def as_float(samples):
+    return samples.astype(np.float32) / 32768.0
+
+
+def test_speech_regions_pads_and_merges_close_words():
+    audio = as_float(np.concatenate((silence(1.0), tone(0.5, 0.5), silence(0.2), tone(0.5, 0.5), silence(1.0))))
+    regions = speech_regions(audio, RATE, mode="simple", padding=0.1, merge_gap=0.3)
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert abs(start / RATE - 0.9) < 0.03
+    assert abs(end / RATE - 2.3) < 0.03
+
+
+def test_speech_regions_keeps_distant_phrases_apart():
+    audio = as_float(np.concatenate((tone(0.5, 0.5), silence(1.0), tone(0.5, 0.5))))
+    regions = speech_regions(audio, RATE, mode="simple", padding=0.0, merge_gap=0.3)
+    assert len(regions) == 2
+    assert regions[0][0] == 0 and regions[1][1] <= len(audio)
+
+
+def test_speech_regions_ignores_uncertain_only_zones():
+    # Solo banda de histéresis, sin ninguna trama de habla clara
+    audio = as_float(np.concatenate((silence(0.5), tone(0.5, 0.1 * np.sqrt(2)), silence(0.5))))
+    assert speech_regions(audio, RATE, mode="simple") == []
+    assert speech_regions(np.zeros(10, dtype=np.float32), RATE, mode="simple") == []
@@ -0,0 +1,51 @@
+import numpy as np
+
+from wake_spotter import DEFAULT_THRESHOLD, WakeWordSpotter, mfcc, subsequence_dtw
+
+RATE = 16000
+JARVIS = (300, 900, 2000)
+
+
+def word(freqs, seconds=0.15, amplitude=0.3, noise=0.01, seed=0):
+    """Palabra sintética: una sucesión de tonos, cada uno hace de sílaba."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    audio = np.concatenate([amplitude * np.sin(2 * np.pi * f * t) for f in freqs])
+    return (audio + np.random.default_rng(seed).normal(0, noise, len(audio))).astype(np.float32)
+
+
+def padded(audio, seconds=0.5):
+    silence = np.zeros(int(seconds * RATE), dtype=np.float32)
+    return np.concatenate((silence, audio, silence))
+
+
+def test_mfcc_has_one_row_per_10_ms_frame_without_c0():
+    audio = word(JARVIS)
+    assert mfcc(audio).shape == (1 + (len(audio) - 400) // 160, 12)
+    assert mfcc(np.zeros(100, dtype=np.float32)).shape == (0, 12)
+
+
+def test_dtw_finds_the_template_inside_a_longer_query():
+    template = mfcc(word(JARVIS))
+    # Más lenta, más fuerte y rodeada de silencio: sigue siendo la misma palabra
+    same = subsequence_dtw(template, mfcc(padded(word(JARVIS, seconds=0.18, amplitude=0.8, seed=1))))
+    reversed_word = subsequence_dtw(template, mfcc(padded(word(JARVIS[::-1], seconds=0.18, amplitude=0.8, seed=1))))
+    silence = subsequence_dtw(template, mfcc(padded(np.zeros(0, dtype=np.float32))))
+    assert same < reversed_word < silence
+    assert subsequence_dtw(template, template) == 0.0
+    assert subsequence_dtw(template, mfcc(np.zeros(10, dtype=np.float32))) == np.inf
+
+
+def test_threshold_is_calibrated_from_template_spread():
+    spotter = WakeWordSpotter(threshold=None)
+    assert spotter._calibrate_threshold() == DEFAULT_THRESHOLD
+    for i in range(3):
+        assert spotter.enroll(padded(word(JARVIS, seconds=0.15 + 0.02 * i, noise=0.01 * (i + 1), seed=i)))
+    # Una grabación demasiado corta no sirve de plantilla
+    assert not spotter.enroll(word(JARVIS, seconds=0.02))
+    assert len(spotter.templates) == 3
+
+    spotter.threshold = spotter._calibrate_threshold()
+    distances = [subsequence_dtw(a, b) for a in spotter.templates for b in spotter.templates if a is not b]
+    assert spotter.threshold == np.mean(distances) * 1.1
+    assert spotter.score(padded(word(JARVIS, seconds=0.18, amplitude=0.6, noise=0.02, seed=5))) < spotter.threshold
+    assert spotter.score(padded(word(JARVIS[::-1], seconds=0.18, amplitude=0.6, noise=0.02, seed=5))) > spotter.threshold
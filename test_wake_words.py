@@ -0,0 +1,44 @@
+from wake_words import WakeWordMatcher, phonetic_key
+
+WAKE_WORDS = ["jarvis", "oye jarvis", "hey jarvis"]
+
+
+def test_phonetic_key_merges_spanish_spellings():
+    assert phonetic_key("jarvis") == phonetic_key("jarbis") == "JARBIS"
+    assert phonetic_key("gerbis") == phonetic_key("jerbis") == phonetic_key("yerbis")
+    assert phonetic_key("quiero") == "KIERO"
+    assert phonetic_key("guitarra") == "GITARA"
+
+
+def test_misheard_variants_match_with_position_and_score():
+    matcher = WakeWordMatcher(WAKE_WORDS)
+    for text in ["jerbis dime la hora", "yerbis dime la hora", "gerbis dime la hora", "jarbi dime la hora"]:
+        match = matcher.find(text)
+        assert match is not None, text
+        assert match.wake == "jarvis"
+        assert match.start == 0
+        assert 0.5 < match.score < 1.0
+        assert matcher.command_after(text, match) == "dime la hora"
+
+
+def test_longer_phrase_preferred_and_command_extracted():
+    matcher = WakeWordMatcher(WAKE_WORDS)
+    text = "oye hervis, pon música"
+    match = matcher.find(text)
+    assert match.wake == "oye jarvis"
+    assert match.heard == "oye hervis"
+    assert matcher.command_after(text) == "pon música"
+
+
+def test_exact_match_scores_one_and_split_words_match():
+    matcher = WakeWordMatcher(WAKE_WORDS)
+    assert matcher.find("hey jarvis").score == 1.0
+    assert matcher.command_after("jar vis enciende la luz") == "enciende la luz"
+
+
+def test_unrelated_words_do_not_match():
+    matcher = WakeWordMatcher(WAKE_WORDS)
+    for text in ["dónde está mi jardín", "javier llama a mamá", "el archivo está listo", "hola qué tal",
+                 "dónde están las llaves", "llaves", "el servis del coche", "trae las jarras"]:
+        assert matcher.find(text) is None, text
+    assert matcher.command_after("hola qué tal") is None
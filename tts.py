@@ -1,10 +1,14 @@
-import pyttsx3
-import requests
 import os
+import queue
+import re
+import subprocess
+import threading
+import time
 from config_loader import TTS_MODE, ELEVEN_KEY, VOICE_ID, LOCAL_TTS_RATE, LOCAL_TTS_VOICE, DEBUG_TTS
 
 def init_tts():
     if TTS_MODE == "local":
+        import pyttsx3
         engine = pyttsx3.init()
         engine.setProperty('rate', LOCAL_TTS_RATE)
         if LOCAL_TTS_VOICE:
@@ -23,12 +27,78 @@ def init_tts():
         print("🗣️ Usando ElevenLabs como TTS")
         return None
 
-def speak_response(text, engine):
-    if DEBUG_TTS:
-        print(f"[DEBUG TTS] Texto recibido para hablar: {text}")
+_interrupt = threading.Event()
+_speaking = threading.Event()
+_playback_callback = None
+PLAYER_POLL = 0.02
+
+
+def set_playback_callback(callback):
+    """Registra ``callback(hablando)`` para cuando empieza y termina la reproducción (p. ej. para marcar el eco)."""
+    global _playback_callback
+    _playback_callback = callback
+
+
+def _set_speaking(speaking):
+    if speaking:
+        _speaking.set()
+    else:
+        _speaking.clear()
+    if _playback_callback is not None:
+        _playback_callback(speaking)
+
+
+def stop_speaking():
+    """Pide cortar la reproducción en curso (se puede llamar desde cualquier hilo).
+
+    pyttsx3 no admite ``stop()`` desde otro hilo, así que el corte se hace en su
+    propio callback de inicio de palabra; mpg123 se termina en el siguiente sondeo.
+    """
+    if _speaking.is_set():
+        _interrupt.set()
+
 
+def is_speaking():
+    return _speaking.is_set()
+
+
+def _play_mp3(path):
+    if os.name == "nt":
+        os.system(f"start {path}")
+        return True
+    player = subprocess.Popen(["mpg123", "-q", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while player.poll() is None:
+        if _interrupt.is_set():
+            player.terminate()
+            player.wait()
+            return False
+        time.sleep(PLAYER_POLL)
+    return True
+
+
+def _speak_local(text, engine):
+    def on_word(name, location, length):
+        if _interrupt.is_set():
+            engine.stop()
+
+    token = engine.connect('started-word', on_word)
+    try:
+        parts = [part.strip() for part in text.split('. ')] if len(text) > 200 else [text]
+        for part in parts:
+            if _interrupt.is_set():
+                return False
+            engine.say(part)
+            engine.runAndWait()
+        engine.stop()
+        return not _interrupt.is_set()
+    finally:
+        engine.disconnect(token)
+
+
+def _say(text, engine):
     if TTS_MODE == "elevenlabs":
         try:
+            import requests
             headers = {"xi-api-key": ELEVEN_KEY, "Content-Type": "application/json"}
             url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
             data = {"text": text, "model_id": "eleven_monolingual_v1"}
@@ -36,23 +106,145 @@ def speak_response(text, engine):
             if r.status_code == 200:
                 with open("response.mp3", "wb") as f:
                     f.write(r.content)
-                os.system(f"start response.mp3" if os.name == "nt" else "mpg123 response.mp3")
+                return _play_mp3("response.mp3")
             else:
                 print(f"❌ TTS ElevenLabs error: Status {r.status_code}")
         except Exception as e:
             print(f"❌ TTS ElevenLabs error: {e}")
     else:
         try:
-            if len(text) > 200:
-                parts = text.split('. ')
-                for part in parts:
-                    engine.say(part.strip())
-                    engine.runAndWait()
-            else:
-                engine.say(text)
-                engine.runAndWait()
-            engine.stop()
+            completed = _speak_local(text, engine)
             if DEBUG_TTS:
-                print("[DEBUG TTS] Texto hablado con motor local")
+                print("[DEBUG TTS] Texto hablado con motor local" if completed
+                      else "[DEBUG TTS] Reproducción interrumpida")
+            return completed
         except Exception as e:
             print(f"❌ TTS local error: {e}")
+    return True
+
+
+def speak_response(text, engine):
+    """Habla ``text``. Devuelve False si la reproducción se interrumpió con ``stop_speaking``."""
+    if DEBUG_TTS:
+        print(f"[DEBUG TTS] Texto recibido para hablar: {text}")
+
+    _interrupt.clear()
+    _set_speaking(True)
+    try:
+        return _say(text, engine)
+    finally:
+        _set_speaking(False)
+
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"»”')]*\s+|\n+")
+ABBREVIATIONS = {"sr", "sra", "srta", "dr", "dra", "etc", "ej", "pág", "núm", "aprox", "ud", "uds", "vs"}
+MIN_SENTENCE_CHARS = 12
+
+
+class SentenceSplitter:
+    """Corta texto que llega a trozos en frases completas para el TTS.
+
+    Una frase termina en ``.``, ``!``, ``?`` o ``…`` seguidos de espacio, o en
+    un salto de línea; no se corta tras abreviaturas comunes ni en decimales
+    ("3.5"), y las frases de menos de ``min_chars`` se juntan con la siguiente
+    para que la voz no suene entrecortada.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        """Añade texto y devuelve las frases que han quedado completas."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.start()].strip()
+            words = candidate.split()
+            if match.group().lstrip().startswith(".") and words and words[-1].lower() in ABBREVIATIONS:
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(self.buffer[start:match.end()].strip())
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Devuelve lo que quede pendiente como última frase."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SpeechStream:
+    """Habla una respuesta frase a frase mientras el modelo la sigue generando.
+
+    ``feed`` recibe los trozos de texto tal como llegan; cada frase completa se
+    encola y un hilo la reproduce en cuanto termina la anterior, así que la
+    primera frase suena sin esperar al resto. ``stop_speaking`` corta la
+    reproducción y descarta lo pendiente. ``on_start`` se llama justo antes de
+    la primera frase (por ejemplo, para empezar a vigilar interrupciones).
+    """
+
+    def __init__(self, engine, on_start=None):
+        self.engine = engine
+        self.on_start = on_start
+        self.splitter = SentenceSplitter()
+        self.completed = True
+        self._queue = queue.Queue()
+        self._thread = None
+
+    @property
+    def interrupted(self):
+        return not self.completed or (self._thread is not None and _interrupt.is_set())
+
+    def feed(self, text):
+        for sentence in self.splitter.feed(text):
+            self._put(sentence)
+
+    def _put(self, sentence):
+        if self._thread is None:
+            _interrupt.clear()
+            _set_speaking(True)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(sentence)
+
+    def close(self):
+        """Habla lo que quede y espera a que termine. Devuelve False si se interrumpió."""
+        for sentence in self.splitter.flush():
+            self._put(sentence)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        return self.completed
+
+    def cancel(self):
+        """Corta la reproducción, descarta lo pendiente y espera al hilo."""
+        self.splitter.buffer = ""
+        if self._thread is not None:
+            self.completed = False
+            _interrupt.set()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            if self.on_start is not None:
+                self.on_start()
+            while True:
+                sentence = self._queue.get()
+                if sentence is None:
+                    return
+                if _interrupt.is_set():
+                    self.completed = False
+                    continue
+                if DEBUG_TTS:
+                    print(f"[DEBUG TTS] Frase en streaming: {sentence}")
+                if not _say(sentence, self.engine):
+                    self.completed = False
+        finally:
+            _set_speaking(False)
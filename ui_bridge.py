@@ -1,15 +1,22 @@
 from jarvis_ui import JarvisApp
+import itertools
 import threading
 import time
 from textual.message import Message
 
+STREAM_UPDATE_INTERVAL = 0.05
+
+
 class UIBridge:
     def __init__(self):
         self.app = JarvisApp()
         self.input_queue = []
         self.jarvis_agent = None  # Referencia al agente
         self.app.on_user_input_callback = self._handle_input
+        self.app.on_cancel_callback = self._handle_cancel
         self.ready = False
+        self._stream_ids = itertools.count(1)
+        self._stream_posted = {}
 
         # No lanzamos app.run() aquí, dejamos que quien use UIBridge lo haga
         threading.Thread(target=self._wait_ready, daemon=True).start()
@@ -26,6 +33,11 @@ class UIBridge:
         else:
             self.input_queue.append(text)
 
+    def _handle_cancel(self):
+        """Escape en la UI: cancela el comando en curso"""
+        if self.jarvis_agent and hasattr(self.jarvis_agent, 'cancel_command'):
+            self.jarvis_agent.cancel_command("Escape")
+
     def _process_user_command(self, text):
         """Procesa el comando del usuario"""
         try:
@@ -34,7 +46,9 @@ class UIBridge:
                 import os
                 os._exit(0)
             else:
-                if hasattr(self.jarvis_agent, 'process_text_command'):
+                if hasattr(self.jarvis_agent, 'submit_command'):
+                    self.jarvis_agent.submit_command(text, from_voice=False)
+                elif hasattr(self.jarvis_agent, 'process_text_command'):
                     self.jarvis_agent.process_text_command(text)
                 else:
                     self.jarvis_agent.process_command(text, from_voice=False)
@@ -62,6 +76,33 @@ class UIBridge:
         elif not self.ready:
             print(f"UI not ready, message lost: [{sender}] {msg}")
 
+    def new_stream(self):
+        """Identificador para un mensaje que se irá actualizando con ``stream_message``"""
+        return next(self._stream_ids)
+
+    def stream_message(self, stream_id, text, sender="Jarvis", final=False):
+        """Muestra o reescribe en el sitio un mensaje que llega por partes.
+
+        Las actualizaciones intermedias se limitan a una cada
+        ``STREAM_UPDATE_INTERVAL`` segundos para no saturar la UI; la final
+        (``final=True``) siempre se envía.
+        """
+        if not self.ready:
+            if final:
+                print(f"UI not ready, message lost: [{sender}] {text}")
+            return
+        now = time.time()
+        if not final and now - self._stream_posted.get(stream_id, 0) < STREAM_UPDATE_INTERVAL:
+            return
+        if final:
+            self._stream_posted.pop(stream_id, None)
+        else:
+            self._stream_posted[stream_id] = now
+        try:
+            self.app.post_message(self.app.StreamEvent(stream_id, text, sender, final))
+        except Exception as e:
+            print(f"ERROR enviando mensaje a UI: {e}")
+
     def set_mic_status(self, active: bool):
         """Establece el estado del micrófono"""
         if self.ready:
@@ -70,6 +111,22 @@ class UIBridge:
             except Exception as e:
                 print(f"Error setting mic status: {e}")
 
+    def update_stt_timings(self, timings: str):
+        """Actualiza los tiempos de decodificación por tier de Whisper"""
+        if self.ready and timings:
+            try:
+                self.app.post_message(self.app.SttTimingsEvent(timings))
+            except Exception as e:
+                print(f"Error updating STT timings: {e}")
+
+    def update_stt_models(self, status: str):
+        """Actualiza memoria y latencia de carga de los modelos Whisper"""
+        if self.ready:
+            try:
+                self.app.post_message(self.app.SttModelsEvent(status))
+            except Exception as e:
+                print(f"Error updating STT models: {e}")
+
     def set_tts_engine(self, name: str):
         """Establece el nombre del motor TTS"""
         if self.ready:
@@ -86,6 +143,30 @@ class UIBridge:
             except Exception as e:
                 print(f"Error setting AI engine: {e}")
 
+    def update_ai_cache(self, status: str):
+        """Actualiza la tasa de aciertos de la caché de respuestas de la IA"""
+        if self.ready and status:
+            try:
+                self.app.post_message(self.app.AICacheEvent(status))
+            except Exception as e:
+                print(f"Error updating AI cache: {e}")
+
+    def update_ai_router(self, status: str):
+        """Actualiza la latencia y salud medidas de cada proveedor de IA"""
+        if self.ready and status:
+            try:
+                self.app.post_message(self.app.AIRouterEvent(status))
+            except Exception as e:
+                print(f"Error updating AI router: {e}")
+
+    def update_local_intents(self, status: str):
+        """Actualiza el porcentaje de consultas resueltas en local, sin proveedor"""
+        if self.ready and status:
+            try:
+                self.app.post_message(self.app.LocalIntentsEvent(status))
+            except Exception as e:
+                print(f"Error updating local intents: {e}")
+
     def update_memory_info(self, memory_entries, corrections):
         """Actualiza la información de memoria y correcciones"""
         if self.ready:
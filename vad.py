@@ -0,0 +1,221 @@
+# vad.py - Detección de actividad de voz (VAD)
+
+import numpy as np
+from config_loader import (
+    SAMPLE_RATE, CHANNELS, VOLUME_THRESHOLD, VAD_MODE,
+    SPEECH_THRESHOLD_MULTIPLIER, SILENCE_DURATION
+)
+
+FRAME_SECONDS = 0.016
+ONSET_SECONDS = 0.05
+
+SILENCE, UNCERTAIN, SPEECH = 0, 1, 2
+
+
+def frame_length_for(rate):
+    """Longitud de trama en potencia de dos (~16 ms), para que los bloques de captura se dividan sin resto."""
+    target = rate * FRAME_SECONDS
+    return 1 << max(6, int(round(np.log2(target))))
+
+
+def frame_features(frames):
+    """Calcula en bloque las características de una matriz de tramas float32 (n_tramas x longitud).
+
+    Devuelve (energía RMS, tasa de cruces por cero, planitud espectral), un valor por trama.
+    """
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2 + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy, zcr, flatness
+
+
+class VoiceActivityDetector:
+    """Base de los detectores: troceado en tramas y máquina de estados con histéresis.
+
+    Las subclases solo implementan ``classify(frames)``, que devuelve para cada
+    trama SILENCE, UNCERTAIN (banda de histéresis) o SPEECH. El inicio de habla
+    exige ``ONSET_SECONDS`` de tramas SPEECH seguidas; el final, acumular
+    ``silence_duration`` segundos de silencio (las tramas inciertas cuentan la mitad).
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, channels=CHANNELS, silence_duration=None):
+        self.rate = rate
+        self.channels = channels
+        self.silence_duration = SILENCE_DURATION if silence_duration is None else silence_duration
+        self.frame_length = frame_length_for(rate)
+        self.frame_seconds = self.frame_length / rate
+        self.onset_frames = max(1, int(np.ceil(ONSET_SECONDS / self.frame_seconds)))
+        self._scratch = np.zeros(0, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        self.speech_detected = False
+        self.in_speech = False
+        self.silence_time = 0.0
+        self.level = 0.0
+        self._onset_run = 0
+
+    @property
+    def ended(self):
+        """True cuando hubo habla y después suficiente silencio."""
+        return self.speech_detected and self.silence_time >= self.silence_duration
+
+    def _frames(self, samples):
+        if self.channels > 1:
+            samples = samples[:len(samples) - len(samples) % self.channels]
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        n = len(samples) // self.frame_length
+        used = n * self.frame_length
+        self._pending = samples[used:].copy()
+        if used > len(self._scratch):
+            self._scratch = np.zeros(used, dtype=np.float32)
+        out = self._scratch[:used]
+        np.multiply(samples[:used], 1.0 / 32768.0, out=out, casting="unsafe")
+        return out.reshape(n, self.frame_length)
+
+    def classify(self, frames):
+        raise NotImplementedError
+
+    def process(self, samples):
+        """Procesa un bloque int16 y devuelve si ahora mismo hay habla."""
+        frames = self._frames(samples)
+        if len(frames) == 0:
+            return self.in_speech
+        for decision in self.classify(frames):
+            if decision == SPEECH:
+                self._onset_run += 1
+                if self._onset_run >= self.onset_frames:
+                    self.in_speech = True
+                    self.speech_detected = True
+                    self.silence_time = 0.0
+            else:
+                self._onset_run = 0
+                weight = 1.0 if decision == SILENCE else 0.5
+                self.silence_time += self.frame_seconds * weight
+                if self.silence_time >= self.silence_duration:
+                    self.in_speech = False
+        return self.in_speech
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """Modo "simple": umbrales fijos de energía derivados de ``volume_threshold``."""
+
+    def __init__(self, silence_threshold=None, **kwargs):
+        super().__init__(**kwargs)
+        self.offset_threshold = VOLUME_THRESHOLD if silence_threshold is None else silence_threshold
+        self.onset_threshold = VOLUME_THRESHOLD * SPEECH_THRESHOLD_MULTIPLIER
+
+    def classify(self, frames):
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        self.level = float(energy[-1])
+        return np.where(energy > self.onset_threshold, SPEECH,
+                        np.where(energy < self.offset_threshold, SILENCE, UNCERTAIN))
+
+
+class AdaptiveVAD(VoiceActivityDetector):
+    """Modo "adaptive": umbrales relativos a un suelo de ruido que se recalibra continuamente.
+
+    Una trama es habla si supera el suelo en ``speech_threshold_multiplier`` y
+    además tiene estructura de voz (espectro poco plano y cruces por cero
+    moderados); así el ruido de ventiladores o tráfico, aunque sea fuerte, no
+    mantiene abierta la grabación.
+    """
+
+    MIN_FLOOR = 1e-4
+    MIN_SPEECH_ENERGY = 0.004
+    MAX_FLATNESS = 0.45
+    MAX_ZCR = 0.35
+    FLOOR_DOWN = 0.2
+    FLOOR_UP = 0.02
+    FLOOR_UP_IN_SPEECH = 0.002
+
+    def __init__(self, silence_threshold=None, **kwargs):
+        super().__init__(**kwargs)
+        self.onset_ratio = max(SPEECH_THRESHOLD_MULTIPLIER, 1.1)
+        self.offset_ratio = 1.0 + (self.onset_ratio - 1.0) / 2
+        self.noise_floor = None
+
+    def reset(self):
+        super().reset()
+        self.noise_floor = None
+
+    def classify(self, frames):
+        energy, zcr, flatness = frame_features(frames)
+        self.level = float(energy[-1])
+        if self.noise_floor is None:
+            self.noise_floor = max(float(np.min(energy)), self.MIN_FLOOR)
+
+        voiced = (flatness < self.MAX_FLATNESS) & (zcr < self.MAX_ZCR)
+        decisions = np.empty(len(energy), dtype=np.int8)
+        floor = self.noise_floor
+        for i, e in enumerate(energy):
+            onset = max(floor * self.onset_ratio, self.MIN_SPEECH_ENERGY)
+            offset = max(floor * self.offset_ratio, self.MIN_SPEECH_ENERGY)
+            if e > onset and voiced[i]:
+                decisions[i] = SPEECH
+                rate = self.FLOOR_UP_IN_SPEECH
+            elif e < offset or not voiced[i]:
+                decisions[i] = SILENCE
+                rate = self.FLOOR_DOWN if e < floor else self.FLOOR_UP
+            else:
+                decisions[i] = UNCERTAIN
+                rate = self.FLOOR_UP_IN_SPEECH
+            floor = max(floor + rate * (e - floor), self.MIN_FLOOR)
+        self.noise_floor = floor
+        return decisions
+
+
+def speech_regions(audio, rate=16000, mode=None, padding=0.2, merge_gap=0.3):
+    """Localiza las zonas con habla en un buffer float32 mono completo.
+
+    Clasifica todas las tramas de una vez con el detector de ``vad_mode``,
+    une zonas separadas por menos de ``merge_gap`` segundos y añade
+    ``padding`` segundos a cada lado. Devuelve [(inicio, fin)] en muestras.
+    """
+    vad = create_vad(mode, rate=rate, channels=1)
+    n = len(audio) // vad.frame_length
+    if n == 0:
+        return []
+    frames = np.ascontiguousarray(audio[:n * vad.frame_length], dtype=np.float32).reshape(n, vad.frame_length)
+    decisions = np.asarray(vad.classify(frames))
+
+    active = np.concatenate(([False], decisions != SILENCE, [False]))
+    edges = np.flatnonzero(active[1:] != active[:-1])
+    regions = []
+    gap_frames = merge_gap / vad.frame_seconds
+    for start, end in zip(edges[::2], edges[1::2]):
+        if not np.any(decisions[start:end] == SPEECH):
+            continue
+        if regions and start - regions[-1][1] <= gap_frames:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    pad = int(padding * rate)
+    return [(max(0, start * vad.frame_length - pad), min(len(audio), end * vad.frame_length + pad))
+            for start, end in regions]
+
+
+VAD_MODES = {
+    "simple": EnergyVAD,
+    "adaptive": AdaptiveVAD,
+}
+
+
+def register_vad(name, detector_class):
+    """Registra un detector adicional seleccionable con ``vad_mode``."""
+    VAD_MODES[name] = detector_class
+
+
+def create_vad(mode=None, **kwargs):
+    mode = mode or VAD_MODE
+    detector_class = VAD_MODES.get(mode)
+    if detector_class is None:
+        print(f"⚠️ vad_mode '{mode}' desconocido, usando 'simple'")
+        detector_class = EnergyVAD
+    return detector_class(**kwargs)
@@ -0,0 +1,223 @@
+# wake_spotter.py - Detector ligero de palabra de activación (MFCC + DTW)
+
+import os
+import sys
+import time
+import wave
+import numpy as np
+from config_loader import (
+    WAKE_SPOTTER_ENABLED, WAKE_SPOTTER_TEMPLATES_DIR, WAKE_SPOTTER_THRESHOLD, DEBUG_STT
+)
+
+SPOTTER_RATE = 16000
+FRAME_LENGTH = 400        # 25 ms
+FRAME_STEP = 160          # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+HOP_SECONDS = 0.2
+MIN_GATE_RMS = 0.004
+DEFAULT_THRESHOLD = 6.0
+
+_mel_cache = {}
+
+
+def _mel_filterbank():
+    if "fb" not in _mel_cache:
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        mels = np.linspace(hz_to_mel(60.0), hz_to_mel(SPOTTER_RATE / 2), N_MELS + 2)
+        bins = np.floor((N_FFT + 1) * mel_to_hz(mels) / SPOTTER_RATE).astype(int)
+        fb = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+        for m in range(1, N_MELS + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        n = np.arange(N_MELS)
+        dct = np.cos(np.pi / N_MELS * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None]).astype(np.float32)
+        _mel_cache["fb"] = fb
+        _mel_cache["dct"] = dct
+        _mel_cache["window"] = np.hamming(FRAME_LENGTH).astype(np.float32)
+    return _mel_cache["fb"], _mel_cache["dct"], _mel_cache["window"]
+
+
+def mfcc(audio):
+    """MFCC (n_tramas x 12) de audio float32 mono a 16 kHz.
+
+    Se descarta c0 (energía global) para que el volumen al hablar no afecte a la distancia.
+    """
+    fb, dct, window = _mel_filterbank()
+    if len(audio) < FRAME_LENGTH:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1]).astype(np.float32)
+    n_frames = 1 + (len(emphasized) - FRAME_LENGTH) // FRAME_STEP
+    idx = np.arange(FRAME_LENGTH)[None, :] + FRAME_STEP * np.arange(n_frames)[:, None]
+    frames = emphasized[idx] * window
+    power = np.abs(np.fft.rfft(frames, N_FFT, axis=1)) ** 2 / N_FFT
+    feats = np.log(power @ fb.T + 1e-4) @ dct.T
+    return feats[:, 1:]
+
+
+def subsequence_dtw(template, query):
+    """Distancia DTW normalizada del mejor tramo de ``query`` que encaja con ``template``.
+
+    Usa pasos (1,0), (1,1) y (1,2) para poder vectorizar cada fila; el inicio y el
+    final dentro de ``query`` son libres.
+    """
+    if len(template) == 0 or len(query) == 0:
+        return np.inf
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+    acc = cost[0].copy()
+    for i in range(1, len(template)):
+        prev = acc
+        best = prev.copy()
+        best[1:] = np.minimum(best[1:], prev[:-1])
+        best[2:] = np.minimum(best[2:], prev[:-2])
+        acc = cost[i] + best
+    return float(acc.min() / len(template))
+
+
+def _trim_silence(audio, frame=FRAME_STEP):
+    n = len(audio) // frame
+    if n == 0:
+        return audio
+    energy = np.sqrt(np.mean(audio[:n * frame].reshape(n, frame) ** 2, axis=1))
+    active = np.nonzero(energy > max(energy.max() * 0.1, MIN_GATE_RMS))[0]
+    if len(active) == 0:
+        return audio
+    return audio[active[0] * frame:(active[-1] + 1) * frame]
+
+
+class WakeWordSpotter:
+    """Detecta la palabra de activación comparando MFCC del audio en vivo con plantillas grabadas.
+
+    Funciona sobre el buffer de captura compartido: cada ``HOP_SECONDS`` evalúa
+    la última ventana (algo más larga que la plantilla más larga) y solo calcula
+    MFCC si hay energía suficiente, así que en silencio apenas consume CPU.
+    """
+
+    def __init__(self, templates_dir=None, threshold=None):
+        self.templates_dir = templates_dir or WAKE_SPOTTER_TEMPLATES_DIR
+        self.templates = []
+        self.threshold = threshold if threshold is not None else WAKE_SPOTTER_THRESHOLD
+        self.last_distance = None
+
+    @property
+    def ready(self):
+        return bool(self.templates)
+
+    def enroll(self, audio):
+        """Añade una plantilla a partir de audio float32 mono a 16 kHz."""
+        feats = mfcc(_trim_silence(audio))
+        if len(feats) >= 10:
+            self.templates.append(feats)
+            return True
+        return False
+
+    def load_templates(self):
+        if not os.path.isdir(self.templates_dir):
+            return 0
+        for name in sorted(os.listdir(self.templates_dir)):
+            if name.lower().endswith(".wav"):
+                try:
+                    from stt import load_wav
+                    self.enroll(load_wav(os.path.join(self.templates_dir, name)))
+                except Exception as e:
+                    print(f"⚠️ Plantilla de activación inválida {name}: {e}")
+        if self.threshold is None:
+            self.threshold = self._calibrate_threshold()
+        return len(self.templates)
+
+    def _calibrate_threshold(self):
+        """Umbral a partir de la dispersión entre plantillas de la misma palabra."""
+        if len(self.templates) < 2:
+            return DEFAULT_THRESHOLD
+        distances = [subsequence_dtw(a, b) for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        return float(np.mean(distances) * 1.1)
+
+    def score(self, audio):
+        """Menor distancia DTW entre el audio (float32, 16 kHz) y las plantillas."""
+        feats = mfcc(audio)
+        return min(subsequence_dtw(t, feats) for t in self.templates)
+
+    def wait_for_wake(self, capture, should_continue):
+        """Bloquea hasta detectar la palabra de activación. Devuelve la posición del buffer o None."""
+        from stt import audio_to_float32
+        sps = capture.samples_per_second
+        hop = int(HOP_SECONDS * sps)
+        window_seconds = max(len(t) for t in self.templates) * FRAME_STEP / SPOTTER_RATE * 1.3 + 0.1
+        window = int(window_seconds * sps)
+        read_pos = capture.position
+
+        while should_continue():
+            if not capture.wait_for(read_pos + hop, timeout=0.5):
+                if not capture.running:
+                    return None
+                continue
+            read_pos = capture.position
+            chunk = audio_to_float32(capture.read(read_pos - hop, read_pos), capture.rate, capture.channels)
+            if not len(chunk) or np.sqrt(np.mean(chunk * chunk)) < MIN_GATE_RMS:
+                continue
+
+            audio = audio_to_float32(capture.read(read_pos - window, read_pos), capture.rate, capture.channels)
+            t0 = time.time()
+            self.last_distance = self.score(audio)
+            if DEBUG_STT:
+                print(f"[DEBUG STT] Wake spotter: distancia {self.last_distance:.2f} "
+                      f"(umbral {self.threshold:.2f}, {1000 * (time.time() - t0):.1f} ms)")
+            if self.last_distance < self.threshold:
+                return read_pos
+        return None
+
+
+def create_wake_spotter():
+    """Devuelve un spotter con plantillas cargadas, o None si está desactivado o no hay plantillas."""
+    if not WAKE_SPOTTER_ENABLED:
+        return None
+    spotter = WakeWordSpotter()
+    count = spotter.load_templates()
+    if count == 0:
+        print(f"⚠️ Wake spotter activado pero sin plantillas en {spotter.templates_dir}/. "
+              f"Graba algunas con: python wake_spotter.py enroll")
+        return None
+    print(f"✅ Wake spotter listo ({count} plantillas, umbral {spotter.threshold:.2f})")
+    return spotter
+
+
+def record_enrollment_clips(count=4, templates_dir=None):
+    """Graba ``count`` clips de la palabra de activación en el directorio de plantillas."""
+    from stt import record_audio, get_audio_capture
+    templates_dir = templates_dir or WAKE_SPOTTER_TEMPLATES_DIR
+    os.makedirs(templates_dir, exist_ok=True)
+    capture = get_audio_capture()
+    saved = 0
+    for i in range(count):
+        input(f"Pulsa Enter y di la palabra de activación ({i + 1}/{count})...")
+        audio = record_audio(duration=3)
+        if audio is None:
+            print("⚠️ No se grabó audio, repite.")
+            continue
+        path = os.path.join(templates_dir, f"wake_{int(time.time())}_{i}.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(capture.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(capture.rate)
+            wf.writeframes(audio.tobytes())
+        saved += 1
+        print(f"✅ Guardado {path}")
+    capture.stop()
+    return saved
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "enroll":
+        record_enrollment_clips(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    else:
+        print("Uso: python wake_spotter.py enroll [n_clips]")
@@ -0,0 +1,194 @@
+# wake_words.py - Detección difusa y fonética de la palabra de activación en transcripciones
+
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+import config_loader
+
+VOWELS = "aeiou"
+VOWEL_SUBSTITUTION_COST = 0.5
+MAX_DELETES = 2
+
+WakeMatch = namedtuple("WakeMatch", "wake start end score heard")
+
+_WORD = re.compile(r"\w+")
+
+
+def _strip_accents(text):
+    text = text.lower().replace("ñ", "\0")
+    text = "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+    return text.replace("\0", "ñ")
+
+
+def phonetic_key(word):
+    """Clave fonética aproximada del español para una palabra.
+
+    Une grafías que suenan igual (b/v/w, c/k/q, c/s/z ante e/i, g/j ante e/i,
+    ll/y/j) y la h inicial aspirada con la que Whisper suele escribir la j
+    ("hervis"); las vocales se conservan y las letras repetidas se colapsan.
+    """
+    w = _strip_accents(word)
+    out = []
+    i = 0
+    while i < len(w):
+        c = w[i]
+        nxt = w[i + 1] if i + 1 < len(w) else ""
+        after = w[i + 2] if i + 2 < len(w) else ""
+        if c in VOWELS:
+            out.append(c.upper())
+        elif c == "c":
+            if nxt == "h":
+                out.append("X")
+                i += 1
+            else:
+                out.append("S" if nxt and nxt in "ei" else "K")
+        elif c == "q":
+            out.append("K")
+            if nxt == "u":
+                i += 1
+        elif c == "g":
+            if nxt and nxt in "ei":
+                out.append("J")
+            else:
+                out.append("G")
+                if nxt == "u" and after and after in "ei":
+                    i += 1
+        elif c == "l" and nxt == "l":
+            out.append("J")
+            i += 1
+        elif c == "y":
+            out.append("J" if nxt and nxt in VOWELS else "I")
+        elif c == "h":
+            if i == 0 and nxt and nxt in VOWELS:
+                out.append("J")
+        elif c in "bvw":
+            out.append("B")
+        elif c in "sz":
+            out.append("S")
+        elif c == "x":
+            out.append("KS")
+        elif c == "ñ":
+            out.append("N")
+        else:
+            out.append(c.upper())
+        i += 1
+    key = "".join(out)
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+def weighted_distance(a, b, limit):
+    """Distancia de edición con sustitución vocal-vocal más barata. Devuelve > limit si se pasa."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        cur = [float(i)] + [0.0] * len(b)
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                sub = 0.0
+            elif ca in "AEIOU" and cb in "AEIOU":
+                sub = VOWEL_SUBSTITUTION_COST
+            else:
+                sub = 1.0
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + sub)
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def _deletes(key, depth):
+    variants = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {v[:i] + v[i + 1:] for v in frontier for i in range(len(v))}
+        variants |= frontier
+    return variants
+
+
+def allowed_cost(key):
+    """Coste máximo tolerado según la longitud de la clave.
+
+    En claves de una sola palabra como JARBIS una consonante y una vocal de
+    diferencia ya alcanzan palabras corrientes ("llaves" → JABES), así que
+    hasta 6 letras solo se admite un error.
+    """
+    if len(key) < 3:
+        return 0.0
+    if len(key) < 7:
+        return 1.0
+    if len(key) < 8:
+        return 1.5
+    return 2.0
+
+
+class WakeWordMatcher:
+    """Busca las palabras de activación en un texto tolerando errores de transcripción.
+
+    Cada frase de activación se reduce una vez a su clave fonética y se indexa
+    por su vecindario de borrados (hasta ``MAX_DELETES`` letras). Para un texto
+    se generan las claves de ventanas de palabras consecutivas, se buscan en el
+    índice y solo los candidatos se verifican con la distancia de edición
+    ponderada, así que el coste no depende de cuántas variantes mal oídas haya.
+    """
+
+    def __init__(self, wake_words=None):
+        self.wake_words = [w.lower() for w in (wake_words if wake_words is not None else config_loader.WAKE_WORDS)]
+        self._phrases = []
+        self._index = defaultdict(set)
+        for wake in self.wake_words:
+            tokens = _WORD.findall(wake)
+            if not tokens:
+                continue
+            key = "".join(phonetic_key(t) for t in tokens)
+            idx = len(self._phrases)
+            self._phrases.append((wake, len(tokens), key, allowed_cost(key)))
+            for variant in _deletes(key, MAX_DELETES):
+                self._index[variant].add(idx)
+        self._window_sizes = sorted({n for _, n, _, _ in self._phrases} | {n + 1 for _, n, _, _ in self._phrases})
+
+    def find_all(self, text):
+        tokens = [(m.start(), m.end(), phonetic_key(m.group())) for m in _WORD.finditer(text)]
+        matches = []
+        for size in self._window_sizes:
+            for i in range(len(tokens) - size + 1):
+                window = tokens[i:i + size]
+                key = "".join(t[2] for t in window)
+                candidates = set()
+                for variant in _deletes(key, MAX_DELETES):
+                    candidates |= self._index.get(variant, set())
+                for idx in candidates:
+                    wake, n_tokens, wake_key, limit = self._phrases[idx]
+                    if size > n_tokens + 1:
+                        continue
+                    cost = weighted_distance(key, wake_key, limit)
+                    if cost <= limit:
+                        start, end = window[0][0], window[-1][1]
+                        matches.append(WakeMatch(wake, start, end, 1.0 - cost / len(wake_key), text[start:end]))
+        return matches
+
+    def find(self, text):
+        """Mejor coincidencia (mayor puntuación, frase más larga, más temprana) o None."""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return max(matches, key=lambda m: (m.score, len(m.wake), -m.start))
+
+    def command_after(self, text, match=None):
+        """Texto que sigue a la palabra de activación, o None si no la hay."""
+        match = match or self.find(text)
+        if match is None:
+            return None
+        return text[match.end:].strip(" ,.")
+
+
+_matcher = None
+
+
+def get_wake_matcher():
+    """Matcher de ``wake_words`` de la config; se reconstruye si la lista cambia al recargar."""
+    global _matcher
+    words = [w.lower() for w in config_loader.WAKE_WORDS]
+    if _matcher is None or _matcher.wake_words != words:
+        _matcher = WakeWordMatcher(words)
+    return _matcher